@@ -0,0 +1,55 @@
+"""
+Скрипт для переноса старых и закрытых заявок в архив (для запуска по cron).
+
+Пример:
+    python archive_applications.py
+    python archive_applications.py --older-than-days 180 --closed-after-days 14
+"""
+import argparse
+import sys
+import time
+
+from core.database import SessionLocal
+# Импортируем все модели для корректной работы relationships
+from models import admin as admin_model
+from models import admin_settings as admin_settings_model
+from models.application_archive import (
+    ARCHIVE_AFTER_DAYS,
+    ARCHIVE_BATCH_SIZE,
+    ARCHIVE_CLOSED_AFTER_DAYS,
+    ApplicationArchiveCRUD
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Архивация заявок")
+    parser.add_argument("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS,
+                        help=f"Архивировать заявки старше N дней (по умолчанию {ARCHIVE_AFTER_DAYS})")
+    parser.add_argument("--closed-after-days", type=int, default=ARCHIVE_CLOSED_AFTER_DAYS,
+                        help=f"Архивировать закрытые заявки без изменений N дней (по умолчанию {ARCHIVE_CLOSED_AFTER_DAYS})")
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE,
+                        help=f"Размер пачки (по умолчанию {ARCHIVE_BATCH_SIZE})")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        result = ApplicationArchiveCRUD.archive(
+            db=db,
+            older_than_days=args.older_than_days,
+            closed_after_days=args.closed_after_days,
+            batch_size=max(1, args.batch_size)
+        )
+    except Exception as e:
+        print(f"❌ Ошибка при архивации: {e}")
+        return 1
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - started
+
+    print(f"✅ Перенесено в архив заявок: {result.archived} ({result.batches} пачек) за {elapsed:.2f} с")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+Бенчмарк горячих выборок CRUD по ключу: накладные расходы на вызов
+при построении ORM-запроса на каждый вызов (db.query(...).filter(...).first())
+и при готовых запросах уровня модуля с bindparam.
+
+Для async-сессии дополнительно сравнивается работа с кэшем подготовленных
+на сервере запросов asyncpg и без него. Нужна БД с данными (ключи берутся
+из первых строк таблиц).
+
+Пример:
+    python benchmark_crud_lookups.py
+    python benchmark_crud_lookups.py --calls 5000
+"""
+import argparse
+import asyncio
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.database import ASYNC_DATABASE_URL, DATABASE_URL, DB_PREPARED_STATEMENT_CACHE_SIZE
+from models.admin import ADMIN_BY_USERNAME, Admin
+from models.admin_settings import AdminSettings  # noqa: F401 - нужна для связи заявки с услугой
+from models.applications import APPLICATION_WITH_SERVICE_BY_ID, Application, _service_loader
+from models.behavior_metrics import METRICS_BY_APPLICATION_ID, METRICS_BY_ID, BehaviorMetrics
+
+
+def measure(call: Callable[[], object], calls: int) -> float:
+    """Среднее время вызова в микросекундах (после прогрева)."""
+    for _ in range(min(100, calls)):
+        call()
+    started = time.perf_counter()
+    for _ in range(calls):
+        call()
+    return (time.perf_counter() - started) / calls * 1_000_000
+
+
+async def measure_async(call, calls: int) -> float:
+    for _ in range(min(100, calls)):
+        await call()
+    started = time.perf_counter()
+    for _ in range(calls):
+        await call()
+    return (time.perf_counter() - started) / calls * 1_000_000
+
+
+def print_row(name: str, before: float, after: float) -> None:
+    print(f"  {name:<34} {before:>9.1f} мкс -> {after:>9.1f} мкс  (экономия {before - after:.1f} мкс на вызов)")
+
+
+def sync_cases(db, keys: Dict) -> List[Tuple[str, Callable, Callable]]:
+    username = keys["username"]
+    application_id = keys["application_id"]
+    metrics_application_id = keys["metrics_application_id"]
+    return [
+        (
+            "Admin по username",
+            lambda: db.query(Admin).filter(Admin.username == username).first(),
+            lambda: db.execute(ADMIN_BY_USERNAME, {"username": username}).scalars().first()
+        ),
+        (
+            "Application с услугой по id",
+            lambda: db.query(Application).options(_service_loader()).filter(Application.id == application_id).first(),
+            lambda: db.execute(APPLICATION_WITH_SERVICE_BY_ID, {"application_id": application_id}).scalars().first()
+        ),
+        (
+            "BehaviorMetrics по application_id",
+            lambda: db.query(BehaviorMetrics).filter(BehaviorMetrics.application_id == metrics_application_id).first(),
+            lambda: db.execute(METRICS_BY_APPLICATION_ID, {"application_id": metrics_application_id}).scalars().first()
+        ),
+    ]
+
+
+def build_only_cases(keys: Dict) -> List[Tuple[str, Callable]]:
+    """Только построение запроса (без БД) - то, что готовые запросы убирают из каждого вызова."""
+    username, application_id = keys["username"], keys["application_id"]
+    return [
+        ("Admin по username", lambda: select(Admin).where(Admin.username == username).limit(1)),
+        (
+            "Application с услугой по id",
+            lambda: select(Application).options(_service_loader()).where(Application.id == application_id).limit(1)
+        ),
+    ]
+
+
+async def run_async(keys: Dict, calls: int) -> None:
+    metrics_id = keys["metrics_id"]
+    prepared_cache_size = DB_PREPARED_STATEMENT_CACHE_SIZE or 100
+    results = {}
+    for cache_size in (0, prepared_cache_size):
+        engine = create_async_engine(
+            ASYNC_DATABASE_URL, connect_args={"prepared_statement_cache_size": cache_size}
+        )
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        async with session_factory() as db:
+            async def per_call_query():
+                return (await db.execute(
+                    select(BehaviorMetrics).where(BehaviorMetrics.id == metrics_id)
+                )).scalars().first()
+
+            async def module_statement():
+                return (await db.execute(METRICS_BY_ID, {"metrics_id": metrics_id})).scalars().first()
+
+            results[cache_size] = (
+                await measure_async(per_call_query, calls),
+                await measure_async(module_statement, calls)
+            )
+        await engine.dispose()
+
+    print("Async (asyncpg), BehaviorMetrics по id:")
+    print_row("без подготовленных запросов", results[0][0], results[0][1])
+    print_row("с подготовленными запросами", results[prepared_cache_size][0], results[prepared_cache_size][1])
+    print(f"  итого: {results[0][0]:.1f} мкс -> {results[prepared_cache_size][1]:.1f} мкс на вызов")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарк выборок CRUD по ключу")
+    parser.add_argument("--calls", type=int, default=2000, help="Вызовов на каждый вариант (по умолчанию 2000)")
+    args = parser.parse_args()
+    calls = max(1, args.calls)
+
+    engine = create_engine(DATABASE_URL)
+    db = sessionmaker(bind=engine)()
+    try:
+        admin = db.query(Admin).first()
+        application_id = db.query(Application.id).order_by(Application.id).limit(1).scalar()
+        metrics = db.query(BehaviorMetrics).order_by(BehaviorMetrics.id).first()
+        if admin is None or application_id is None or metrics is None:
+            print("❌ Нужны хотя бы один администратор, заявка и запись метрик")
+            return 1
+        keys = {
+            "username": admin.username,
+            "application_id": application_id,
+            "metrics_id": metrics.id,
+            "metrics_application_id": metrics.application_id
+        }
+
+        print(f"Вызовов на вариант: {calls}")
+        print("Только построение запроса (без БД):")
+        for name, build in build_only_cases(keys):
+            print(f"  {name:<34} {measure(build, calls):>9.1f} мкс -> {0:>9.1f} мкс")
+
+        print("Sync (psycopg2), полный вызов с запросом к БД:")
+        for name, before, after in sync_cases(db, keys):
+            print_row(name, measure(before, calls), measure(after, calls))
+    finally:
+        db.close()
+        engine.dispose()
+
+    asyncio.run(run_async(keys, calls))
+    print("✅ Готово")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+Бенчмарк проверки паролей: сколько входов в секунду выдерживает одно ядро
+при текущей стоимости bcrypt и как масштабируется пул хеширования.
+БД не нужна - измеряется только bcrypt через тот же пул, что и в /auth/login.
+
+Пример:
+    python benchmark_password_hashing.py
+    python benchmark_password_hashing.py --rounds 10 --workers 4 --logins 200
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from passlib.context import CryptContext
+
+from core.security import (
+    BCRYPT_ROUNDS,
+    PASSWORD_HASH_MAX_PENDING,
+    PASSWORD_HASH_QUEUE_TIMEOUT,
+    PASSWORD_HASH_WORKERS,
+    PasswordHasher,
+    PasswordHashingBusy
+)
+
+PASSWORD = "benchmark-password"
+
+
+async def run_logins(hasher: PasswordHasher, hashed: str, logins: int, concurrency: int) -> int:
+    """Выполняет logins проверок, не больше concurrency одновременно. Возвращает число отказов."""
+    semaphore = asyncio.Semaphore(concurrency)
+    rejected = 0
+
+    async def login() -> None:
+        nonlocal rejected
+        async with semaphore:
+            try:
+                verified, _ = await hasher.verify_and_update_async(PASSWORD, hashed)
+            except PasswordHashingBusy:
+                rejected += 1
+                return
+            assert verified
+
+    await asyncio.gather(*(login() for _ in range(logins)))
+    return rejected
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарк хеширования паролей")
+    parser.add_argument("--rounds", type=int, default=BCRYPT_ROUNDS,
+                        help=f"Стоимость bcrypt (по умолчанию {BCRYPT_ROUNDS})")
+    parser.add_argument("--workers", type=int, default=PASSWORD_HASH_WORKERS,
+                        help=f"Потоков в пуле хеширования (по умолчанию {PASSWORD_HASH_WORKERS})")
+    parser.add_argument("--logins", type=int, default=100,
+                        help="Количество проверок пароля (по умолчанию 100)")
+    parser.add_argument("--concurrency", type=int, default=50,
+                        help="Одновременных входов (по умолчанию 50)")
+    args = parser.parse_args()
+
+    context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=args.rounds)
+    hashed = context.hash(PASSWORD)
+
+    # Стоимость одной проверки без пула
+    samples = 5
+    started = time.perf_counter()
+    for _ in range(samples):
+        context.verify(PASSWORD, hashed)
+    single = (time.perf_counter() - started) / samples
+
+    hasher = PasswordHasher(
+        context,
+        workers=args.workers,
+        max_pending=PASSWORD_HASH_MAX_PENDING,
+        queue_timeout=PASSWORD_HASH_QUEUE_TIMEOUT
+    )
+    started = time.perf_counter()
+    rejected = asyncio.run(run_logins(hasher, hashed, max(1, args.logins), max(1, args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    completed = args.logins - rejected
+    cores = min(hasher.workers, os.cpu_count() or 1)
+    throughput = completed / elapsed if elapsed else 0.0
+    print(f"bcrypt rounds={args.rounds}: одна проверка {single * 1000:.1f} мс "
+          f"(~{1 / single:.1f} входов/с на ядро)")
+    print(f"Пул: {hasher.workers} потоков, ядер: {os.cpu_count()}, одновременных входов: {args.concurrency}")
+    print(f"✅ {completed} входов за {elapsed:.2f} с: {throughput:.1f} входов/с, "
+          f"{throughput / cores:.1f} входов/с на ядро")
+    if rejected:
+        print(f"❌ Отклонено из-за очереди: {rejected}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
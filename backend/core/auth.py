@@ -1,48 +1,75 @@
 """
 Dependencies для аутентификации и авторизации.
+
+Токены самодостаточны: содержат id администратора и версию токенов.
+Проверка сверяет версию со снимком администраторов в памяти воркера,
+поэтому не требует запроса к БД, а отзыв (увеличение версии) действует
+сразу во всех воркерах.
 """
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from core.database import get_db
-from core.security import decode_access_token
+from core.security import TOKEN_TYPE_ACCESS, TOKEN_TYPE_REFRESH, decode_access_token
 from models.admin import Admin, AdminCRUD
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
 def get_current_admin(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> Admin:
     """
     Dependency для получения текущего администратора из JWT токена.
     """
-    token = credentials.credentials
+    return authenticate_token(credentials.credentials)
+
+
+def get_current_admin_for_stream(
+    access_token: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> Admin:
+    """
+    Dependency для долгих потоковых соединений (SSE).
+    EventSource не умеет передавать заголовки, поэтому токен можно передать
+    параметром access_token.
+    """
+    token = credentials.credentials if credentials else access_token
+    if not token:
+        raise _invalid_token()
+    return authenticate_token(token)
+
+
+def _invalid_token(detail: str = "Недействительный токен авторизации") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def authenticate_token(token: str, token_type: str = TOKEN_TYPE_ACCESS) -> Admin:
+    """Проверяет JWT токен заданного типа и возвращает администратора."""
     payload = decode_access_token(token)
-    
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Недействительный токен авторизации",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    username: str = payload.get("sub")
-    if username is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Недействительный токен авторизации",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    admin = AdminCRUD.get_by_username(db=db, username=username)
+
+    if payload is None or payload.get("typ") != token_type:
+        raise _invalid_token()
+
+    admin_id = payload.get("aid")
+    token_version = payload.get("ver")
+    if not isinstance(admin_id, int) or not isinstance(token_version, int):
+        raise _invalid_token()
+
+    admin = AdminCRUD.get_cached_by_id(admin_id=admin_id, min_token_version=token_version)
     if admin is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Администратор не найден",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
+        raise _invalid_token("Администратор не найден")
+
+    if admin.token_version != token_version:
+        raise _invalid_token("Токен отозван")
+
     return admin
 
+
+def authenticate_refresh_token(token: str) -> Admin:
+    """Проверяет токен обновления и возвращает администратора."""
+    return authenticate_token(token, token_type=TOKEN_TYPE_REFRESH)
@@ -0,0 +1,72 @@
+"""
+Кэш процесса со сбросом через PostgreSQL LISTEN/NOTIFY.
+
+Подходит для редко меняющихся справочников: значение загружается один раз,
+а любое изменение в любом воркере отправляет NOTIFY, по которому каждый
+воркер сбрасывает свою копию. При переподключении слушателя кэш сбрасывается,
+так как уведомления могли быть пропущены. С max_age значение дополнительно
+перечитывается не реже указанного интервала (страховка от изменений в обход API).
+"""
+import threading
+import time
+from typing import Callable, Generic, Optional, TypeVar
+
+from core.notifications import listener
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+class NotifyInvalidatedCache(Generic[T]):
+    """
+    Значение, загружаемое loader-ом при первом обращении и сбрасываемое
+    по уведомлению в канале channel (или вызовом invalidate()).
+    """
+
+    def __init__(self, channel: str, loader: Callable[[], T], max_age: Optional[float] = None):
+        self.channel = channel
+        self.max_age = max_age
+        self._loader = loader
+        self._value = _MISSING
+        self._loaded_at = 0.0
+        self._generation = 0
+        # Один загрузчик на процесс, остальные ждут его результата
+        self._load_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        listener.subscribe(channel, self._on_notification)
+
+    def _fresh(self) -> bool:
+        return self.max_age is None or time.monotonic() - self._loaded_at < self.max_age
+
+    def get(self) -> T:
+        value = self._value
+        if value is not _MISSING and self._fresh():
+            return value
+
+        with self._load_lock:
+            value = self._value
+            if value is not _MISSING and self._fresh():
+                return value
+            generation = self._generation
+            loaded_at = time.monotonic()
+            value = self._loader()
+            with self._state_lock:
+                # Если во время загрузки пришел сброс, значение уже могло устареть
+                if generation == self._generation:
+                    self._value = value
+                    self._loaded_at = loaded_at
+            return value
+
+    def peek(self) -> Optional[T]:
+        """Текущее значение без загрузки (None, если кэш пуст)."""
+        value = self._value
+        return None if value is _MISSING else value
+
+    def invalidate(self) -> None:
+        with self._state_lock:
+            self._generation += 1
+            self._value = _MISSING
+
+    def _on_notification(self, payload: Optional[str]) -> None:
+        self.invalidate()
@@ -0,0 +1,123 @@
+"""
+Условные GET-запросы: ETag по дешевой версии таблиц.
+
+Версия таблицы - это max(updated_at), количество строк и сумма xmin строк.
+Она считается одним коротким запросом (один проход по каждой таблице), и при
+совпадении If-None-Match эндпоинт отвечает 304 без основного запроса и
+сериализации.
+
+Одних max(updated_at) и количества мало: UPDATE не меняет количество, а
+транзакции коммитятся не в порядке updated_at - строка со старым updated_at
+может стать видимой после более новой. xmin (id транзакции, создавшей версию
+строки) меняется при каждом изменении строки независимо от порядка коммитов
+и от того, обновлялся ли updated_at, поэтому сумма xmin меняется при любом
+закоммиченном изменении.
+
+Last-Modified для коллекций не отдается: удаление строки не меняет
+max(updated_at), и If-Modified-Since вернул бы устаревший 304. Удаление
+видно только по количеству строк, которое входит в ETag.
+"""
+import hashlib
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Request, Response, status
+from sqlalchemy import BigInteger, Text, cast, func, literal_column, select, true
+from sqlalchemy.orm import Session
+
+
+class ResourceVersion:
+    """
+    Версия набора таблиц: время последнего изменения, количество строк
+    и контрольная сумма версий строк.
+    """
+
+    def __init__(self, parts: List[Tuple[str, Optional[datetime], int, Optional[str]]]):
+        self.parts = parts
+
+    def fingerprint(self) -> str:
+        return ";".join(
+            f"{table}:{count}:{last_modified.isoformat() if last_modified else ''}:{checksum or ''}"
+            for table, last_modified, count, checksum in self.parts
+        )
+
+
+def _table_version(model):
+    """max(updated_at), количество и сумма xmin строк таблицы за один проход."""
+    xmin = cast(cast(literal_column(f"{model.__table__.name}.xmin"), Text), BigInteger)
+    return select(
+        func.max(model.updated_at).label("last_modified"),
+        func.count().label("rows"),
+        func.sum(xmin).label("checksum")
+    ).select_from(model).subquery()
+
+
+def get_resource_version(db: Session, *models) -> ResourceVersion:
+    """Считает версию таблиц моделей (у каждой должна быть колонка updated_at)."""
+    versions = [_table_version(model) for model in models]
+    # Однострочные подзапросы соединяются без условия
+    source = versions[0]
+    for version in versions[1:]:
+        source = source.join(version, true())
+    rows = db.execute(select(*[column for version in versions for column in version.c]).select_from(source)).one()
+
+    parts = []
+    for index, model in enumerate(models):
+        last_modified, count, checksum = rows[index * 3:index * 3 + 3]
+        parts.append((model.__table__.name, last_modified, count, str(checksum) if checksum is not None else None))
+    return ResourceVersion(parts)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Проверяет If-None-Match (список тегов, слабое сравнение)."""
+    if header.strip() == "*":
+        return True
+    target = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == target:
+            return True
+    return False
+
+
+class ConditionalGet:
+    """
+    Валидаторы кэша для ответа.
+
+    variant различает представления одного ресурса (например, параметры запроса).
+    """
+
+    def __init__(self, request: Request, version: ResourceVersion, variant: str = ""):
+        self.request = request
+        self.version = version
+        digest = hashlib.sha1(f"{version.fingerprint()}|{variant}".encode("utf-8")).hexdigest()
+        self.etag = f'W/"{digest}"'
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"ETag": self.etag, "Cache-Control": "no-cache"}
+
+    def is_not_modified(self) -> bool:
+        # If-Modified-Since не учитывается: без Last-Modified валидатор только ETag
+        if_none_match = self.request.headers.get("if-none-match")
+        return if_none_match is not None and _etag_matches(if_none_match, self.etag)
+
+    def not_modified_response(self) -> Response:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=self.headers)
+
+    def apply(self, response: Response) -> Response:
+        """Добавляет ETag к ответу."""
+        response.headers.update(self.headers)
+        return response
+
+
+def conditional_get(request: Request, db: Session, *models) -> ConditionalGet:
+    """Готовит валидаторы кэша для списка по версии таблиц и строке запроса."""
+    return conditional_get_for_version(request, get_resource_version(db, *models))
+
+
+def conditional_get_for_version(request: Request, version: ResourceVersion) -> ConditionalGet:
+    """То же по уже известной версии (например, из кэша процесса), без запроса к БД."""
+    return ConditionalGet(request, version, variant=f"{request.url.path}?{request.url.query}")
@@ -0,0 +1,310 @@
+"""
+Ограничение попыток входа до проверки пароля.
+
+Попытки учитываются скользящим окном отдельно по username и по IP.
+Попытка резервируется атомарно до проверки пароля (проверка порога и учет -
+одна операция бэкенда) и снимается только после успешного входа, поэтому
+параллельная пачка запросов не проходит мимо порога. После
+LOGIN_MAX_FAILURES_PER_* неудач ключ блокируется с экспоненциально растущей
+паузой от последней попытки, и запрос отклоняется (429) еще до bcrypt,
+поэтому перебор паролей не съедает процессор.
+
+Состояние хранится в подключаемом бэкенде: в памяти процесса (по умолчанию)
+или в локальном SQLite-файле, общем для всех воркеров одной машины.
+"""
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from fastapi import Request
+
+LOGIN_THROTTLE_BACKEND = os.getenv("LOGIN_THROTTLE_BACKEND", "memory")
+LOGIN_THROTTLE_SQLITE_PATH = os.getenv("LOGIN_THROTTLE_SQLITE_PATH", "/tmp/autello_login_throttle.sqlite3")
+
+# Окно учета неудачных попыток и пороги блокировки
+LOGIN_THROTTLE_WINDOW_SECONDS = float(os.getenv("LOGIN_THROTTLE_WINDOW_SECONDS", "900"))
+LOGIN_MAX_FAILURES_PER_USERNAME = int(os.getenv("LOGIN_MAX_FAILURES_PER_USERNAME", "5"))
+LOGIN_MAX_FAILURES_PER_IP = int(os.getenv("LOGIN_MAX_FAILURES_PER_IP", "20"))
+
+# Пауза после порога: base * 2^(неудач сверх порога), но не больше max
+LOGIN_BACKOFF_BASE_SECONDS = float(os.getenv("LOGIN_BACKOFF_BASE_SECONDS", "1"))
+LOGIN_BACKOFF_MAX_SECONDS = float(os.getenv("LOGIN_BACKOFF_MAX_SECONDS", "900"))
+
+# Сколько ключей держит бэкенд в памяти (самые старые вытесняются)
+LOGIN_THROTTLE_MAX_KEYS = 100_000
+
+# Пауза по (числу попыток в окне, порогу)
+Backoff = Callable[[int, int], float]
+
+
+class ThrottleBackend(ABC):
+    """
+    Хранилище меток времени попыток входа по ключу.
+    Попытка учитывается до проверки пароля и снимается после успешного входа,
+    поэтому в окне лежат неудачные и еще не завершенные попытки.
+    """
+
+    @abstractmethod
+    def reserve(self, keys: List[Tuple[str, int]], now: float, window: float, backoff: Backoff) -> Optional[Tuple[int, float]]:
+        """
+        Атомарно проверяет ключи (key, порог) и, если ни один не заблокирован,
+        учитывает попытку с меткой now по каждому из них.
+        Возвращает (номер ключа, пауза в секундах) для заблокированного ключа или None.
+        """
+
+    @abstractmethod
+    def release(self, key: str, attempt_at: float) -> None:
+        """Снимает учтенную попытку с меткой attempt_at."""
+
+    @abstractmethod
+    def reset(self, key: str) -> None:
+        """Удаляет все попытки по ключу."""
+
+
+def _blocked_for(failures: int, last_failure: Optional[float], limit: int, now: float, backoff: Backoff) -> float:
+    """Сколько еще ждать ключу с failures попытками в окне (0 - не заблокирован)."""
+    if last_failure is None:
+        return 0.0
+    return last_failure + backoff(failures, limit) - now
+
+
+class MemoryThrottleBackend(ThrottleBackend):
+    """Состояние в памяти процесса: у каждого воркера свои счетчики."""
+
+    def __init__(self, max_keys: int = LOGIN_THROTTLE_MAX_KEYS):
+        self.max_keys = max_keys
+        self._failures: "OrderedDict[str, Deque[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _prune(self, key: str, now: float, window: float) -> Optional[Deque[float]]:
+        timestamps = self._failures.get(key)
+        if timestamps is None:
+            return None
+        while timestamps and timestamps[0] <= now - window:
+            timestamps.popleft()
+        if not timestamps:
+            del self._failures[key]
+            return None
+        return timestamps
+
+    def reserve(self, keys: List[Tuple[str, int]], now: float, window: float, backoff: Backoff) -> Optional[Tuple[int, float]]:
+        with self._lock:
+            for index, (key, limit) in enumerate(keys):
+                timestamps = self._prune(key, now, window)
+                if timestamps is None:
+                    continue
+                wait = _blocked_for(len(timestamps), timestamps[-1], limit, now, backoff)
+                if wait > 0:
+                    return index, wait
+            for key, _ in keys:
+                timestamps = self._failures.get(key)
+                if timestamps is None:
+                    timestamps = self._failures[key] = deque()
+                timestamps.append(now)
+                self._failures.move_to_end(key)
+            while len(self._failures) > self.max_keys:
+                self._failures.popitem(last=False)
+            return None
+
+    def release(self, key: str, attempt_at: float) -> None:
+        with self._lock:
+            timestamps = self._failures.get(key)
+            if timestamps is None:
+                return
+            try:
+                timestamps.remove(attempt_at)
+            except ValueError:
+                return
+            if not timestamps:
+                del self._failures[key]
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._failures.pop(key, None)
+
+
+class SQLiteThrottleBackend(ThrottleBackend):
+    """
+    Состояние в локальном SQLite-файле (WAL): воркеры одной машины
+    видят общие счетчики без обращения к PostgreSQL.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS login_failures (key TEXT NOT NULL, ts REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_login_failures_key_ts ON login_failures (key, ts)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def reserve(self, keys: List[Tuple[str, int]], now: float, window: float, backoff: Backoff) -> Optional[Tuple[int, float]]:
+        connection = self._connect()
+        # BEGIN IMMEDIATE берет блокировку записи: проверка и учет атомарны между воркерами
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for index, (key, limit) in enumerate(keys):
+                connection.execute("DELETE FROM login_failures WHERE key = ? AND ts <= ?", (key, now - window))
+                failures, last_failure = connection.execute(
+                    "SELECT count(*), max(ts) FROM login_failures WHERE key = ?", (key,)
+                ).fetchone()
+                wait = _blocked_for(failures, last_failure, limit, now, backoff)
+                if wait > 0:
+                    connection.execute("COMMIT")
+                    return index, wait
+            connection.executemany(
+                "INSERT INTO login_failures (key, ts) VALUES (?, ?)", [(key, now) for key, _ in keys]
+            )
+            connection.execute("COMMIT")
+            return None
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def release(self, key: str, attempt_at: float) -> None:
+        self._connect().execute(
+            "DELETE FROM login_failures WHERE rowid = "
+            "(SELECT rowid FROM login_failures WHERE key = ? AND ts = ? LIMIT 1)",
+            (key, attempt_at)
+        )
+
+    def reset(self, key: str) -> None:
+        self._connect().execute("DELETE FROM login_failures WHERE key = ?", (key,))
+
+
+def create_throttle_backend(name: str = LOGIN_THROTTLE_BACKEND) -> ThrottleBackend:
+    """Создает бэкенд по имени из LOGIN_THROTTLE_BACKEND."""
+    if name == "memory":
+        return MemoryThrottleBackend()
+    if name == "sqlite":
+        return SQLiteThrottleBackend(LOGIN_THROTTLE_SQLITE_PATH)
+    raise ValueError(f"Неизвестный бэкенд ограничения входа: {name}")
+
+
+@dataclass
+class ThrottleDecision:
+    """
+    Результат проверки: можно ли проверять пароль, и сколько ждать, если нет.
+    attempt_at - метка зарезервированной попытки (снимается при успешном входе).
+    """
+    allowed: bool
+    retry_after: int = 0
+    scope: Optional[str] = None
+    attempt_at: Optional[float] = None
+
+
+class LoginThrottle:
+    """Проверка и учет попыток входа по username и IP."""
+
+    COUNTERS = (
+        "attempts",
+        "succeeded",
+        "failed",
+        "unknown_username",
+        "rejected_username",
+        "rejected_ip",
+    )
+
+    def __init__(
+        self,
+        backend: ThrottleBackend,
+        window: float = LOGIN_THROTTLE_WINDOW_SECONDS,
+        max_failures_per_username: int = LOGIN_MAX_FAILURES_PER_USERNAME,
+        max_failures_per_ip: int = LOGIN_MAX_FAILURES_PER_IP,
+        backoff_base: float = LOGIN_BACKOFF_BASE_SECONDS,
+        backoff_max: float = LOGIN_BACKOFF_MAX_SECONDS
+    ):
+        self.backend = backend
+        self.window = window
+        self.limits = {"username": max_failures_per_username, "ip": max_failures_per_ip}
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._counters: Dict[str, int] = {name: 0 for name in self.COUNTERS}
+        self._counters_lock = threading.Lock()
+
+    @staticmethod
+    def _keys(username: str, ip: Optional[str]) -> List[Tuple[str, str]]:
+        keys = [("username", f"user:{username.strip().lower()}")]
+        if ip:
+            keys.append(("ip", f"ip:{ip}"))
+        return keys
+
+    def _count(self, name: str) -> None:
+        with self._counters_lock:
+            self._counters[name] += 1
+
+    def backoff(self, failures: int, limit: int) -> float:
+        """Пауза после failures неудач при пороге limit (0 - без паузы)."""
+        if failures < limit:
+            return 0.0
+        return min(self.backoff_base * (2 ** (failures - limit)), self.backoff_max)
+
+    def check(self, username: str, ip: Optional[str]) -> ThrottleDecision:
+        """
+        Проверяет попытку входа до проверки пароля и, если она разрешена,
+        сразу учитывает ее как неудачную (до record_success).
+        """
+        self._count("attempts")
+        now = time.time()
+        scopes = self._keys(username, ip)
+        blocked = self.backend.reserve(
+            [(key, self.limits[scope]) for scope, key in scopes], now, self.window, self.backoff
+        )
+        if blocked is not None:
+            index, wait = blocked
+            scope = scopes[index][0]
+            self._count(f"rejected_{scope}")
+            return ThrottleDecision(allowed=False, retry_after=max(1, int(wait + 0.999)), scope=scope)
+        return ThrottleDecision(allowed=True, attempt_at=now)
+
+    def record_failure(self, username: str, ip: Optional[str], unknown_username: bool = False) -> None:
+        """Неудачный вход: попытка уже учтена в check, обновляются только счетчики."""
+        self._count("failed")
+        if unknown_username:
+            self._count("unknown_username")
+
+    def record_success(self, username: str, ip: Optional[str], decision: ThrottleDecision) -> None:
+        """
+        Успешный вход сбрасывает счетчик по username,
+        по IP снимается только попытка этого входа.
+        """
+        self._count("succeeded")
+        user_key, *other_keys = self._keys(username, ip)
+        self.backend.reset(user_key[1])
+        for _, key in other_keys:
+            self.backend.release(key, decision.attempt_at)
+
+    def counters(self) -> Dict[str, int]:
+        """Счетчики этого воркера с момента запуска."""
+        with self._counters_lock:
+            return dict(self._counters)
+
+
+def get_client_ip(request: Request) -> Optional[str]:
+    """
+    IP клиента. Бэкенд доступен только через Nginx, который передает
+    адрес в X-Real-IP; без прокси берется адрес соединения.
+    """
+    real_ip = request.headers.get("x-real-ip")
+    if real_ip:
+        return real_ip.strip()
+    return request.client.host if request.client else None
+
+
+login_throttle = LoginThrottle(create_throttle_backend())
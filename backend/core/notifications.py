@@ -0,0 +1,211 @@
+"""
+Межпроцессные уведомления через PostgreSQL LISTEN/NOTIFY.
+
+Каждый воркер uvicorn держит одно отдельное соединение, слушающее нужные
+каналы в фоновом потоке, и раздает полученные сообщения обработчикам.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import psycopg2
+import psycopg2.extensions
+from sqlalchemy import Text, cast, func, literal, null, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from core.database import DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+# Обработчик получает payload уведомления. None означает, что соединение
+# было переустановлено и часть уведомлений могла быть пропущена.
+NotificationHandler = Callable[[Optional[str]], None]
+
+RECONNECT_DELAY_SECONDS = 5.0
+POLL_TIMEOUT_SECONDS = 1.0
+
+
+NOTIFY_SQL = text("SELECT pg_notify(:channel, :payload)")
+
+
+def _notify_params(channel: str, payload: Any) -> Dict[str, str]:
+    if not isinstance(payload, str):
+        payload = json.dumps(payload, ensure_ascii=False, default=str)
+    return {"channel": channel, "payload": payload}
+
+
+def notify(db: Session, channel: str, payload: Any) -> None:
+    """
+    Отправляет уведомление в канал в рамках текущей транзакции.
+    Подписчики получат его только после коммита.
+    """
+    db.execute(NOTIFY_SQL, _notify_params(channel, payload))
+
+
+async def notify_async(db: AsyncSession, channel: str, payload: Any) -> None:
+    """То же, что notify, для асинхронной сессии."""
+    await db.execute(NOTIFY_SQL, _notify_params(channel, payload))
+
+
+def notify_clause(channel: str, payload: Dict[str, Any]):
+    """
+    Выражение pg_notify для RETURNING: уведомление отправляется тем же
+    запросом, что и запись, по одному на каждую затронутую строку.
+    Значения payload - константы или выражения SQL (столбцы строки).
+    """
+    arguments = []
+    for key, value in payload.items():
+        if value is None:
+            value = null()
+        elif not hasattr(value, "__clause_element__") and not hasattr(value, "compile"):
+            value = literal(value)
+        arguments.extend((literal(key), value))
+    return func.pg_notify(channel, cast(func.json_build_object(*arguments), Text))
+
+
+class PgListener:
+    """Фоновый слушатель каналов NOTIFY на отдельном соединении."""
+
+    def __init__(self, dsn: str = DATABASE_URL):
+        self.dsn = dsn
+        self._handlers: Dict[str, List[NotificationHandler]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pending_channels: List[str] = []
+
+    def subscribe(self, channel: str, handler: NotificationHandler) -> None:
+        """Регистрирует обработчик канала (до или после запуска слушателя)."""
+        with self._lock:
+            if channel not in self._handlers:
+                # Поток слушателя выполнит LISTEN на своем соединении
+                self._pending_channels.append(channel)
+            self._handlers.setdefault(channel, []).append(handler)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="pg-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=POLL_TIMEOUT_SECONDS * 2)
+            self._thread = None
+
+    @staticmethod
+    def _listen(connection, channel: str) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f'LISTEN "{channel}"')
+
+    def _dispatch(self, channel: str, payload: Optional[str]) -> None:
+        with self._lock:
+            handlers = list(self._handlers.get(channel, ()))
+        for handler in handlers:
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception("Ошибка в обработчике уведомлений канала %s", channel)
+
+    def _connect(self):
+        connection = psycopg2.connect(self.dsn)
+        connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with self._lock:
+            channels = list(self._handlers)
+            self._pending_channels = []
+        for channel in channels:
+            self._listen(connection, channel)
+        return connection, channels
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                connection, channels = self._connect()
+            except Exception:
+                logger.exception("Не удалось подключиться для LISTEN, повтор через %s с", RECONNECT_DELAY_SECONDS)
+                self._stop.wait(RECONNECT_DELAY_SECONDS)
+                continue
+
+            # Пока соединения не было, уведомления могли потеряться
+            for channel in channels:
+                self._dispatch(channel, None)
+
+            try:
+                while not self._stop.is_set():
+                    with self._lock:
+                        pending, self._pending_channels = self._pending_channels, []
+                    for channel in pending:
+                        self._listen(connection, channel)
+
+                    readable, _, _ = select.select([connection], [], [], POLL_TIMEOUT_SECONDS)
+                    if not readable:
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notification = connection.notifies.pop(0)
+                        self._dispatch(notification.channel, notification.payload)
+            except Exception:
+                logger.exception("Соединение LISTEN разорвано, переподключение")
+                self._stop.wait(RECONNECT_DELAY_SECONDS)
+            finally:
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+
+
+class EventBroadcaster:
+    """
+    Раздача событий из потока слушателя в asyncio-очереди подписчиков
+    (например, открытых SSE-соединений).
+    """
+
+    def __init__(self, max_queue_size: int = 100):
+        self.max_queue_size = max_queue_size
+        self._subscribers: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> Tuple[asyncio.AbstractEventLoop, asyncio.Queue]:
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(maxsize=self.max_queue_size))
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Tuple[asyncio.AbstractEventLoop, asyncio.Queue]) -> None:
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    @staticmethod
+    def _put(queue: asyncio.Queue, event: Any) -> None:
+        # Медленный клиент теряет самые старые события, а не тормозит остальных
+        if queue.full():
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+        queue.put_nowait(event)
+
+    def publish(self, event: Any) -> None:
+        """Потокобезопасно рассылает событие всем подписчикам."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._put, queue, event)
+            except RuntimeError:
+                # Цикл событий подписчика уже закрыт
+                self.unsubscribe((loop, queue))
+
+
+# Единственный слушатель на процесс
+listener = PgListener()
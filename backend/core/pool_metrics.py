@@ -0,0 +1,147 @@
+"""
+Метрики пулов соединений SQLAlchemy.
+
+Счетчики собираются событиями пула (connect / checkout / checkin / invalidate),
+время ожидания соединения - в классе пула, через который проходит каждая выдача.
+Снимок отдается эндпоинтом /admin/metrics, чтобы размер пула подбирать по данным.
+"""
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Верхние границы корзин гистограммы ожидания соединения, мс
+WAIT_BUCKETS_MS: Tuple[float, ...] = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolMetrics:
+    """Счетчики и гистограмма ожидания одного пула (на воркер)."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self._buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._wait_count = 0
+        self._wait_sum = 0.0
+        self._wait_max = 0.0
+
+    def observe_wait(self, seconds: float) -> None:
+        milliseconds = seconds * 1000
+        index = len(WAIT_BUCKETS_MS)
+        for position, bound in enumerate(WAIT_BUCKETS_MS):
+            if milliseconds <= bound:
+                index = position
+                break
+        with self._lock:
+            self._buckets[index] += 1
+            self._wait_count += 1
+            self._wait_sum += milliseconds
+            self._wait_max = max(self._wait_max, milliseconds)
+
+    def _increment(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self, pool) -> Dict:
+        """Текущее состояние пула и накопленные счетчики."""
+        with self._lock:
+            buckets = {f"le_{bound:g}ms": count for bound, count in zip(WAIT_BUCKETS_MS, self._buckets)}
+            buckets["le_inf"] = self._buckets[-1]
+            wait = {
+                "count": self._wait_count,
+                "avg_ms": round(self._wait_sum / self._wait_count, 3) if self._wait_count else 0.0,
+                "max_ms": round(self._wait_max, 3),
+                "buckets": buckets
+            }
+            counters = {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts
+            }
+        state = {}
+        if isinstance(pool, QueuePool):
+            state = {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout()
+            }
+        return {"pool": state, "counters": counters, "wait": wait}
+
+
+class _TimedPoolMixin:
+    """Замеряет время получения соединения из пула (включая ожидание и подключение)."""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics._increment("timeouts")
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.observe_wait(time.perf_counter() - started)
+
+    def recreate(self):
+        # engine.dispose() пересоздает пул - метрики переносятся в новый
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    """QueuePool с замером ожидания соединения."""
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool с замером ожидания соединения."""
+
+
+# Метрики всех пулов процесса по имени
+pool_metrics: Dict[str, Tuple[Engine, PoolMetrics]] = {}
+
+
+def instrument_engine(engine: Engine, name: str) -> PoolMetrics:
+    """Подключает сбор метрик к пулу движка (для async-движка - к его sync_engine)."""
+    metrics = PoolMetrics(name)
+    engine.pool.metrics = metrics
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics._increment("connects")
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics._increment("checkouts")
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        metrics._increment("checkins")
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        metrics._increment("invalidations")
+
+    pool_metrics[name] = (engine, metrics)
+    return metrics
+
+
+def get_pool_metrics() -> Dict[str, Dict]:
+    """Снимок метрик всех пулов процесса."""
+    return {name: metrics.snapshot(engine.pool) for name, (engine, metrics) in pool_metrics.items()}
@@ -0,0 +1,242 @@
+"""
+Бюджеты запросов для тяжелых эндпоинтов (статистика, списки).
+
+Бюджет задает для маршрута два ограничения:
+  - statement_timeout: каждый SQL-запрос в транзакции ограничен
+    SET LOCAL statement_timeout (но не дольше оставшегося бюджета);
+  - wall-clock бюджет на весь запрос: по его истечении сторожевой поток
+    отменяет выполняющиеся запросы сессии (pg_cancel через DBAPI), а новые
+    запросы сессии больше не отправляются.
+
+Превышение отдается как 504, нехватка соединений в пуле - как 503
+(обработчики в main.py). Счетчики по бюджетам - в /admin/metrics.
+"""
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from core.database import engine, replica_engine
+from core.read_replica import open_read_session
+
+logger = logging.getLogger(__name__)
+
+# SQLSTATE query_canceled: statement_timeout или отмена запроса
+QUERY_CANCELED_SQLSTATE = "57014"
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    """Ограничения маршрута: таймаут одного SQL-запроса и время всего HTTP-запроса."""
+    name: str
+    statement_timeout_ms: int
+    wall_clock_seconds: float
+
+
+# Аналитика: полные проходы по заявкам и метрикам
+ANALYTICS_BUDGET = QueryBudget(
+    name="analytics",
+    statement_timeout_ms=int(os.getenv("ANALYTICS_STATEMENT_TIMEOUT_MS", "5000")),
+    wall_clock_seconds=float(os.getenv("ANALYTICS_REQUEST_BUDGET_SECONDS", "10"))
+)
+
+# Списки заявок: страница с фильтрами и сортировкой
+LIST_BUDGET = QueryBudget(
+    name="lists",
+    statement_timeout_ms=int(os.getenv("LIST_STATEMENT_TIMEOUT_MS", "3000")),
+    wall_clock_seconds=float(os.getenv("LIST_REQUEST_BUDGET_SECONDS", "5"))
+)
+
+
+class QueryBudgetExceeded(Exception):
+    """Запрос не уложился в бюджет маршрута."""
+
+    def __init__(self, budget: QueryBudget):
+        self.budget = budget
+        super().__init__(
+            f"Запрос не уложился в {budget.wall_clock_seconds:g} с, попробуйте сузить выборку"
+        )
+
+
+def is_query_canceled(error: Exception) -> bool:
+    """Ошибка БД означает отмену запроса (statement_timeout или бюджет)."""
+    orig = getattr(error, "orig", None)
+    code = getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+    return code == QUERY_CANCELED_SQLSTATE
+
+
+class QueryBudgetMetrics:
+    """Счетчики по бюджетам (на воркер)."""
+
+    COUNTERS = ("requests", "statement_timeouts", "budget_exceeded", "pool_timeouts")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def increment(self, name: str, counter: str) -> None:
+        with self._lock:
+            counters = self._counters.setdefault(name, {key: 0 for key in self.COUNTERS})
+            counters[counter] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {name: dict(counters) for name, counters in self._counters.items()}
+
+
+query_budget_metrics = QueryBudgetMetrics()
+
+
+class RequestBudget:
+    """Бюджет одного HTTP-запроса: дедлайн и соединения, занятые его сессией."""
+
+    def __init__(self, budget: QueryBudget):
+        self.budget = budget
+        self.deadline = time.monotonic() + budget.wall_clock_seconds
+        self.expired = False
+        self.finished = False
+        self._lock = threading.Lock()
+        self._connections: List = []
+
+    def remaining_ms(self) -> int:
+        return int((self.deadline - time.monotonic()) * 1000)
+
+    def check(self) -> None:
+        """Прерывает запрос, если бюджет исчерпан (для долгих циклов в Python)."""
+        if self.expired or time.monotonic() >= self.deadline:
+            self.expired = True
+            raise QueryBudgetExceeded(self.budget)
+
+    def attach(self, connection) -> None:
+        """Новая транзакция сессии: ограничиваем запросы и запоминаем соединение для отмены."""
+        self.check()
+        timeout_ms = max(1, min(self.budget.statement_timeout_ms, self.remaining_ms()))
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout_ms}")
+        proxied = connection.connection
+        with self._lock:
+            proxied.info["request_budget"] = self
+            self._connections.append(proxied.dbapi_connection)
+
+    def release(self, dbapi_connection) -> None:
+        """Соединение вернулось в пул - отменять на нем больше нечего."""
+        with self._lock:
+            if dbapi_connection in self._connections:
+                self._connections.remove(dbapi_connection)
+
+    def expire(self) -> None:
+        """Дедлайн наступил: отменяем выполняющиеся запросы сессии."""
+        with self._lock:
+            if self.finished:
+                return
+            self.expired = True
+            for dbapi_connection in self._connections:
+                try:
+                    dbapi_connection.cancel()
+                except Exception:
+                    logger.exception("Не удалось отменить запрос бюджета %s", self.budget.name)
+
+    def finish(self) -> None:
+        with self._lock:
+            self.finished = True
+            self._connections.clear()
+
+
+class BudgetWatchdog:
+    """Один фоновый поток на воркер, истекающий бюджеты по дедлайнам."""
+
+    def __init__(self):
+        self._heap: List = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, request_budget: RequestBudget) -> None:
+        with self._condition:
+            heapq.heappush(self._heap, (request_budget.deadline, next(self._sequence), request_budget))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="query-budget", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._heap:
+                    self._condition.wait()
+                deadline, _, request_budget = self._heap[0]
+                wait = deadline - time.monotonic()
+                if wait > 0:
+                    self._condition.wait(wait)
+                    continue
+                heapq.heappop(self._heap)
+            if not request_budget.finished:
+                request_budget.expire()
+
+
+budget_watchdog = BudgetWatchdog()
+
+
+@event.listens_for(Session, "after_begin")
+def _apply_request_budget(session, transaction, connection):
+    request_budget = session.info.get("request_budget")
+    if request_budget is not None:
+        request_budget.attach(connection)
+
+
+def _instrument_engine(sync_engine) -> None:
+    """Проверка бюджета перед каждым запросом и отвязка соединения при возврате в пул."""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _check_budget(conn, cursor, statement, parameters, context, executemany):
+        request_budget = conn.info.get("request_budget")
+        if request_budget is not None and request_budget.expired:
+            raise QueryBudgetExceeded(request_budget.budget)
+
+    @event.listens_for(sync_engine, "checkin")
+    def _release_connection(dbapi_connection, connection_record):
+        request_budget = connection_record.info.pop("request_budget", None)
+        if request_budget is not None:
+            request_budget.release(dbapi_connection)
+
+
+_instrument_engine(engine)
+if replica_engine is not None:
+    _instrument_engine(replica_engine)
+
+
+def check_query_budget(db: Session) -> None:
+    """Проверка бюджета в долгих циклах обработки строк."""
+    request_budget = db.info.get("request_budget")
+    if request_budget is not None:
+        request_budget.check()
+
+
+def budgeted_read_db(budget: QueryBudget):
+    """Dependency: сессия чтения (с маршрутизацией на реплику) под бюджетом маршрута."""
+
+    def get_budgeted_db(request: Request):
+        request_budget = RequestBudget(budget)
+        request.state.request_budget = request_budget
+        query_budget_metrics.increment(budget.name, "requests")
+        db = open_read_session()
+        db.info["request_budget"] = request_budget
+        budget_watchdog.schedule(request_budget)
+        try:
+            yield db
+        finally:
+            request_budget.finish()
+            db.close()
+
+    return get_budgeted_db
+
+
+get_analytics_db = budgeted_read_db(ANALYTICS_BUDGET)
+get_list_db = budgeted_read_db(LIST_BUDGET)
@@ -0,0 +1,208 @@
+"""
+Маршрутизация чтений на реплику PostgreSQL.
+
+Эндпоинты только для чтения (списки, статистика, выгрузки) получают сессию
+через get_read_db / get_async_read_db. Такая сессия отправляет SELECT на
+реплику, а любую запись - на основную БД; после первой записи все
+последующие запросы сессии тоже идут на основную БД (read-your-writes).
+
+Отставание реплики проверяется фоновым потоком воркера. Если реплика не
+настроена, отстает больше REPLICA_MAX_LAG_SECONDS или давно не отвечала,
+чтения выполняются на основной БД.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from core.database import async_engine, async_replica_engine, engine, replica_engine
+
+logger = logging.getLogger(__name__)
+
+# Допустимое отставание реплики и период его проверки
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL", "2"))
+
+# Результат проверки старше стольких интервалов считается недостоверным
+REPLICA_LAG_STALE_INTERVALS = 3
+
+# Отставание в секундах. Если все полученные WAL уже применены, реплика
+# догнала основную БД (время последней транзакции при простое не растет).
+# NULL - отставание неизвестно.
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+""")
+
+
+class ReplicaMonitor:
+    """Фоновая проверка отставания реплики и счетчики маршрутизации."""
+
+    COUNTERS = ("replica", "primary", "fallback", "read_your_writes")
+
+    def __init__(
+        self,
+        engine,
+        max_lag: float = REPLICA_MAX_LAG_SECONDS,
+        interval: float = REPLICA_LAG_CHECK_INTERVAL
+    ):
+        self.engine = engine
+        self.max_lag = max_lag
+        self.interval = interval
+        self.lag: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self._counters: Dict[str, int] = {name: 0 for name in self.COUNTERS}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def configured(self) -> bool:
+        return self.engine is not None
+
+    def start(self) -> None:
+        if not self.configured or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="replica-lag", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval * 2)
+            self._thread = None
+
+    def check(self) -> Optional[float]:
+        """Измеряет отставание реплики (None - реплика недоступна)."""
+        try:
+            with self.engine.connect() as connection:
+                lag = connection.execute(REPLICA_LAG_SQL).scalar()
+        except Exception as e:
+            with self._lock:
+                self.lag, self.error = None, str(e)
+                self.checked_at = time.monotonic()
+            logger.warning("Не удалось проверить отставание реплики: %s", e)
+            return None
+        with self._lock:
+            self.lag = float(lag) if lag is not None else None
+            self.error = None if lag is not None else "Отставание реплики неизвестно"
+            self.checked_at = time.monotonic()
+        return self.lag
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.check()
+            self._stop.wait(self.interval)
+
+    def is_usable(self) -> bool:
+        """Можно ли сейчас читать с реплики."""
+        if not self.configured:
+            return False
+        with self._lock:
+            lag, checked_at = self.lag, self.checked_at
+        if lag is None or checked_at is None:
+            return False
+        if time.monotonic() - checked_at > self.interval * REPLICA_LAG_STALE_INTERVALS:
+            return False
+        return lag <= self.max_lag
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def status(self) -> Dict:
+        """Состояние реплики и счетчики маршрутизации этого воркера."""
+        with self._lock:
+            age = time.monotonic() - self.checked_at if self.checked_at is not None else None
+            status = {
+                "configured": self.configured,
+                "lag_seconds": round(self.lag, 3) if self.lag is not None else None,
+                "max_lag_seconds": self.max_lag,
+                "checked_seconds_ago": round(age, 3) if age is not None else None,
+                "error": self.error,
+                "routed": dict(self._counters)
+            }
+        status["usable"] = self.is_usable()
+        return status
+
+
+replica_monitor = ReplicaMonitor(replica_engine)
+
+
+def _is_read(clause) -> bool:
+    """SELECT без FOR UPDATE можно выполнить на реплике."""
+    if clause is None or not getattr(clause, "is_select", False):
+        return False
+    return getattr(clause, "_for_update_arg", None) is None
+
+
+class RoutingSession(Session):
+    """
+    Сессия с маршрутизацией по запросу: чтения - на движок из info["replica"],
+    записи и все запросы после первой записи - на основную БД.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica = self.info.get("replica")
+        if replica is None or self.info.get("wrote"):
+            return super().get_bind(mapper=mapper, clause=clause, **kw)
+        if not self._flushing and _is_read(clause):
+            return replica
+        # Первая запись: дальше сессия читает с основной БД, чтобы видеть свои изменения
+        self.info["wrote"] = True
+        replica_monitor.count("read_your_writes")
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+# Фабрики сессий с маршрутизацией; по умолчанию связаны с основной БД
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=RoutingSession)
+AsyncReadSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False, sync_session_class=RoutingSession
+)
+
+
+def _route(db: Session, replica) -> None:
+    """Решает, читает ли сессия с реплики, и учитывает решение в счетчиках."""
+    if replica is not None and replica_monitor.is_usable():
+        db.info["replica"] = replica
+        replica_monitor.count("replica")
+    elif replica_monitor.configured:
+        replica_monitor.count("fallback")
+    else:
+        replica_monitor.count("primary")
+
+
+def open_read_session() -> Session:
+    """Сессия для чтения вне dependency (например, потоковая выгрузка)."""
+    db = ReadSessionLocal()
+    _route(db, replica_engine)
+    return db
+
+
+def get_read_db():
+    """
+    Dependency для эндпоинтов только для чтения: SELECT идут на реплику,
+    если она настроена и не отстает.
+    """
+    db = open_read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db():
+    """То же, что get_read_db, для async endpoints."""
+    async with AsyncReadSessionLocal() as db:
+        _route(db.sync_session, async_replica_engine.sync_engine if async_replica_engine else None)
+        yield db
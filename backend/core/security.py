@@ -1,8 +1,17 @@
 """
 Утилиты для работы с безопасностью: JWT токены и хеширование паролей.
+
+bcrypt занимает сотни миллисекунд процессора, поэтому хеширование выполняется
+в отдельном ограниченном пуле потоков, а не в общем пуле обработчиков:
+всплеск входов не блокирует остальные эндпоинты, а задачи, прождавшие
+в очереди дольше PASSWORD_HASH_QUEUE_TIMEOUT, отклоняются (503).
 """
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional, Tuple, TypeVar
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 import os
@@ -10,36 +19,160 @@ import os
 # Секретный ключ для JWT (в продакшене должен быть в переменных окружения)
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production-please-use-strong-random-key")
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 часа
+# Короткоживущий токен доступа и долгоживущий токен обновления
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+
+# Тип токена в claim "typ": токен обновления нельзя использовать для доступа
+TOKEN_TYPE_ACCESS = "access"
+TOKEN_TYPE_REFRESH = "refresh"
+
+# Стоимость bcrypt; хеши с другой стоимостью пересчитываются при входе
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# Параллельность хеширования (по умолчанию - число ядер), размер очереди
+# и максимальное ожидание в ней
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", "5"))
 
 # Контекст для хеширования паролей
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+T = TypeVar("T")
+
+
+class PasswordHashingBusy(Exception):
+    """Очередь хеширования переполнена или задача ждала слишком долго."""
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__("Сервис перегружен, повторите попытку позже")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """
+    Ограниченный пул для операций bcrypt.
+    Не больше workers хешей одновременно и не больше max_pending задач в очереди.
+    """
+
+    def __init__(self, context: CryptContext, workers: int, max_pending: int, queue_timeout: float):
+        self.context = context
+        self.workers = max(1, workers)
+        self.max_pending = max(0, max_pending)
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._dummy_hash: Optional[str] = None
+        self.rejected = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _reject(self) -> PasswordHashingBusy:
+        with self._lock:
+            self.rejected += 1
+        return PasswordHashingBusy(retry_after=max(1, int(self.queue_timeout)))
+
+    def _submit(self, fn: Callable[..., T], *args) -> "Future[T]":
+        with self._lock:
+            full = self._pending >= self.workers + self.max_pending
+            if not full:
+                self._pending += 1
+        if full:
+            raise self._reject()
+        enqueued_at = time.monotonic()
 
+        def job() -> T:
+            with self._lock:
+                self._pending -= 1
+            # Клиент, скорее всего, уже не ждет - не тратим на него процессор
+            if time.monotonic() - enqueued_at > self.queue_timeout:
+                raise self._reject()
+            return fn(*args)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Проверяет пароль с хешем."""
-    return pwd_context.verify(plain_password, hashed_password)
+        return self._executor.submit(job)
+
+    def _get_dummy_hash(self) -> str:
+        # Хеш с той же стоимостью, что и настоящие: время ответа не выдает,
+        # существует ли пользователь
+        if self._dummy_hash is None:
+            self._dummy_hash = self.context.hash("dummy-password-for-timing")
+        return self._dummy_hash
+
+    def _verify_dummy(self, plain_password: str) -> bool:
+        self.context.verify(plain_password, self._get_dummy_hash())
+        return False
+
+    def warm_up(self) -> None:
+        """Заранее (в фоне) готовит фиктивный хеш, чтобы первый ответ не выделялся."""
+        self._executor.submit(self._get_dummy_hash)
+
+    def hash(self, password: str) -> str:
+        return self._submit(self.context.hash, password).result()
+
+    async def verify_and_update_async(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Проверяет пароль и, если хеш создан с устаревшими параметрами,
+        возвращает новый хеш (иначе None).
+        """
+        return await asyncio.wrap_future(
+            self._submit(self.context.verify_and_update, plain_password, hashed_password)
+        )
+
+    async def verify_dummy_async(self, plain_password: str) -> bool:
+        """Проверка против фиктивного хеша для неизвестного пользователя (всегда False)."""
+        return await asyncio.wrap_future(self._submit(self._verify_dummy, plain_password))
+
+
+password_hasher = PasswordHasher(
+    pwd_context,
+    workers=PASSWORD_HASH_WORKERS,
+    max_pending=PASSWORD_HASH_MAX_PENDING,
+    queue_timeout=PASSWORD_HASH_QUEUE_TIMEOUT
+)
 
 
 def get_password_hash(password: str) -> str:
-    """Хеширует пароль."""
-    return pwd_context.hash(password)
+    """Хеширует пароль (в пуле хеширования, блокирует вызывающий поток)."""
+    return password_hasher.hash(password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Проверяет пароль без блокировки цикла событий; второй элемент - новый хеш при смене стоимости."""
+    return await password_hasher.verify_and_update_async(plain_password, hashed_password)
+
+
+async def verify_unknown_user_password(plain_password: str) -> bool:
+    """Тратит на неизвестного пользователя столько же времени, сколько на настоящую проверку."""
+    return await password_hasher.verify_dummy_async(plain_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """Создает JWT токен."""
+    """Создает JWT токен доступа."""
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    to_encode.setdefault("typ", TOKEN_TYPE_ACCESS)
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
+def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    """Создает JWT токен обновления."""
+    return create_access_token(
+        {**data, "typ": TOKEN_TYPE_REFRESH},
+        expires_delta or timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    )
+
+
 def decode_access_token(token: str) -> Optional[dict]:
-    """Декодирует JWT токен."""
+    """Декодирует JWT токен (подпись и срок действия)."""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload
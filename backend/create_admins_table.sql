@@ -1,15 +0,0 @@
--- SQL скрипт для создания таблицы admins
--- Выполните этот скрипт, если таблица не создалась автоматически
-
-CREATE TABLE IF NOT EXISTS admins (
-    id SERIAL PRIMARY KEY,
-    username VARCHAR(255) UNIQUE NOT NULL,
-    email VARCHAR(255) UNIQUE NOT NULL,
-    hashed_password VARCHAR(255) NOT NULL,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-);
-
--- Создаем индексы для быстрого поиска
-CREATE INDEX IF NOT EXISTS idx_admins_username ON admins(username);
-CREATE INDEX IF NOT EXISTS idx_admins_email ON admins(email);
-
@@ -10,8 +10,10 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from sqlalchemy.orm import Session
 from core.database import SessionLocal
 # Импортируем все модели для корректной работы relationships
+from models import admin as admin_model
 from models import admin_settings as admin_settings_model
 from models.applications import Application, ApplicationCreate, ApplicationCRUD
+from models.scoring_rules import refresh_scoring_engine
 from models.temperature_analysis import calculate_temperature_score
 
 # Тестовые данные для создания заявок
@@ -160,6 +162,7 @@ def create_test_applications():
     
     try:
         print("Создание тестовых заявок...")
+        refresh_scoring_engine(db)
         created_count = 0
         
         for app_data in test_applications:
@@ -0,0 +1,72 @@
+"""
+Скрипт для массового импорта заявок из CSV или NDJSON.
+
+Пример:
+    python import_applications.py leads.csv
+    python import_applications.py export.ndjson --batch-size 10000
+"""
+import argparse
+import sys
+import time
+
+from core.database import SessionLocal
+# Импортируем все модели для корректной работы relationships
+from models import admin as admin_model
+from models import admin_settings as admin_settings_model
+from models.application_import import (
+    DEFAULT_BATCH_SIZE,
+    SUPPORTED_FORMATS,
+    detect_format,
+    import_applications
+)
+from models.scoring_rules import refresh_scoring_engine
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Массовый импорт заявок")
+    parser.add_argument("path", help="Путь к файлу CSV или NDJSON")
+    parser.add_argument("--format", dest="file_format", choices=SUPPORTED_FORMATS,
+                        help="Формат файла (по умолчанию определяется по расширению)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Размер пачки для валидации и COPY (по умолчанию {DEFAULT_BATCH_SIZE})")
+    args = parser.parse_args()
+
+    file_format = args.file_format or detect_format(args.path)
+    if file_format is None:
+        print("❌ Не удалось определить формат файла, укажите --format")
+        return 1
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        # Скрипт работает без слушателя NOTIFY - берем активные правила явно
+        engine = refresh_scoring_engine(db)
+        print(f"Версия правил оценки: {engine.version}")
+        with open(args.path, encoding="utf-8-sig", newline="") as stream:
+            result = import_applications(
+                db=db, stream=stream, file_format=file_format, batch_size=args.batch_size
+            )
+    except Exception as e:
+        print(f"❌ Ошибка при импорте: {e}")
+        return 1
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - started
+
+    print(f"✅ Импортировано {result.imported} из {result.total_rows} строк за {elapsed:.2f} с "
+          f"({result.total_rows / elapsed if elapsed > 0 else 0:.0f} строк/с)")
+    print(f"   🔥 Горячих: {result.by_temperature['hot']}")
+    print(f"   🌡️  Теплых: {result.by_temperature['medium']}")
+    print(f"   ❄️  Холодных: {result.by_temperature['cold']}")
+
+    if result.failed:
+        print(f"\n⚠️  Строк с ошибками: {result.failed}")
+        for error in result.errors:
+            print(f"   строка {error.row}: {'; '.join(error.errors)}")
+        if result.errors_truncated:
+            print("   ... (показаны не все ошибки)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,25 +2,53 @@
 Основное приложение FastAPI для работы с заявками клиентов.
 Приложение приватное и доступно только внутри контура машины.
 """
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from core.database import engine, Base
-from routes import applications, behavior_metrics, admin_settings, auth, admin_panel
+from fastapi.responses import JSONResponse
+from sqlalchemy import exc as sa_exc
+from core.database import async_engine, async_replica_engine
+from core.notifications import listener
+from core.query_budget import QueryBudgetExceeded, is_query_canceled, query_budget_metrics
+from core.read_replica import replica_monitor
+from core.security import PasswordHashingBusy, password_hasher
+from routes import applications, behavior_metrics, admin_settings, auth, admin_panel, work_queues, scoring_rules
 
-# Импортируем все модели для корректного создания таблиц и связей
+# Импортируем все модели для корректной настройки связей.
+# Схема БД создается и меняется миграциями (python migrate.py), а не при запуске.
 from models import applications as applications_model
 from models import behavior_metrics as behavior_metrics_model
 from models import admin_settings as admin_settings_model
 from models import admin as admin_model
+from models import scoring_rules as scoring_rules_model
+from models import application_archive as application_archive_model
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Запуск и остановка фоновых компонентов воркера."""
+    # Активные правила оценки; дальнейшие смены приходят через NOTIFY
+    scoring_rules_model.refresh_scoring_engine()
+    # Фиктивный хеш для проверки входа неизвестных пользователей
+    password_hasher.warm_up()
+    # Слушатель LISTEN/NOTIFY: события заявок и межпроцессная инвалидация
+    listener.start()
+    # Проверка отставания реплики (если она настроена)
+    replica_monitor.start()
+    yield
+    replica_monitor.stop()
+    listener.stop()
+    await async_engine.dispose()
+    if async_replica_engine is not None:
+        await async_replica_engine.dispose()
 
-# Создаем все таблицы в базе данных
-Base.metadata.create_all(bind=engine)
 
 # Создаем экземпляр FastAPI приложения
 app = FastAPI(
     title="Autello Backend API",
     description="Приватный API для работы с заявками клиентов",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Настройка CORS - только для внутреннего использования
@@ -32,12 +60,64 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(PasswordHashingBusy)
+async def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusy):
+    """Очередь хеширования паролей переполнена - просим повторить позже."""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
+def _budget_name(request: Request) -> str:
+    request_budget = getattr(request.state, "request_budget", None)
+    return request_budget.budget.name if request_budget is not None else "default"
+
+
+def _gateway_timeout(detail: str) -> JSONResponse:
+    return JSONResponse(status_code=status.HTTP_504_GATEWAY_TIMEOUT, content={"detail": detail})
+
+
+@app.exception_handler(QueryBudgetExceeded)
+async def query_budget_exceeded_handler(request: Request, exc: QueryBudgetExceeded):
+    """Запрос не уложился в бюджет маршрута."""
+    query_budget_metrics.increment(exc.budget.name, "budget_exceeded")
+    return _gateway_timeout(str(exc))
+
+
+@app.exception_handler(sa_exc.DBAPIError)
+async def query_canceled_handler(request: Request, exc: sa_exc.DBAPIError):
+    """Запрос отменен PostgreSQL (statement_timeout или бюджет); прочие ошибки БД - как раньше."""
+    if not is_query_canceled(exc):
+        raise exc
+    request_budget = getattr(request.state, "request_budget", None)
+    if request_budget is not None and request_budget.expired:
+        query_budget_metrics.increment(request_budget.budget.name, "budget_exceeded")
+        return _gateway_timeout(str(QueryBudgetExceeded(request_budget.budget)))
+    query_budget_metrics.increment(_budget_name(request), "statement_timeouts")
+    return _gateway_timeout("Запрос к базе данных выполнялся слишком долго")
+
+
+@app.exception_handler(sa_exc.TimeoutError)
+async def pool_timeout_handler(request: Request, exc: sa_exc.TimeoutError):
+    """Все соединения пула заняты дольше DB_POOL_TIMEOUT - просим повторить позже."""
+    query_budget_metrics.increment(_budget_name(request), "pool_timeouts")
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "База данных перегружена, повторите запрос позже"},
+        headers={"Retry-After": "1"}
+    )
+
+
 # Подключаем роуты
 app.include_router(applications.router)
 app.include_router(behavior_metrics.router)
 app.include_router(admin_settings.router)
 app.include_router(auth.router)
 app.include_router(admin_panel.router)
+app.include_router(work_queues.router)
+app.include_router(scoring_rules.router)
 
 
 @app.get("/")
@@ -0,0 +1,98 @@
+"""
+Скрипт для применения миграций схемы БД (Alembic).
+Запускается один раз на деплой до старта воркеров: воркеры схему не трогают.
+
+База, созданная раньше через create_all (без таблицы alembic_version),
+помечается исходной ревизией - схемой до перехода на миграции, - после чего
+последующие ревизии добавляют недостающие колонки и таблицы и заполняют
+данные. Ревизии идемпотентны, поэтому базы, где уже запускались прежние
+скрипты migrate_*.py, тоже обновляются.
+
+Пример:
+    python migrate.py
+    python migrate.py --sql    # только вывести SQL, без подключения к БД
+"""
+import argparse
+import os
+import sys
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect, pool, text
+
+from core.database import DATABASE_URL, Base
+
+# Импортируем все модели, чтобы их таблицы попали в метаданные
+from models import applications, behavior_metrics, admin_settings, admin, scoring_rules, application_archive  # noqa: F401
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Ревизия, соответствующая схеме до перехода на миграции, и ее таблицы
+BASELINE_REVISION = "0001"
+BASELINE_TABLES = ("admin_settings", "admins", "behavior_metrics", "applications")
+
+# Не даем двум одновременно запущенным migrate.py применять миграции параллельно
+MIGRATIONS_ADVISORY_LOCK_KEY = 7_401_002
+
+
+def alembic_config() -> Config:
+    config = Config(os.path.join(BASE_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BASE_DIR, "migrations"))
+    return config
+
+
+def schema_differences(connection):
+    """Отличия схемы после миграций от моделей (лишние объекты в БД не мешают)."""
+    context = MigrationContext.configure(connection, opts={"compare_type": True})
+    differences = compare_metadata(context, Base.metadata)
+    return [
+        difference for difference in differences
+        if not (isinstance(difference, tuple) and difference[0].startswith("remove_"))
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Применение миграций схемы БД")
+    parser.add_argument("--sql", action="store_true", help="Вывести SQL миграций без подключения к БД")
+    args = parser.parse_args()
+
+    config = alembic_config()
+    if args.sql:
+        command.upgrade(config, "head", sql=True)
+        return 0
+
+    engine = create_engine(DATABASE_URL, poolclass=pool.NullPool)
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATIONS_ADVISORY_LOCK_KEY})
+            config.attributes["connection"] = connection
+
+            tables = set(inspect(connection).get_table_names())
+            if "alembic_version" not in tables and "applications" in tables:
+                missing = [table for table in BASELINE_TABLES if table not in tables]
+                if missing:
+                    print(f"❌ В БД нет таблиц исходной ревизии ({', '.join(missing)}), пометить ее нельзя")
+                    return 1
+                command.stamp(config, BASELINE_REVISION)
+                print(f"✅ Существующая схема помечена ревизией {BASELINE_REVISION}")
+
+            command.upgrade(config, "head")
+            revision = MigrationContext.configure(connection).get_current_revision()
+            differences = schema_differences(connection)
+        if differences:
+            print("⚠️  Схема БД после миграций отличается от моделей:")
+            for difference in differences:
+                print(f"   {difference}")
+        print(f"✅ Схема БД в актуальном состоянии (ревизия {revision})")
+        return 0
+    except Exception as e:
+        print(f"❌ Ошибка при применении миграций: {e}")
+        return 1
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Исходная схема
+
+Таблицы и индексы до перехода на миграции - то, что создавал create_all
+(с учетом прежних скриптов migrate_applications.py и
+alter_behavior_metrics_table.py). Существующая база без alembic_version
+помечается этой ревизией, дальнейшие изменения схемы и заполнение данных
+выполняют следующие ревизии.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 18:38:41.980767
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('admin_settings',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('services', sa.String(), nullable=True),
+    sa.Column('budget_range', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_admin_settings_id'), 'admin_settings', ['id'], unique=False)
+    op.create_table('admins',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(length=255), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('hashed_password', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_admins_email'), 'admins', ['email'], unique=True)
+    op.create_index(op.f('ix_admins_id'), 'admins', ['id'], unique=False)
+    op.create_index(op.f('ix_admins_username'), 'admins', ['username'], unique=True)
+    op.create_table('behavior_metrics',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('application_id', sa.Integer(), nullable=True),
+    sa.Column('time_on_page', sa.Float(), nullable=True),
+    sa.Column('buttons_clicked', sa.String(), nullable=True),
+    sa.Column('cursor_positions', sa.String(), nullable=True),
+    sa.Column('return_frequency', sa.Integer(), nullable=True),
+    sa.Column('page_views', sa.Integer(), nullable=True),
+    sa.Column('scroll_depth', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_behavior_metrics_id'), 'behavior_metrics', ['id'], unique=False)
+    op.create_table('applications',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('service_id', sa.Integer(), nullable=True),
+    sa.Column('first_name', sa.String(length=255), nullable=False),
+    sa.Column('last_name', sa.String(length=255), nullable=False),
+    sa.Column('phone', sa.String(length=255), nullable=True),
+    sa.Column('email', sa.String(length=255), nullable=True),
+    sa.Column('comments', sa.Text(), nullable=True),
+    sa.Column('business_niche', sa.String(length=255), nullable=True),
+    sa.Column('company_size', sa.String(length=50), nullable=True),
+    sa.Column('task_volume', sa.String(length=50), nullable=True),
+    sa.Column('role', sa.String(length=255), nullable=True),
+    sa.Column('deadline', sa.String(length=255), nullable=True),
+    sa.Column('budget', sa.Numeric(precision=15, scale=2), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['service_id'], ['admin_settings.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_applications_id'), 'applications', ['id'], unique=False)
+    op.create_index(op.f('ix_applications_service_id'), 'applications', ['service_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_applications_service_id'), table_name='applications')
+    op.drop_index(op.f('ix_applications_id'), table_name='applications')
+    op.drop_table('applications')
+    op.drop_index(op.f('ix_behavior_metrics_id'), table_name='behavior_metrics')
+    op.drop_table('behavior_metrics')
+    op.drop_index(op.f('ix_admins_username'), table_name='admins')
+    op.drop_index(op.f('ix_admins_id'), table_name='admins')
+    op.drop_index(op.f('ix_admins_email'), table_name='admins')
+    op.drop_table('admins')
+    op.drop_index(op.f('ix_admin_settings_id'), table_name='admin_settings')
+    op.drop_table('admin_settings')
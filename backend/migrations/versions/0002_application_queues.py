@@ -0,0 +1,111 @@
+"""
+Очереди отделов
+
+Хранимая классификация заявок (балл, температура, отдел), поля захвата
+заявки менеджером и индексы очередей. Классификация существующих заявок
+рассчитывается встроенными правилами оценки (бывший migrate_application_queues.py).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 19:05:12.410233
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from models.temperature_analysis import BUILTIN_RULES_VERSION, DEFAULT_SCORING_RULES, compile_scoring_rules
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+# IF NOT EXISTS: в базах, где уже запускался прежний скрипт, объекты есть
+MIGRATION_SQL = """
+ALTER TABLE applications ADD COLUMN IF NOT EXISTS temperature_score INTEGER;
+ALTER TABLE applications ADD COLUMN IF NOT EXISTS temperature VARCHAR(20);
+ALTER TABLE applications ADD COLUMN IF NOT EXISTS department VARCHAR(255);
+ALTER TABLE applications ADD COLUMN IF NOT EXISTS status VARCHAR(20) NOT NULL DEFAULT 'new';
+ALTER TABLE applications ADD COLUMN IF NOT EXISTS claimed_by INTEGER REFERENCES admins(id) ON DELETE SET NULL;
+ALTER TABLE applications ADD COLUMN IF NOT EXISTS claimed_at TIMESTAMP WITH TIME ZONE;
+ALTER TABLE applications ADD COLUMN IF NOT EXISTS claim_expires_at TIMESTAMP WITH TIME ZONE;
+
+CREATE INDEX IF NOT EXISTS ix_applications_queue
+    ON applications (department, temperature_score DESC, created_at)
+    WHERE status <> 'closed';
+CREATE INDEX IF NOT EXISTS ix_applications_temperature_score
+    ON applications (temperature_score DESC, created_at DESC);
+"""
+
+BACKFILL_SELECT_SQL = sa.text("""
+    SELECT id, business_niche, company_size, task_volume, role, deadline, budget
+    FROM applications
+    WHERE temperature_score IS NULL AND id > :last_id
+    ORDER BY id
+    LIMIT :limit
+""")
+
+# Одна команда UPDATE на пачку
+BACKFILL_UPDATE_SQL = sa.text("""
+    UPDATE applications AS a
+    SET temperature_score = v.score, temperature = v.temperature, department = v.department
+    FROM unnest(
+        CAST(:ids AS integer[]),
+        CAST(:scores AS integer[]),
+        CAST(:temperatures AS varchar[]),
+        CAST(:departments AS varchar[])
+    ) AS v(id, score, temperature, department)
+    WHERE a.id = v.id
+""")
+
+
+def backfill_classification(connection) -> None:
+    """Рассчитывает классификацию для заявок, где она еще не заполнена."""
+    engine = compile_scoring_rules(DEFAULT_SCORING_RULES, BUILTIN_RULES_VERSION)
+    last_id = 0
+    while True:
+        rows = connection.execute(BACKFILL_SELECT_SQL, {"last_id": last_id, "limit": BACKFILL_BATCH_SIZE}).all()
+        if not rows:
+            break
+        classifications = [
+            engine.score(
+                business_niche=row.business_niche,
+                company_size=row.company_size,
+                task_volume=row.task_volume,
+                role=row.role,
+                deadline=row.deadline,
+                budget=float(row.budget) if row.budget is not None else None
+            )
+            for row in rows
+        ]
+        connection.execute(BACKFILL_UPDATE_SQL, {
+            "ids": [row.id for row in rows],
+            "scores": [score for score, _, _ in classifications],
+            "temperatures": [temperature for _, temperature, _ in classifications],
+            "departments": [department for _, _, department in classifications]
+        })
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    op.execute(MIGRATION_SQL)
+    # В режиме --sql выводится только схема: классификация считается в Python
+    if op.get_context().as_sql:
+        return
+    backfill_classification(op.get_bind())
+
+
+def downgrade() -> None:
+    op.execute("""
+    DROP INDEX IF EXISTS ix_applications_temperature_score;
+    DROP INDEX IF EXISTS ix_applications_queue;
+    ALTER TABLE applications
+        DROP COLUMN IF EXISTS claim_expires_at,
+        DROP COLUMN IF EXISTS claimed_at,
+        DROP COLUMN IF EXISTS claimed_by,
+        DROP COLUMN IF EXISTS status,
+        DROP COLUMN IF EXISTS department,
+        DROP COLUMN IF EXISTS temperature,
+        DROP COLUMN IF EXISTS temperature_score;
+    """)
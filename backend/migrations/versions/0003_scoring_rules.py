@@ -0,0 +1,46 @@
+"""
+Версионированные правила оценки
+
+Таблица scoring_rule_sets и версия правил, по которой оценена заявка
+(бывший migrate_scoring_rules.py). Существующие заявки остаются с пустой
+версией: разбивку и версию заполняет следующая ревизия.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 19:05:12.410233
+"""
+from alembic import op
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS scoring_rule_sets (
+        id SERIAL PRIMARY KEY,
+        version INTEGER NOT NULL UNIQUE,
+        rules JSONB NOT NULL,
+        comment TEXT,
+        is_active BOOLEAN NOT NULL DEFAULT FALSE,
+        created_by INTEGER REFERENCES admins(id) ON DELETE SET NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        activated_at TIMESTAMP WITH TIME ZONE
+    );
+    CREATE INDEX IF NOT EXISTS ix_scoring_rule_sets_id ON scoring_rule_sets (id);
+    CREATE UNIQUE INDEX IF NOT EXISTS ix_scoring_rule_sets_single_active
+        ON scoring_rule_sets (is_active) WHERE is_active;
+
+    ALTER TABLE applications ADD COLUMN IF NOT EXISTS scoring_version INTEGER;
+    CREATE INDEX IF NOT EXISTS ix_applications_scoring_version ON applications (scoring_version);
+    """)
+
+
+def downgrade() -> None:
+    op.execute("""
+    DROP INDEX IF EXISTS ix_applications_scoring_version;
+    ALTER TABLE applications DROP COLUMN IF EXISTS scoring_version;
+    DROP TABLE IF EXISTS scoring_rule_sets;
+    """)
@@ -0,0 +1,130 @@
+"""
+Баллы по критериям оценки
+
+Колонки score_* в applications и их заполнение для существующих заявок
+активным набором правил (или встроенными правилами, если набора нет) -
+бывший migrate_score_breakdown.py. Вместе с разбивкой обновляются
+классификация и scoring_version.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 19:05:12.410233
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from models.temperature_analysis import (
+    BUILTIN_RULES_VERSION,
+    DEFAULT_SCORING_RULES,
+    SCORE_CRITERIA,
+    compile_scoring_rules
+)
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+ACTIVE_RULES_SQL = sa.text("SELECT rules, version FROM scoring_rule_sets WHERE is_active LIMIT 1")
+
+BACKFILL_SELECT_SQL = sa.text("""
+    SELECT id, business_niche, company_size, task_volume, role, deadline, budget
+    FROM applications
+    WHERE score_niche IS NULL AND id > :last_id
+    ORDER BY id
+    LIMIT :limit
+""")
+
+# Одна команда UPDATE на пачку
+BACKFILL_UPDATE_SQL = sa.text("""
+    UPDATE applications AS a
+    SET temperature_score = v.score,
+        temperature = v.temperature,
+        department = v.department,
+        score_niche = v.niche,
+        score_company_size = v.company_size,
+        score_task_volume = v.task_volume,
+        score_role = v.role,
+        score_deadline = v.deadline,
+        score_budget = v.budget,
+        scoring_version = :version
+    FROM unnest(
+        CAST(:ids AS integer[]),
+        CAST(:scores AS integer[]),
+        CAST(:temperatures AS varchar[]),
+        CAST(:departments AS varchar[]),
+        CAST(:niche AS smallint[]),
+        CAST(:company_size AS smallint[]),
+        CAST(:task_volume AS smallint[]),
+        CAST(:role AS smallint[]),
+        CAST(:deadline AS smallint[]),
+        CAST(:budget AS smallint[])
+    ) AS v(id, score, temperature, department, niche, company_size, task_volume, role, deadline, budget)
+    WHERE a.id = v.id
+""")
+
+
+def backfill_breakdown(connection) -> None:
+    """Рассчитывает баллы по критериям для заявок, где их еще нет."""
+    active = connection.execute(ACTIVE_RULES_SQL).first()
+    if active is None:
+        engine = compile_scoring_rules(DEFAULT_SCORING_RULES, BUILTIN_RULES_VERSION)
+    else:
+        engine = compile_scoring_rules(active.rules, active.version)
+
+    last_id = 0
+    while True:
+        rows = connection.execute(BACKFILL_SELECT_SQL, {"last_id": last_id, "limit": BACKFILL_BATCH_SIZE}).all()
+        if not rows:
+            break
+        classifications = [
+            engine.score_with_breakdown(
+                business_niche=row.business_niche,
+                company_size=row.company_size,
+                task_volume=row.task_volume,
+                role=row.role,
+                deadline=row.deadline,
+                budget=float(row.budget) if row.budget is not None else None
+            )
+            for row in rows
+        ]
+        params = {
+            "ids": [row.id for row in rows],
+            "scores": [score for score, _, _, _ in classifications],
+            "temperatures": [temperature for _, temperature, _, _ in classifications],
+            "departments": [department for _, _, department, _ in classifications],
+            "version": engine.version
+        }
+        for index, criterion in enumerate(SCORE_CRITERIA):
+            params[criterion] = [points[index] for _, _, _, points in classifications]
+        connection.execute(BACKFILL_UPDATE_SQL, params)
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    op.execute("""
+    ALTER TABLE applications ADD COLUMN IF NOT EXISTS score_niche SMALLINT;
+    ALTER TABLE applications ADD COLUMN IF NOT EXISTS score_company_size SMALLINT;
+    ALTER TABLE applications ADD COLUMN IF NOT EXISTS score_task_volume SMALLINT;
+    ALTER TABLE applications ADD COLUMN IF NOT EXISTS score_role SMALLINT;
+    ALTER TABLE applications ADD COLUMN IF NOT EXISTS score_deadline SMALLINT;
+    ALTER TABLE applications ADD COLUMN IF NOT EXISTS score_budget SMALLINT;
+    """)
+    # В режиме --sql выводится только схема: баллы считаются в Python
+    if op.get_context().as_sql:
+        return
+    backfill_breakdown(op.get_bind())
+
+
+def downgrade() -> None:
+    op.execute("""
+    ALTER TABLE applications
+        DROP COLUMN IF EXISTS score_budget,
+        DROP COLUMN IF EXISTS score_deadline,
+        DROP COLUMN IF EXISTS score_role,
+        DROP COLUMN IF EXISTS score_task_volume,
+        DROP COLUMN IF EXISTS score_company_size,
+        DROP COLUMN IF EXISTS score_niche;
+    """)
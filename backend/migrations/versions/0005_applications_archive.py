@@ -0,0 +1,57 @@
+"""
+Архив заявок
+
+Таблица applications_archive: те же колонки, что у applications, плюс
+archived_at; без внешних ключей и вторичных индексов.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 19:05:12.410233
+"""
+from alembic import op
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS applications_archive (
+        id INTEGER PRIMARY KEY,
+        service_id INTEGER,
+        first_name VARCHAR(255) NOT NULL,
+        last_name VARCHAR(255) NOT NULL,
+        phone VARCHAR(255),
+        email VARCHAR(255),
+        comments TEXT,
+        business_niche VARCHAR(255),
+        company_size VARCHAR(50),
+        task_volume VARCHAR(50),
+        role VARCHAR(255),
+        deadline VARCHAR(255),
+        budget NUMERIC(15, 2),
+        temperature_score INTEGER,
+        temperature VARCHAR(20),
+        department VARCHAR(255),
+        scoring_version INTEGER,
+        score_niche SMALLINT,
+        score_company_size SMALLINT,
+        score_task_volume SMALLINT,
+        score_role SMALLINT,
+        score_deadline SMALLINT,
+        score_budget SMALLINT,
+        status VARCHAR(20) NOT NULL,
+        claimed_by INTEGER,
+        claimed_at TIMESTAMP WITH TIME ZONE,
+        claim_expires_at TIMESTAMP WITH TIME ZONE,
+        created_at TIMESTAMP WITH TIME ZONE,
+        updated_at TIMESTAMP WITH TIME ZONE,
+        archived_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+    );
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS applications_archive;")
@@ -0,0 +1,91 @@
+"""
+Типизированный каталог услуг
+
+Колонки name, budget_min, budget_max, sort_order, is_active в admin_settings
+и индексы каталога. Существующие услуги заполняются разбором строк
+services / budget_range (бывший migrate_service_catalog.py).
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 19:05:12.410233
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from models.admin_settings import parse_budget_range
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+MIGRATION_SQL = """
+ALTER TABLE admin_settings ADD COLUMN IF NOT EXISTS name VARCHAR(255);
+ALTER TABLE admin_settings ADD COLUMN IF NOT EXISTS budget_min NUMERIC(15, 2);
+ALTER TABLE admin_settings ADD COLUMN IF NOT EXISTS budget_max NUMERIC(15, 2);
+ALTER TABLE admin_settings ADD COLUMN IF NOT EXISTS sort_order INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE admin_settings ADD COLUMN IF NOT EXISTS is_active BOOLEAN NOT NULL DEFAULT TRUE;
+
+CREATE INDEX IF NOT EXISTS ix_admin_settings_name ON admin_settings (name);
+CREATE INDEX IF NOT EXISTS ix_admin_settings_active_order
+    ON admin_settings (sort_order, id) WHERE is_active;
+CREATE INDEX IF NOT EXISTS ix_admin_settings_budget ON admin_settings (budget_min, budget_max);
+"""
+
+BACKFILL_SELECT_SQL = sa.text("""
+    SELECT id, services, budget_range FROM admin_settings
+    WHERE name IS NULL AND budget_min IS NULL AND budget_max IS NULL
+    ORDER BY id
+""")
+
+BACKFILL_UPDATE_SQL = sa.text("""
+    UPDATE admin_settings
+    SET name = :name, budget_min = :budget_min, budget_max = :budget_max, sort_order = :sort_order
+    WHERE id = :id
+""")
+
+
+def backfill_catalog(connection) -> None:
+    """Заполняет типизированные поля из строк services / budget_range."""
+    rows = connection.execute(BACKFILL_SELECT_SQL).all()
+    unparsed = []
+    params = []
+    for row in rows:
+        budget_min, budget_max = parse_budget_range(row.budget_range)
+        if row.budget_range and budget_min is None and budget_max is None:
+            unparsed.append(row)
+        params.append({
+            "id": row.id,
+            "name": row.services,
+            "budget_min": budget_min,
+            "budget_max": budget_max,
+            "sort_order": row.id
+        })
+    if params:
+        connection.execute(BACKFILL_UPDATE_SQL, params)
+    if unparsed:
+        print("⚠️  Не удалось разобрать бюджетный диапазон (заполните вручную):")
+        for row in unparsed:
+            print(f"  - id {row.id}: {row.budget_range!r}")
+
+
+def upgrade() -> None:
+    op.execute(MIGRATION_SQL)
+    # В режиме --sql выводится только схема: диапазоны разбираются в Python
+    if op.get_context().as_sql:
+        return
+    backfill_catalog(op.get_bind())
+
+
+def downgrade() -> None:
+    op.execute("""
+    DROP INDEX IF EXISTS ix_admin_settings_budget;
+    DROP INDEX IF EXISTS ix_admin_settings_active_order;
+    DROP INDEX IF EXISTS ix_admin_settings_name;
+    ALTER TABLE admin_settings
+        DROP COLUMN IF EXISTS is_active,
+        DROP COLUMN IF EXISTS sort_order,
+        DROP COLUMN IF EXISTS budget_max,
+        DROP COLUMN IF EXISTS budget_min,
+        DROP COLUMN IF EXISTS name;
+    """)
@@ -0,0 +1,25 @@
+"""
+Версия токенов администраторов
+
+Колонка admins.token_version (бывший migrate_admin_token_version.py).
+Выданные до нее токены (без id администратора и версии) перестают
+приниматься - администраторам нужно войти заново.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 19:05:12.410233
+"""
+from alembic import op
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE admins ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0;")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE admins DROP COLUMN IF EXISTS token_version;")
@@ -0,0 +1,42 @@
+"""
+Индексы очередей с NULLS LAST
+
+Очередь отдела и списки сортируются по temperature_score DESC NULLS LAST,
+а индексы были построены как temperature_score DESC (в PostgreSQL это
+NULLS FIRST) - планировщик не мог взять порядок из индекса и сортировал.
+Индексы пересоздаются с тем же порядком, что и в запросах.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 19:40:27.118604
+"""
+from alembic import op
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+    DROP INDEX IF EXISTS ix_applications_queue;
+    CREATE INDEX ix_applications_queue
+        ON applications (department, temperature_score DESC NULLS LAST, created_at)
+        WHERE status <> 'closed';
+    DROP INDEX IF EXISTS ix_applications_temperature_score;
+    CREATE INDEX ix_applications_temperature_score
+        ON applications (temperature_score DESC NULLS LAST, created_at DESC);
+    """)
+
+
+def downgrade() -> None:
+    op.execute("""
+    DROP INDEX IF EXISTS ix_applications_queue;
+    CREATE INDEX ix_applications_queue
+        ON applications (department, temperature_score DESC, created_at)
+        WHERE status <> 'closed';
+    DROP INDEX IF EXISTS ix_applications_temperature_score;
+    CREATE INDEX ix_applications_temperature_score
+        ON applications (temperature_score DESC, created_at DESC);
+    """)
@@ -0,0 +1,29 @@
+"""
+id архива без последовательности
+
+id архивной заявки переносится из applications, а таблица создавалась
+с id SERIAL - лишняя последовательность и DEFAULT, который мог бы выдать
+id, пересекающийся с горячей таблицей. Они удаляются.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 20:02:41.537120
+"""
+from alembic import op
+
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+    ALTER TABLE applications_archive ALTER COLUMN id DROP DEFAULT;
+    DROP SEQUENCE IF EXISTS applications_archive_id_seq;
+    """)
+
+
+def downgrade() -> None:
+    # Схема до 0009 создается уже без SERIAL (0005) - возвращать нечего
+    pass
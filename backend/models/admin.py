@@ -1,7 +1,7 @@
 """
 Модель для хранения администраторов системы.
 """
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, text
 from sqlalchemy.sql import func
 from core.database import Base
 
@@ -17,6 +17,7 @@ class Admin(Base):
         username VARCHAR(255) UNIQUE NOT NULL,
         email VARCHAR(255) UNIQUE NOT NULL,
         hashed_password VARCHAR(255) NOT NULL,
+        token_version INTEGER NOT NULL DEFAULT 0,
         created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
     );
     """
@@ -26,13 +27,95 @@ class Admin(Base):
     username = Column(String(255), unique=True, nullable=False, index=True)
     email = Column(String(255), unique=True, nullable=False, index=True)
     hashed_password = Column(String(255), nullable=False)
+    # Версия токенов: токены с другой версией недействительны (отзыв всех сессий)
+    token_version = Column(Integer, nullable=False, default=0, server_default=text("0"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
+import os
+import time
+from dataclasses import dataclass
+from sqlalchemy import bindparam, select, text, update
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 from pydantic import BaseModel, EmailStr, field_validator
+from core.cache import NotifyInvalidatedCache
+from core.database import SessionLocal
+from core.notifications import notify
+
+# Канал NOTIFY об изменении или удалении администратора
+ADMINS_CHANNEL = "admins_changed"
+
+# Неизвестный администратор или более новая версия токена, чем в снимке,
+# перечитывают снимок не чаще, чем раз в указанный интервал
+ADMINS_CACHE_RELOAD_INTERVAL = 1.0
+
+# Снимок перечитывается и без уведомлений - на случай изменений в обход API
+ADMINS_CACHE_MAX_AGE = float(os.getenv("ADMINS_CACHE_MAX_AGE", "300"))
+
+# Ключ pg_advisory_xact_lock для операций, зависящих от количества администраторов
+# (регистрация первого, удаление последнего)
+ADMINS_ADVISORY_LOCK_KEY = 7_401_001
+
+
+# Выборки администратора по ключу, построенные один раз (SQL берется из кэша компиляции)
+ADMIN_BY_ID = select(Admin).where(Admin.id == bindparam("admin_id")).limit(1)
+ADMIN_BY_USERNAME = select(Admin).where(Admin.username == bindparam("username")).limit(1)
+ADMIN_BY_EMAIL = select(Admin).where(Admin.email == bindparam("email")).limit(1)
+
+
+@dataclass(frozen=True)
+class AdminsSnapshot:
+    """Администраторы процесса по id (копии вне сессии) с моментом загрузки."""
+    by_id: Dict[int, Admin]
+    loaded_at: float
+
+
+def _detached_admin(admin: Admin) -> Admin:
+    """Копия администратора вне сессии (общая для всех запросов)."""
+    return Admin(
+        id=admin.id,
+        username=admin.username,
+        email=admin.email,
+        hashed_password=admin.hashed_password,
+        token_version=admin.token_version,
+        created_at=admin.created_at
+    )
+
+
+def _load_admins() -> AdminsSnapshot:
+    db = SessionLocal()
+    try:
+        admins = db.query(Admin).all()
+        return AdminsSnapshot(
+            by_id={admin.id: _detached_admin(admin) for admin in admins},
+            loaded_at=time.monotonic()
+        )
+    finally:
+        db.close()
+
+
+# Администраторов единицы, поэтому каждый воркер держит их всех в памяти:
+# проверка токена сверяет версию без запроса к БД, а любое изменение
+# администратора сбрасывает снимок во всех воркерах через NOTIFY.
+admins_cache: NotifyInvalidatedCache[AdminsSnapshot] = NotifyInvalidatedCache(
+    ADMINS_CHANNEL, _load_admins, max_age=ADMINS_CACHE_MAX_AGE
+)
+
+
+class LastAdminError(Exception):
+    """Удаление оставило бы систему без администраторов."""
+
+
+def _lock_admins(db: Session) -> None:
+    """Сериализует операции, зависящие от количества администраторов (до конца транзакции)."""
+    db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ADMINS_ADVISORY_LOCK_KEY})
+
+
+def _notify_admins_changed(db: Session, event: str, admin_id: int) -> None:
+    """Сообщает всем воркерам об изменении администратора (доставка после коммита)."""
+    notify(db, ADMINS_CHANNEL, {"event": event, "id": admin_id})
 
 
 class AdminCreate(BaseModel):
@@ -110,6 +193,11 @@ class AdminLogin(BaseModel):
     password: str
 
 
+class RefreshTokenRequest(BaseModel):
+    """Схема для обновления пары токенов."""
+    refresh_token: str
+
+
 class AdminCRUD:
     """CRUD операции для модели Admin."""
     
@@ -122,24 +210,58 @@ class AdminCRUD:
             hashed_password=hashed_password
         )
         db.add(db_admin)
+        db.flush()
+        _notify_admins_changed(db, "created", db_admin.id)
         db.commit()
+        admins_cache.invalidate()
         db.refresh(db_admin)
         return db_admin
     
+    @staticmethod
+    def create_first(db: Session, admin_data: AdminCreate, hashed_password: str) -> Optional[Admin]:
+        """
+        Создать первого администратора. Возвращает None, если администраторы уже есть.
+        Одновременные регистрации сериализуются advisory-блокировкой,
+        поэтому создать двух "первых" администраторов нельзя.
+        """
+        _lock_admins(db)
+        if db.query(Admin.id).limit(1).first() is not None:
+            db.rollback()
+            admins_cache.invalidate()
+            return None
+        return AdminCRUD.create(db=db, admin_data=admin_data, hashed_password=hashed_password)
+    
     @staticmethod
     def get_by_id(db: Session, admin_id: int) -> Optional[Admin]:
         """Получить администратора по ID."""
-        return db.query(Admin).filter(Admin.id == admin_id).first()
+        return db.execute(ADMIN_BY_ID, {"admin_id": admin_id}).scalars().first()
+    
+    @staticmethod
+    def get_cached_by_id(admin_id: int, min_token_version: int = 0) -> Optional[Admin]:
+        """
+        Получить администратора из снимка процесса (без запроса к БД).
+        Если администратора нет или его версия токенов меньше min_token_version,
+        снимок мог отстать от NOTIFY - перечитываем его (не чаще раза в секунду).
+        """
+        snapshot = admins_cache.get()
+        admin = snapshot.by_id.get(admin_id)
+        if (
+            (admin is None or admin.token_version < min_token_version)
+            and time.monotonic() - snapshot.loaded_at > ADMINS_CACHE_RELOAD_INTERVAL
+        ):
+            admins_cache.invalidate()
+            admin = admins_cache.get().by_id.get(admin_id)
+        return admin
     
     @staticmethod
     def get_by_username(db: Session, username: str) -> Optional[Admin]:
         """Получить администратора по username."""
-        return db.query(Admin).filter(Admin.username == username).first()
+        return db.execute(ADMIN_BY_USERNAME, {"username": username}).scalars().first()
     
     @staticmethod
     def get_by_email(db: Session, email: str) -> Optional[Admin]:
         """Получить администратора по email."""
-        return db.query(Admin).filter(Admin.email == email).first()
+        return db.execute(ADMIN_BY_EMAIL, {"email": email}).scalars().first()
     
     @staticmethod
     def get_all(db: Session, skip: int = 0, limit: int = 100) -> List[Admin]:
@@ -151,10 +273,15 @@ class AdminCRUD:
         """Получить количество администраторов."""
         return db.query(Admin).count()
     
+    @staticmethod
+    def count_cached() -> int:
+        """Количество администраторов из снимка процесса (без запроса к БД)."""
+        return len(admins_cache.get().by_id)
+    
     @staticmethod
     def update(db: Session, admin_id: int, admin_data: AdminUpdate, hashed_password: Optional[str] = None) -> Optional[Admin]:
         """Обновить администратора."""
-        db_admin = db.query(Admin).filter(Admin.id == admin_id).first()
+        db_admin = db.execute(ADMIN_BY_ID, {"admin_id": admin_id}).scalars().first()
         if not db_admin:
             return None
         
@@ -164,19 +291,69 @@ class AdminCRUD:
         
         if hashed_password:
             db_admin.hashed_password = hashed_password
+            # Смена пароля отзывает все выданные токены
+            db_admin.token_version = Admin.token_version + 1
         
+        _notify_admins_changed(db, "updated", admin_id)
         db.commit()
+        admins_cache.invalidate()
         db.refresh(db_admin)
         return db_admin
     
     @staticmethod
-    def delete(db: Session, admin_id: int) -> bool:
-        """Удалить администратора."""
-        db_admin = db.query(Admin).filter(Admin.id == admin_id).first()
+    def update_password_hash(db: Session, admin: Admin, hashed_password: str) -> Admin:
+        """
+        Заменить хеш пароля тем же паролем (пересчет при смене стоимости bcrypt).
+        Пароль не меняется, поэтому выданные токены остаются действительными.
+        """
+        admin.hashed_password = hashed_password
+        _notify_admins_changed(db, "updated", admin.id)
+        db.commit()
+        admins_cache.invalidate()
+        db.refresh(admin)
+        return admin
+    
+    @staticmethod
+    def delete(db: Session, admin_id: int, keep_last: bool = False) -> bool:
+        """
+        Удалить администратора.
+        С keep_last=True отказывает (LastAdminError), если он последний;
+        проверка и удаление выполняются под advisory-блокировкой.
+        """
+        if keep_last:
+            _lock_admins(db)
+        db_admin = db.execute(ADMIN_BY_ID, {"admin_id": admin_id}).scalars().first()
         if not db_admin:
+            db.rollback()
             return False
+        if keep_last and db.query(Admin).count() <= 1:
+            db.rollback()
+            raise LastAdminError()
         
         db.delete(db_admin)
+        _notify_admins_changed(db, "deleted", admin_id)
         db.commit()
+        admins_cache.invalidate()
         return True
+    
+    @staticmethod
+    def revoke_tokens(db: Session, admin_id: int) -> Optional[int]:
+        """
+        Отозвать все токены администратора (увеличить версию токенов).
+        Возвращает новую версию или None, если администратора нет.
+        """
+        new_version = db.execute(
+            update(Admin)
+            .where(Admin.id == admin_id)
+            .values(token_version=Admin.token_version + 1)
+            .returning(Admin.token_version)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+        if new_version is None:
+            db.rollback()
+            return None
+        _notify_admins_changed(db, "tokens_revoked", admin_id)
+        db.commit()
+        admins_cache.invalidate()
+        return new_version
 
@@ -1,7 +1,7 @@
 """
 Модель для хранения административных настроек приложения.
 """
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Boolean, Column, Index, Integer, Numeric, String, DateTime, text
 from sqlalchemy.sql import func
 from core.database import Base
 
@@ -16,37 +16,163 @@ class AdminSettings(Base):
         id SERIAL PRIMARY KEY,
         services CHARACTER VARYING,
         budget_range CHARACTER VARYING,
+        name VARCHAR(255),
+        budget_min NUMERIC(15, 2),
+        budget_max NUMERIC(15, 2),
+        sort_order INTEGER NOT NULL DEFAULT 0,
+        is_active BOOLEAN NOT NULL DEFAULT TRUE,
         created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
         updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
     );
+    
+    CREATE INDEX ix_admin_settings_active_order
+        ON admin_settings (sort_order, id) WHERE is_active;
+    CREATE INDEX ix_admin_settings_budget ON admin_settings (budget_min, budget_max);
+    CREATE INDEX ix_admin_settings_name ON admin_settings (name);
     """
     __tablename__ = "admin_settings"
 
     id = Column(Integer, primary_key=True, index=True)
+    # Исходные строковые поля (отображаются формой как есть)
     services = Column(String, nullable=True)
     budget_range = Column(String, nullable=True)
     
+    # Типизированный каталог услуг
+    name = Column(String(255), nullable=True, index=True)
+    budget_min = Column(Numeric(15, 2), nullable=True)
+    budget_max = Column(Numeric(15, 2), nullable=True)
+    sort_order = Column(Integer, nullable=False, default=0, server_default="0")
+    is_active = Column(Boolean, nullable=False, default=True, server_default=text("true"))
+    
     # Временные метки
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        # Список услуг формы: активные по порядку
+        Index("ix_admin_settings_active_order", "sort_order", "id", postgresql_where=text("is_active")),
+        # Фильтр по бюджетному диапазону
+        Index("ix_admin_settings_budget", "budget_min", "budget_max"),
+    )
+
 
+import hashlib
+import re
+from decimal import Decimal, InvalidOperation
+from types import SimpleNamespace
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import bindparam, delete, insert, select, update
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
 from datetime import datetime
 from pydantic import BaseModel
+from core.cache import NotifyInvalidatedCache
+from core.database import SessionLocal
+from core.http_cache import ResourceVersion
+from core.notifications import notify_clause
+
+
+# Число с разделителями разрядов и необязательным множителем: "50 000", "1,5 млн", "300к"
+BUDGET_NUMBER_PATTERN = re.compile(
+    r"(\d[\d\s\u00a0]*(?:[.,]\d+)?)\s*(?:(млн|mln|тыс|m|м|k|к)(?![a-zа-я]))?",
+    re.IGNORECASE
+)
+BUDGET_MULTIPLIERS = {
+    "млн": 1000000, "mln": 1000000, "m": 1000000, "м": 1000000,
+    "тыс": 1000, "k": 1000, "к": 1000,
+}
+# Предел колонок budget_min / budget_max (Numeric(15, 2))
+BUDGET_MAX_VALUE = Decimal("9999999999999.99")
+
+
+def _parse_budget_number(number: str, suffix: Optional[str]) -> Optional[Decimal]:
+    try:
+        value = Decimal(re.sub(r"[\s\u00a0]", "", number).replace(",", "."))
+    except InvalidOperation:
+        return None
+    if suffix:
+        value *= BUDGET_MULTIPLIERS[suffix.lower()]
+    return value
+
+
+def _borrows_multiplier(number: str, next_suffix: Optional[str]) -> bool:
+    """
+    "1-2 млн": первое число без множителя берет множитель второго, только
+    если записано без разрядов и меньше этого множителя ("500 000 - 1 млн" -
+    уже полное число).
+    """
+    if not next_suffix:
+        return False
+    number = number.strip()
+    if re.search(r"[\s\u00a0]", number):
+        return False
+    value = _parse_budget_number(number, None)
+    return value is not None and value < BUDGET_MULTIPLIERS[next_suffix.lower()]
+
+
+def parse_budget_range(budget_range: Optional[str]) -> Tuple[Optional[Decimal], Optional[Decimal]]:
+    """
+    Разбирает строковый бюджетный диапазон в (min, max).
+    Поддерживает "50 000 - 100 000 ₽", "от 100 000", "до 50к", "1-2 млн", "500 000+".
+    Нераспознанная строка, min > max или значения вне Numeric(15, 2) дают (None, None).
+    """
+    if not budget_range:
+        return None, None
+    text_lower = budget_range.lower()
+    matches = BUDGET_NUMBER_PATTERN.findall(text_lower)
+    values = []
+    for index, (number, suffix) in enumerate(matches):
+        if not suffix and len(matches) == 2 and index == 0 and _borrows_multiplier(number, matches[1][1]):
+            suffix = matches[1][1]
+        value = _parse_budget_number(number, suffix)
+        if value is not None:
+            values.append(value)
+    if not values or any(value > BUDGET_MAX_VALUE for value in values[:2]):
+        return None, None
+    if len(values) >= 2:
+        if values[0] > values[1]:
+            return None, None
+        return values[0], values[1]
+    if text_lower.strip().startswith("до"):
+        return None, values[0]
+    return values[0], None
+
+
+def _format_budget(value: Decimal) -> str:
+    return f"{int(value):,}".replace(",", " ")
+
+
+def format_budget_range(budget_min: Optional[Decimal], budget_max: Optional[Decimal]) -> Optional[str]:
+    """Строка бюджетного диапазона для отображения по типизированным границам."""
+    if budget_min is not None and budget_max is not None:
+        return f"{_format_budget(budget_min)} - {_format_budget(budget_max)} ₽"
+    if budget_min is not None:
+        return f"от {_format_budget(budget_min)} ₽"
+    if budget_max is not None:
+        return f"до {_format_budget(budget_max)} ₽"
+    return None
 
 
 class AdminSettingsCreate(BaseModel):
     """Схема для создания настроек."""
     services: Optional[str] = None
     budget_range: Optional[str] = None
+    name: Optional[str] = None
+    budget_min: Optional[Decimal] = None
+    budget_max: Optional[Decimal] = None
+    sort_order: int = 0
+    is_active: bool = True
 
 
 class AdminSettingsUpdate(BaseModel):
     """Схема для обновления настроек."""
     services: Optional[str] = None
     budget_range: Optional[str] = None
+    name: Optional[str] = None
+    budget_min: Optional[Decimal] = None
+    budget_max: Optional[Decimal] = None
+    sort_order: Optional[int] = None
+    is_active: Optional[bool] = None
 
 
 class AdminSettingsResponse(BaseModel):
@@ -54,6 +180,11 @@ class AdminSettingsResponse(BaseModel):
     id: int
     services: Optional[str] = None
     budget_range: Optional[str] = None
+    name: Optional[str] = None
+    budget_min: Optional[float] = None
+    budget_max: Optional[float] = None
+    sort_order: int = 0
+    is_active: bool = True
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
@@ -61,51 +192,240 @@ class AdminSettingsResponse(BaseModel):
         from_attributes = True
 
 
+# Канал NOTIFY об изменении справочника услуг
+ADMIN_SETTINGS_CHANNEL = "admin_settings_changed"
+
+
+class ServicesSnapshot:
+    """Снимок справочника услуг в памяти процесса."""
+
+    def __init__(self, items: List[AdminSettingsResponse]):
+        self.items: Tuple[AdminSettingsResponse, ...] = tuple(items)
+        self.active_items: Tuple[AdminSettingsResponse, ...] = tuple(item for item in self.items if item.is_active)
+        self.by_id: Dict[int, AdminSettingsResponse] = {item.id: item for item in self.items}
+        timestamps = [item.updated_at for item in self.items if item.updated_at is not None]
+        # Версия для ETag считается по снимку, без запроса к БД. Снимок
+        # перечитывается целиком после каждого коммита, поэтому контрольная
+        # сумма - по его содержимому
+        checksum = hashlib.sha1(
+            "\n".join(item.model_dump_json() for item in self.items).encode("utf-8")
+        ).hexdigest()
+        self.version = ResourceVersion([
+            (AdminSettings.__table__.name, max(timestamps) if timestamps else None, len(self.items), checksum)
+        ])
+
+    def select(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        active_only: bool = False,
+        budget: Optional[float] = None
+    ) -> List[AdminSettingsResponse]:
+        """Страница услуг снимка с фильтрами active_only и budget."""
+        items = self.active_items if active_only else self.items
+        if budget is not None:
+            items = [
+                item for item in items
+                if (item.budget_min is None or item.budget_min <= budget)
+                and (item.budget_max is None or budget <= item.budget_max)
+            ]
+        return list(items[skip:skip + limit])
+
+
+def _load_services() -> ServicesSnapshot:
+    db = SessionLocal()
+    try:
+        rows = db.query(AdminSettings).order_by(AdminSettings.sort_order, AdminSettings.id).all()
+        return ServicesSnapshot([AdminSettingsResponse.model_validate(row) for row in rows])
+    finally:
+        db.close()
+
+
+# Справочник услуг меняется редко, а читается формой заявки на каждом визите
+services_cache: NotifyInvalidatedCache[ServicesSnapshot] = NotifyInvalidatedCache(
+    ADMIN_SETTINGS_CHANNEL, _load_services
+)
+
+
+def _services_changed_clause(event: str):
+    """
+    Уведомление всем воркерам об изменении справочника - в RETURNING
+    записи (доставка после коммита).
+    """
+    return notify_clause(ADMIN_SETTINGS_CHANNEL, {"event": event, "id": AdminSettings.id})
+
+
+def sync_catalog_fields(db_settings: AdminSettings, changed: Dict) -> None:
+    """
+    Согласует строковые и типизированные поля услуги: если изменена только
+    одна из форм (services/name, budget_range/budget_min+budget_max),
+    вторая выводится из нее.
+    """
+    if "name" in changed and "services" not in changed:
+        db_settings.services = db_settings.name
+    elif "services" in changed and "name" not in changed:
+        db_settings.name = db_settings.services
+
+    typed_budget_changed = "budget_min" in changed or "budget_max" in changed
+    if "budget_range" in changed and not typed_budget_changed:
+        db_settings.budget_min, db_settings.budget_max = parse_budget_range(db_settings.budget_range)
+    elif typed_budget_changed and "budget_range" not in changed:
+        db_settings.budget_range = format_budget_range(db_settings.budget_min, db_settings.budget_max)
+
+
+# Услуга по ID, запрос построен один раз (SQL берется из кэша компиляции)
+SETTINGS_BY_ID = select(AdminSettings).where(AdminSettings.id == bindparam("settings_id")).limit(1)
+
+# Текущие границы бюджета - если обновление меняет только одну из них
+SETTINGS_BUDGET_BY_ID = (
+    select(AdminSettings.budget_min, AdminSettings.budget_max)
+    .where(AdminSettings.id == bindparam("settings_id"))
+    .with_for_update()
+)
+
+# Записи одним запросом: INSERT / UPDATE / DELETE ... RETURNING вместе с
+# уведомлением вместо записи, отдельного NOTIFY и refresh
+SETTINGS_INSERT = insert(AdminSettings).returning(AdminSettings, _services_changed_clause("created"))
+SETTINGS_UPDATED_RETURNING = (AdminSettings, _services_changed_clause("updated"))
+SETTINGS_DELETE = (
+    delete(AdminSettings)
+    .where(AdminSettings.id == bindparam("settings_id"))
+    .returning(AdminSettings.id, _services_changed_clause("deleted"))
+    .execution_options(synchronize_session=False)
+)
+
+
+def _commit_written(db: Session, db_settings: AdminSettings) -> AdminSettings:
+    """
+    Коммит записи из RETURNING. Объект отсоединяется от сессии заранее, иначе
+    коммит пометит его устаревшим и чтение полей станет повторным SELECT.
+    """
+    db.expunge(db_settings)
+    db.commit()
+    services_cache.invalidate()
+    return db_settings
+
+
 class AdminSettingsCRUD:
     """CRUD операции для модели AdminSettings."""
     
     @staticmethod
     def create(db: Session, settings_data: AdminSettingsCreate) -> AdminSettings:
-        """Создать новую настройку."""
-        db_settings = AdminSettings(**settings_data.model_dump())
-        db.add(db_settings)
-        db.commit()
-        db.refresh(db_settings)
-        return db_settings
+        """Создать новую настройку (INSERT ... RETURNING вместе с уведомлением)."""
+        values = SimpleNamespace(**settings_data.model_dump())
+        sync_catalog_fields(values, settings_data.model_dump(exclude_unset=True))
+        db_settings = db.execute(SETTINGS_INSERT, vars(values)).scalars().one()
+        return _commit_written(db, db_settings)
     
     @staticmethod
     def get_by_id(db: Session, settings_id: int) -> Optional[AdminSettings]:
         """Получить настройку по ID."""
-        return db.query(AdminSettings).filter(AdminSettings.id == settings_id).first()
+        return db.execute(SETTINGS_BY_ID, {"settings_id": settings_id}).scalars().first()
     
     @staticmethod
     def get_all(db: Session, skip: int = 0, limit: int = 100) -> List[AdminSettings]:
         """Получить все настройки с пагинацией."""
-        return db.query(AdminSettings).offset(skip).limit(limit).all()
+        return (
+            db.query(AdminSettings)
+            .order_by(AdminSettings.sort_order, AdminSettings.id)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+    
+    @staticmethod
+    def get_cached(
+        skip: int = 0,
+        limit: int = 100,
+        active_only: bool = False,
+        budget: Optional[float] = None
+    ) -> List[AdminSettingsResponse]:
+        """
+        Получить настройки из кэша процесса (без обращения к БД, пока кэш актуален).
+        active_only оставляет только активные услуги, budget - услуги,
+        в бюджетный диапазон которых попадает сумма.
+        """
+        return services_cache.get().select(skip=skip, limit=limit, active_only=active_only, budget=budget)
+    
+    @staticmethod
+    def get_cached_by_id(settings_id: int) -> Optional[AdminSettingsResponse]:
+        """Получить настройку по ID из кэша процесса."""
+        return services_cache.get().by_id.get(settings_id)
+    
+    @staticmethod
+    def get_cached_version() -> ResourceVersion:
+        """Версия справочника для ETag."""
+        return services_cache.get().version
     
     @staticmethod
     def update(db: Session, settings_id: int, settings_data: AdminSettingsUpdate) -> Optional[AdminSettings]:
-        """Обновить настройку."""
-        db_settings = db.query(AdminSettings).filter(AdminSettings.id == settings_id).first()
-        if not db_settings:
-            return None
-        
+        """
+        Обновить настройку одним UPDATE ... RETURNING (вместе с уведомлением).
+        Если меняется только одна граница бюджета, вторая сначала читается
+        под блокировкой строки - строковый диапазон выводится из обеих.
+        """
         update_data = settings_data.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_settings, key, value)
+        values = dict(update_data)
+        typed_budget = [key for key in ("budget_min", "budget_max") if key in update_data]
+        if len(typed_budget) == 1 and "budget_range" not in update_data:
+            current = db.execute(SETTINGS_BUDGET_BY_ID, {"settings_id": settings_id}).mappings().first()
+            if current is None:
+                db.rollback()
+                return None
+            values = {**current, **update_data}
+        catalog = SimpleNamespace(**values)
+        sync_catalog_fields(catalog, update_data)
         
-        db.commit()
-        db.refresh(db_settings)
-        return db_settings
+        db_settings = db.execute(
+            update(AdminSettings)
+            .where(AdminSettings.id == settings_id)
+            # Пустое обновление не трогает updated_at, как и раньше
+            .values(**(vars(catalog) or {"updated_at": AdminSettings.updated_at}))
+            .returning(*SETTINGS_UPDATED_RETURNING)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        ).scalars().first()
+        if db_settings is None:
+            db.rollback()
+            return None
+        return _commit_written(db, db_settings)
     
     @staticmethod
     def delete(db: Session, settings_id: int) -> bool:
-        """Удалить настройку."""
-        db_settings = db.query(AdminSettings).filter(AdminSettings.id == settings_id).first()
-        if not db_settings:
+        """Удалить настройку (DELETE ... RETURNING вместе с уведомлением)."""
+        deleted_id = db.execute(SETTINGS_DELETE, {"settings_id": settings_id}).scalar()
+        if deleted_id is None:
+            db.rollback()
             return False
-        
-        db.delete(db_settings)
         db.commit()
+        services_cache.invalidate()
         return True
 
+
+class AsyncAdminSettingsCRUD:
+    """
+    Чтение справочника услуг для async-роутов. Снимок в памяти отдается
+    без ожидания; пустой кэш загружается в пуле потоков, не блокируя цикл событий.
+    """
+
+    @staticmethod
+    async def get_snapshot() -> ServicesSnapshot:
+        snapshot = services_cache.peek()
+        if snapshot is None:
+            snapshot = await run_in_threadpool(services_cache.get)
+        return snapshot
+
+    @staticmethod
+    async def get_cached(
+        skip: int = 0,
+        limit: int = 100,
+        active_only: bool = False,
+        budget: Optional[float] = None
+    ) -> List[AdminSettingsResponse]:
+        """Получить настройки из кэша процесса."""
+        snapshot = await AsyncAdminSettingsCRUD.get_snapshot()
+        return snapshot.select(skip=skip, limit=limit, active_only=active_only, budget=budget)
+
+    @staticmethod
+    async def get_cached_by_id(settings_id: int) -> Optional[AdminSettingsResponse]:
+        """Получить настройку по ID из кэша процесса."""
+        return (await AsyncAdminSettingsCRUD.get_snapshot()).by_id.get(settings_id)
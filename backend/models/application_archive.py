@@ -0,0 +1,153 @@
+"""
+Архив заявок (applications_archive).
+
+Закрытые и старые заявки переносятся пачками из горячей таблицы applications
+в архивную с теми же колонками, но без внешних ключей и вторичных индексов.
+Горячая таблица, ее индексы и их кэш остаются небольшими, а чтение архива
+включается явно параметром include_archived.
+"""
+import os
+from sqlalchemy import Column, DateTime, Table, text
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from core.database import Base
+from models.applications import Application
+
+
+def _archive_columns():
+    """
+    Колонки архива повторяют applications (без внешних ключей и индексов).
+    id переносится из applications, поэтому без автоинкремента (не SERIAL).
+    """
+    columns = [
+        Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable, autoincrement=False)
+        for column in Application.__table__.columns
+    ]
+    columns.append(Column("archived_at", DateTime(timezone=True), nullable=False, server_default=func.now()))
+    return columns
+
+
+class ApplicationArchive(Base):
+    """
+    Модель архивной заявки.
+
+    SQL код для генерации таблицы: те же колонки, что у applications,
+    плюс archived_at; индекс только первичный ключ.
+
+    CREATE TABLE applications_archive (
+        id INTEGER PRIMARY KEY,
+        ...колонки applications...,
+        archived_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+    );
+    """
+    __table__ = Table("applications_archive", Base.metadata, *_archive_columns())
+
+    # Услуга может быть уже удалена - связь только для чтения, без внешнего ключа
+    service = relationship(
+        "AdminSettings",
+        primaryjoin="foreign(ApplicationArchive.service_id) == AdminSettings.id",
+        viewonly=True
+    )
+
+    # Те же вычисляемые свойства, что у заявки
+    score_breakdown = Application.score_breakdown
+    service_name = Application.service_name
+    service_budget_range = Application.service_budget_range
+
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session
+from typing import Optional
+from pydantic import BaseModel
+from core.notifications import notify
+from models.applications import APPLICATION_EVENTS_CHANNEL, _service_loader
+
+# Заявки старше ARCHIVE_AFTER_DAYS архивируются, закрытые - через
+# ARCHIVE_CLOSED_AFTER_DAYS после последнего изменения
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "365"))
+ARCHIVE_CLOSED_AFTER_DAYS = int(os.getenv("ARCHIVE_CLOSED_AFTER_DAYS", "30"))
+ARCHIVE_BATCH_SIZE = 5000
+
+ARCHIVE_COLUMNS = ", ".join(column.name for column in Application.__table__.columns)
+
+# Перенос пачки одной командой: DELETE ... RETURNING внутри INSERT.
+# Взятые в работу заявки не трогаем (брошенные захваты с истекшим сроком
+# архивируются), заблокированные строки пропускаем.
+ARCHIVE_BATCH_SQL = text(f"""
+    WITH moved AS (
+        DELETE FROM applications
+        WHERE id IN (
+            SELECT id FROM applications
+            WHERE (status <> 'in_progress' OR claim_expires_at < now())
+              AND (
+                  created_at < now() - make_interval(days => :older_than_days)
+                  OR (status = 'closed' AND updated_at < now() - make_interval(days => :closed_after_days))
+              )
+            ORDER BY id
+            LIMIT :batch_size
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING {ARCHIVE_COLUMNS}
+    )
+    INSERT INTO applications_archive ({ARCHIVE_COLUMNS})
+    SELECT {ARCHIVE_COLUMNS} FROM moved
+""")
+
+
+class ArchiveResult(BaseModel):
+    """Итог архивации."""
+    archived: int
+    batches: int
+
+
+# Архивная заявка по ID (запрос строится один раз, как APPLICATION_WITH_SERVICE_BY_ID)
+ARCHIVED_APPLICATION_BY_ID = (
+    select(ApplicationArchive)
+    .options(_service_loader(ApplicationArchive))
+    .where(ApplicationArchive.id == bindparam("application_id"))
+    .limit(1)
+)
+
+
+class ApplicationArchiveCRUD:
+    """Операции с архивом заявок."""
+
+    @staticmethod
+    def archive(
+        db: Session,
+        older_than_days: int = ARCHIVE_AFTER_DAYS,
+        closed_after_days: int = ARCHIVE_CLOSED_AFTER_DAYS,
+        batch_size: int = ARCHIVE_BATCH_SIZE,
+        max_batches: Optional[int] = None
+    ) -> ArchiveResult:
+        """
+        Перенести подходящие заявки в архив.
+        Каждая пачка - отдельная короткая транзакция.
+        """
+        archived = 0
+        batches = 0
+        params = {
+            "older_than_days": older_than_days,
+            "closed_after_days": closed_after_days,
+            "batch_size": batch_size
+        }
+        while max_batches is None or batches < max_batches:
+            moved = db.execute(ARCHIVE_BATCH_SQL, params).rowcount
+            if not moved:
+                db.rollback()
+                break
+            db.commit()
+            archived += moved
+            batches += 1
+
+        if archived:
+            notify(db, APPLICATION_EVENTS_CHANNEL, {"event": "archived", "count": archived})
+            db.commit()
+        return ArchiveResult(archived=archived, batches=batches)
+
+    @staticmethod
+    def get_by_id(db: Session, application_id: int) -> Optional[ApplicationArchive]:
+        """Получить архивную заявку по ID."""
+        return db.execute(
+            ARCHIVED_APPLICATION_BY_ID, {"application_id": application_id}
+        ).scalars().first()
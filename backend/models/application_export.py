@@ -0,0 +1,188 @@
+"""
+Потоковая выгрузка заявок в CSV/NDJSON (опционально со сжатием gzip).
+
+Строки читаются серверным курсором пачками (yield_per), поэтому расход памяти
+не зависит от размера выгрузки. Первая строка (заголовок CSV или первая запись
+NDJSON) уходит клиенту сразу, дальше - пачками по числу строк или по времени,
+если отфильтрованные строки находятся медленно.
+"""
+import csv
+import io
+import json
+import time
+import zlib
+from datetime import datetime
+from decimal import Decimal
+from itertools import chain
+from typing import Any, Iterator, List, Optional
+
+from core.read_replica import open_read_session
+from models.applications import Application
+from models.application_archive import ApplicationArchive
+
+SUPPORTED_FORMATS = ("csv", "ndjson")
+EXPORT_BATCH_SIZE = 1000
+# Накопленные строки отправляются не реже, чем раз в указанный интервал
+EXPORT_FLUSH_SECONDS = 1.0
+
+EXPORT_COLUMNS = (
+    "id",
+    "service_id",
+    "first_name",
+    "last_name",
+    "phone",
+    "email",
+    "comments",
+    "business_niche",
+    "company_size",
+    "task_volume",
+    "role",
+    "deadline",
+    "budget",
+    "temperature_score",
+    "temperature",
+    "department",
+    "scoring_version",
+    "score_niche",
+    "score_company_size",
+    "score_task_volume",
+    "score_role",
+    "score_deadline",
+    "score_budget",
+    "status",
+    "claimed_by",
+    "created_at",
+    "updated_at",
+)
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class ApplicationExportFilters:
+    """Фильтры выгрузки заявок."""
+
+    def __init__(
+        self,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        temperature: Optional[str] = None,
+        department: Optional[str] = None,
+        include_archived: bool = False
+    ):
+        self.created_from = created_from
+        self.created_to = created_to
+        self.temperature = temperature
+        self.department = department
+        self.include_archived = include_archived
+
+
+def _to_plain(value: Any) -> Any:
+    """Приводит значения БД к JSON-совместимым типам."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _iter_records(filters: ApplicationExportFilters) -> Iterator[List[Any]]:
+    """Читает заявки серверным курсором (с include_archived - затем архив)."""
+    models = [Application]
+    if filters.include_archived:
+        models.append(ApplicationArchive)
+
+    db = open_read_session()
+    try:
+        for model in models:
+            query = db.query(*[getattr(model, column) for column in EXPORT_COLUMNS])
+            if filters.created_from:
+                query = query.filter(model.created_at >= filters.created_from)
+            if filters.created_to:
+                query = query.filter(model.created_at < filters.created_to)
+            if filters.temperature:
+                query = query.filter(model.temperature == filters.temperature)
+            if filters.department:
+                query = query.filter(model.department == filters.department)
+            query = query.order_by(model.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+            for row in query:
+                yield [_to_plain(value) for value in row]
+    finally:
+        db.close()
+
+
+def _iter_batches(lines: Iterator[str]) -> Iterator[str]:
+    """
+    Склеивает строки выгрузки в куски для отправки. Первая строка уходит сразу,
+    дальше - по EXPORT_BATCH_SIZE строк или по прошествии EXPORT_FLUSH_SECONDS.
+    """
+    batch: List[str] = []
+    flushed_at = None
+    for line in lines:
+        batch.append(line)
+        now = time.monotonic()
+        if flushed_at is None or len(batch) >= EXPORT_BATCH_SIZE or now - flushed_at >= EXPORT_FLUSH_SECONDS:
+            yield "".join(batch)
+            batch = []
+            flushed_at = now
+    if batch:
+        yield "".join(batch)
+
+
+def _iter_csv_lines(records: Iterator[List[Any]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for record in chain([EXPORT_COLUMNS], records):
+        writer.writerow(record)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def _iter_ndjson_lines(records: Iterator[List[Any]]) -> Iterator[str]:
+    for record in records:
+        yield json.dumps(dict(zip(EXPORT_COLUMNS, record)), ensure_ascii=False) + "\n"
+
+
+def _gzip_chunks(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Сжимает поток в формат gzip, сбрасывая буфер после каждой пачки."""
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_applications_export(
+    filters: ApplicationExportFilters,
+    file_format: str = "csv",
+    compress: bool = False
+) -> Iterator[bytes]:
+    """Возвращает генератор байтов выгрузки для StreamingResponse."""
+    records = _iter_records(filters)
+    if file_format == "csv":
+        text_chunks = _iter_batches(_iter_csv_lines(records))
+    elif file_format == "ndjson":
+        text_chunks = _iter_batches(_iter_ndjson_lines(records))
+    else:
+        raise ValueError(f"Неподдерживаемый формат: {file_format}")
+
+    chunks = (chunk.encode("utf-8") for chunk in text_chunks)
+    if compress:
+        return _gzip_chunks(chunks)
+    return chunks
+
+
+def export_filename(file_format: str, compress: bool) -> str:
+    """Имя файла выгрузки с отметкой времени."""
+    name = f"applications_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{file_format}"
+    return name + ".gz" if compress else name
+
+
+def export_media_type(file_format: str, compress: bool) -> str:
+    """MIME-тип выгрузки."""
+    return "application/gzip" if compress else MEDIA_TYPES[file_format]
@@ -0,0 +1,351 @@
+"""
+Массовый импорт заявок из CSV/NDJSON.
+
+Строки читаются потоково, валидируются схемой ApplicationCreate пачками,
+загружаются через COPY во временную staging-таблицу и одним INSERT ... SELECT
+переносятся в applications. Ошибки возвращаются построчно: строки, которые не
+поместятся в колонки applications (длина, точность), отсекаются до COPY,
+иначе одна такая строка срывала бы весь импорт.
+"""
+import csv
+import io
+import json
+import math
+from collections import Counter
+from decimal import Decimal
+from itertools import islice
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import Integer, Numeric, String, text
+from sqlalchemy.orm import Session
+
+from core.notifications import notify
+from models.applications import APPLICATION_EVENTS_CHANNEL, BREAKDOWN_COLUMNS, Application, ApplicationCreate
+from models.temperature_analysis import ScoringEngine, get_scoring_engine
+
+# Колонки applications, которые заполняются при импорте (порядок важен для COPY)
+IMPORT_COLUMNS = (
+    "service_id",
+    "first_name",
+    "last_name",
+    "phone",
+    "email",
+    "comments",
+    "business_niche",
+    "company_size",
+    "task_volume",
+    "role",
+    "deadline",
+    "budget",
+)
+
+# Классификация рассчитывается пачкой в Python и загружается вместе со строкой
+CLASSIFICATION_COLUMNS = ("temperature_score", "temperature", "department") + BREAKDOWN_COLUMNS + ("scoring_version",)
+STAGING_COLUMNS = IMPORT_COLUMNS + CLASSIFICATION_COLUMNS
+
+# Максимум для колонок INTEGER
+INTEGER_MAX = 2 ** 31 - 1
+
+SUPPORTED_FORMATS = ("csv", "ndjson")
+DEFAULT_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+STAGING_TABLE = "applications_import_staging"
+
+
+class ImportRowError(BaseModel):
+    """Ошибка в конкретной строке файла импорта."""
+    row: int
+    errors: List[str]
+
+
+class ApplicationImportResult(BaseModel):
+    """Итог импорта заявок."""
+    total_rows: int
+    imported: int
+    failed: int
+    by_temperature: Dict[str, int]
+    errors: List[ImportRowError]
+    errors_truncated: bool = False
+
+
+def detect_format(filename: Optional[str]) -> Optional[str]:
+    """Определяет формат файла по расширению."""
+    if not filename:
+        return None
+    lowered = filename.lower()
+    if lowered.endswith(".csv"):
+        return "csv"
+    if lowered.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return None
+
+
+def open_text_stream(binary_stream: BinaryIO) -> TextIO:
+    """Оборачивает бинарный поток в текстовый (UTF-8, BOM допускается)."""
+    return io.TextIOWrapper(binary_stream, encoding="utf-8-sig", newline="")
+
+
+def iter_csv_rows(stream: TextIO) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Потоково читает CSV с заголовком.
+
+    Возвращает кортежи (номер строки, данные, ошибка разбора).
+    """
+    reader = csv.DictReader(stream)
+    for row in reader:
+        data = {
+            key.strip(): (value.strip() or None) if isinstance(value, str) else value
+            for key, value in row.items()
+            if key
+        }
+        yield reader.line_num, data, None
+
+
+def iter_ndjson_rows(stream: TextIO) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Потоково читает NDJSON (один JSON-объект на строку).
+
+    Возвращает кортежи (номер строки, данные, ошибка разбора).
+    """
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, None, f"Некорректный JSON: {e.msg}"
+            continue
+        if not isinstance(data, dict):
+            yield line_number, None, "Ожидается JSON-объект"
+            continue
+        yield line_number, data, None
+
+
+def iter_rows(stream: TextIO, file_format: str) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """Выбирает парсер по формату файла."""
+    if file_format == "csv":
+        return iter_csv_rows(stream)
+    if file_format == "ndjson":
+        return iter_ndjson_rows(stream)
+    raise ValueError(f"Неподдерживаемый формат: {file_format}")
+
+
+def _format_validation_error(error: ValidationError) -> List[str]:
+    """Превращает ошибку pydantic в список читаемых сообщений."""
+    messages = []
+    for item in error.errors():
+        location = ".".join(str(part) for part in item.get("loc", ()))
+        message = item.get("msg", "")
+        messages.append(f"{location}: {message}" if location else message)
+    return messages
+
+
+def column_limit_errors(application: ApplicationCreate) -> List[str]:
+    """
+    Проверяет, что значения помещаются в колонки applications
+    (длина VARCHAR, точность NUMERIC, диапазон INTEGER).
+    Ограничения берутся из модели, поэтому следуют за схемой.
+    """
+    messages = []
+    for name in IMPORT_COLUMNS:
+        value = getattr(application, name)
+        if value is None:
+            continue
+        column_type = Application.__table__.columns[name].type
+        if isinstance(value, str):
+            if "\x00" in value:
+                messages.append(f"{name}: недопустимый символ NUL")
+            elif isinstance(column_type, String) and column_type.length and len(value) > column_type.length:
+                messages.append(f"{name}: не длиннее {column_type.length} символов")
+        elif isinstance(column_type, Numeric):
+            if not math.isfinite(value):
+                messages.append(f"{name}: должно быть конечным числом")
+                continue
+            scale = column_type.scale or 0
+            limit = Decimal(10) ** (column_type.precision - scale)
+            if abs(round(Decimal(str(value)), scale)) >= limit:
+                messages.append(f"{name}: должно быть меньше {limit}")
+        elif isinstance(column_type, Integer) and abs(value) > INTEGER_MAX:
+            messages.append(f"{name}: вне допустимого диапазона")
+    return messages
+
+
+def classify_batch(
+    applications: List[ApplicationCreate],
+    engine: Optional[ScoringEngine] = None
+) -> List[Tuple[int, str, str, Tuple[int, ...]]]:
+    """
+    Рассчитывает (score, temperature, department, баллы по критериям)
+    для пачки заявок одной версией правил.
+    """
+    engine = engine or get_scoring_engine()
+    return [
+        engine.score_with_breakdown(
+            business_niche=application.business_niche,
+            company_size=application.company_size,
+            task_volume=application.task_volume,
+            role=application.role,
+            deadline=application.deadline,
+            budget=application.budget
+        )
+        for application in applications
+    ]
+
+
+class ApplicationImporter:
+    """
+    Загрузчик заявок через COPY в staging-таблицу.
+
+    Вся загрузка выполняется в одной транзакции: staging-таблица временная
+    и удаляется при коммите.
+    """
+
+    def __init__(self, db: Session, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.db = db
+        self.batch_size = max(1, batch_size)
+        self.total_rows = 0
+        self.valid_rows = 0
+        self.errors: List[ImportRowError] = []
+        self.failed = 0
+        self.temperature_counts: Counter = Counter()
+        self._row_temperatures: Dict[int, str] = {}
+        # Весь импорт оценивается одной версией правил
+        self.engine = get_scoring_engine()
+
+    def _add_error(self, row: int, messages: List[str]) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(ImportRowError(row=row, errors=messages))
+
+    def _create_staging_table(self) -> None:
+        columns = ", ".join(STAGING_COLUMNS)
+        self.db.execute(text(
+            f"CREATE TEMP TABLE {STAGING_TABLE} ON COMMIT DROP AS "
+            f"SELECT 0 AS row_number, {columns} FROM applications WITH NO DATA"
+        ))
+
+    def _copy_batch(
+        self,
+        batch: List[Tuple[int, ApplicationCreate]],
+        classifications: List[Tuple[int, str, str, Tuple[int, ...]]]
+    ) -> None:
+        """Загружает пачку валидных строк с классификацией в staging-таблицу через COPY."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for (row_number, application), (score, temperature, department, points) in zip(batch, classifications):
+            writer.writerow(
+                [row_number]
+                + [getattr(application, column) for column in IMPORT_COLUMNS]
+                + [score, temperature, department]
+                + list(points)
+                + [self.engine.version]
+            )
+        buffer.seek(0)
+
+        columns = ", ".join(("row_number",) + STAGING_COLUMNS)
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {STAGING_TABLE} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+
+    def _process_batch(self, batch: List[Tuple[int, ApplicationCreate]]) -> None:
+        classifications = classify_batch([application for _, application in batch], self.engine)
+        for (row_number, _), (_, temperature, _, _) in zip(batch, classifications):
+            self._row_temperatures[row_number] = temperature
+        self._copy_batch(batch, classifications)
+        self.valid_rows += len(batch)
+
+    def _reject_unknown_services(self) -> None:
+        """Отклоняет строки со ссылкой на несуществующую услугу."""
+        rows = self.db.execute(text(
+            f"SELECT st.row_number, st.service_id FROM {STAGING_TABLE} st "
+            f"WHERE st.service_id IS NOT NULL AND NOT EXISTS "
+            f"(SELECT 1 FROM admin_settings s WHERE s.id = st.service_id) "
+            f"ORDER BY st.row_number"
+        )).all()
+        for row_number, service_id in rows:
+            self._row_temperatures.pop(row_number, None)
+            self._add_error(row_number, [f"service_id: услуга с id {service_id} не найдена"])
+
+    def _merge(self) -> int:
+        """Переносит строки из staging-таблицы в applications."""
+        columns = ", ".join(STAGING_COLUMNS)
+        result = self.db.execute(text(
+            f"INSERT INTO applications ({columns}) "
+            f"SELECT {columns} FROM {STAGING_TABLE} st "
+            f"WHERE st.service_id IS NULL OR EXISTS "
+            f"(SELECT 1 FROM admin_settings s WHERE s.id = st.service_id) "
+            f"ORDER BY st.row_number"
+        ))
+        return result.rowcount
+
+    def run(self, rows: Iterable[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]) -> ApplicationImportResult:
+        """Выполняет импорт и коммитит транзакцию."""
+        try:
+            self._create_staging_table()
+            iterator = iter(rows)
+            while True:
+                chunk = list(islice(iterator, self.batch_size))
+                if not chunk:
+                    break
+
+                batch: List[Tuple[int, ApplicationCreate]] = []
+                for row_number, data, parse_error in chunk:
+                    self.total_rows += 1
+                    if parse_error:
+                        self._add_error(row_number, [parse_error])
+                        continue
+                    try:
+                        application = ApplicationCreate.model_validate(data)
+                    except ValidationError as e:
+                        self._add_error(row_number, _format_validation_error(e))
+                        continue
+                    # Строка, не помещающаяся в колонки, сорвала бы COPY всей пачки
+                    limit_errors = column_limit_errors(application)
+                    if limit_errors:
+                        self._add_error(row_number, limit_errors)
+                        continue
+                    batch.append((row_number, application))
+
+                if batch:
+                    self._process_batch(batch)
+
+            imported = 0
+            if self.valid_rows:
+                self._reject_unknown_services()
+                imported = self._merge()
+            if imported:
+                # Одно событие на весь импорт вместо события на каждую строку
+                notify(self.db, APPLICATION_EVENTS_CHANNEL, {"event": "imported", "count": imported})
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        self.temperature_counts.update(self._row_temperatures.values())
+        return ApplicationImportResult(
+            total_rows=self.total_rows,
+            imported=imported,
+            failed=self.failed,
+            by_temperature={
+                "hot": self.temperature_counts.get("hot", 0),
+                "medium": self.temperature_counts.get("medium", 0),
+                "cold": self.temperature_counts.get("cold", 0)
+            },
+            errors=self.errors,
+            errors_truncated=self.failed > len(self.errors)
+        )
+
+
+def import_applications(
+    db: Session,
+    stream: TextIO,
+    file_format: str,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> ApplicationImportResult:
+    """Импортирует заявки из текстового потока в формате CSV или NDJSON."""
+    rows = iter_rows(stream, file_format)
+    return ApplicationImporter(db=db, batch_size=batch_size).run(rows)
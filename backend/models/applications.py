@@ -1,10 +1,12 @@
 """
 Модель для хранения заявок от клиентов (applications).
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Numeric
+from sqlalchemy import Column, Integer, SmallInteger, String, Text, DateTime, ForeignKey, Numeric, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+from typing import Dict, Optional
 from core.database import Base
+from models.temperature_analysis import SCORE_CRITERIA
 
 
 class Application(Base):
@@ -27,9 +29,30 @@ class Application(Base):
         role VARCHAR(255),
         deadline VARCHAR(255),
         budget NUMERIC(15, 2),
+        temperature_score INTEGER,
+        temperature VARCHAR(20),
+        department VARCHAR(255),
+        scoring_version INTEGER,
+        score_niche SMALLINT,
+        score_company_size SMALLINT,
+        score_task_volume SMALLINT,
+        score_role SMALLINT,
+        score_deadline SMALLINT,
+        score_budget SMALLINT,
+        status VARCHAR(20) NOT NULL DEFAULT 'new',
+        claimed_by INTEGER REFERENCES admins(id) ON DELETE SET NULL,
+        claimed_at TIMESTAMP WITH TIME ZONE,
+        claim_expires_at TIMESTAMP WITH TIME ZONE,
         created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
         updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
     );
+    
+    CREATE INDEX ix_applications_queue
+        ON applications (department, temperature_score DESC NULLS LAST, created_at)
+        WHERE status <> 'closed';
+    CREATE INDEX ix_applications_temperature_score
+        ON applications (temperature_score DESC NULLS LAST, created_at DESC);
+    CREATE INDEX ix_applications_scoring_version ON applications (scoring_version);
     """
     __tablename__ = "applications"
 
@@ -54,6 +77,26 @@ class Application(Base):
     deadline = Column(String(255), nullable=True)  # Сроки (urgent, 1-2 weeks, 1 month, flexible)
     budget = Column(Numeric(15, 2), nullable=True)  # Бюджет
     
+    # Классификация, рассчитывается при записи (см. apply_classification)
+    temperature_score = Column(Integer, nullable=True)
+    temperature = Column(String(20), nullable=True)  # hot, medium, cold
+    department = Column(String(255), nullable=True)
+    scoring_version = Column(Integer, nullable=True, index=True)  # Версия правил оценки
+    
+    # Баллы по критериям (сумма равна temperature_score)
+    score_niche = Column(SmallInteger, nullable=True)
+    score_company_size = Column(SmallInteger, nullable=True)
+    score_task_volume = Column(SmallInteger, nullable=True)
+    score_role = Column(SmallInteger, nullable=True)
+    score_deadline = Column(SmallInteger, nullable=True)
+    score_budget = Column(SmallInteger, nullable=True)
+    
+    # Очередь отдела: new -> in_progress (взята менеджером) -> closed
+    status = Column(String(20), nullable=False, default="new", server_default="new")
+    claimed_by = Column(Integer, ForeignKey("admins.id", ondelete="SET NULL"), nullable=True)
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    claim_expires_at = Column(DateTime(timezone=True), nullable=True)
+    
     # Временные метки
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -61,12 +104,52 @@ class Application(Base):
     # Связь с услугой (из admin_settings)
     service = relationship("AdminSettings", foreign_keys=[service_id])
 
+    __table_args__ = (
+        Index(
+            "ix_applications_queue",
+            "department", temperature_score.desc().nullslast(), "created_at",
+            postgresql_where=text("status <> 'closed'")
+        ),
+        Index("ix_applications_temperature_score", temperature_score.desc().nullslast(), created_at.desc()),
+    )
+
+    @property
+    def score_breakdown(self) -> Optional[Dict[str, int]]:
+        """Баллы по критериям из сохраненных колонок (None, если заявка еще не оценена)."""
+        if self.score_niche is None:
+            return None
+        return {criterion: getattr(self, f"score_{criterion}") for criterion in SCORE_CRITERIA}
+
+    @property
+    def service_name(self) -> Optional[str]:
+        """Название услуги (связь должна быть загружена заранее, см. ApplicationCRUD)."""
+        return self.service.services if self.service is not None else None
+
+    @property
+    def service_budget_range(self) -> Optional[str]:
+        """Бюджетный диапазон услуги."""
+        return self.service.budget_range if self.service is not None else None
 
-from sqlalchemy.orm import Session
-from typing import Optional, List, Dict
+
+import json
+import operator
+import re
+from types import SimpleNamespace
+from sqlalchemy import and_, bindparam, delete, insert, literal, literal_column, or_, select, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
-from pydantic import BaseModel, EmailStr, field_validator, model_validator
-from models.temperature_analysis import calculate_temperature_score, get_temperature_info
+from pydantic import BaseModel, EmailStr, TypeAdapter, field_validator, model_validator
+from models.temperature_analysis import (
+    ScoringEngine,
+    calculate_temperature_score,
+    get_scoring_engine,
+    get_temperature_info,
+    TEMPERATURE_INFO
+)
+from core.notifications import EventBroadcaster, listener, notify_clause
 
 
 class ApplicationCreate(BaseModel):
@@ -124,6 +207,16 @@ class ApplicationUpdate(BaseModel):
     budget: Optional[float] = None
 
 
+class ScoreBreakdown(BaseModel):
+    """Баллы по критериям оценки."""
+    niche: int
+    company_size: int
+    task_volume: int
+    role: int
+    deadline: int
+    budget: int
+
+
 class ApplicationResponse(BaseModel):
     """Схема для ответа с данными заявки."""
     id: int
@@ -142,28 +235,44 @@ class ApplicationResponse(BaseModel):
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     
-    # Вычисляемые поля для температуры
+    # Данные связанной услуги
+    service_name: Optional[str] = None
+    service_budget_range: Optional[str] = None
+    
+    # Очередь отдела
+    status: Optional[str] = None
+    claimed_by: Optional[int] = None
+    claimed_at: Optional[datetime] = None
+    claim_expires_at: Optional[datetime] = None
+    
+    # Поля температуры (хранятся в заявке)
     temperature_score: Optional[int] = None
     temperature: Optional[str] = None
     department: Optional[str] = None
+    scoring_version: Optional[int] = None
+    score_breakdown: Optional[ScoreBreakdown] = None
     temperature_info: Optional[Dict[str, str]] = None
     
+    # Заполнено только для заявок из архива
+    archived_at: Optional[datetime] = None
+    
     @model_validator(mode='after')
     def calculate_temperature_fields(self):
-        """Вычисляет поля температуры после создания модели."""
+        """Дополняет поля температуры; расчет нужен только для старых строк без классификации."""
         try:
-            score, temperature, department = calculate_temperature_score(
-                business_niche=self.business_niche,
-                company_size=self.company_size,
-                task_volume=self.task_volume,
-                role=self.role,
-                deadline=self.deadline,
-                budget=self.budget
-            )
-            self.temperature_score = score
-            self.temperature = temperature
-            self.department = department
-            self.temperature_info = get_temperature_info(temperature)
+            if self.temperature_score is None or self.temperature is None or self.department is None:
+                score, temperature, department = calculate_temperature_score(
+                    business_niche=self.business_niche,
+                    company_size=self.company_size,
+                    task_volume=self.task_volume,
+                    role=self.role,
+                    deadline=self.deadline,
+                    budget=self.budget
+                )
+                self.temperature_score = score
+                self.temperature = temperature
+                self.department = department
+            self.temperature_info = get_temperature_info(self.temperature)
         except Exception:
             # Если произошла ошибка, устанавливаем значения по умолчанию
             self.temperature_score = 0
@@ -176,76 +285,706 @@ class ApplicationResponse(BaseModel):
         from_attributes = True
 
 
+class ApplicationListItem(BaseModel):
+    """
+    Схема строки списка заявок для быстрого пути сериализации.
+    Без model_validator: температура берется из заявки, а описание температуры
+    передается отдельной таблицей на весь ответ.
+    """
+    id: int
+    service_id: Optional[int] = None
+    first_name: str
+    last_name: str
+    phone: Optional[str] = None
+    email: Optional[str] = None
+    comments: Optional[str] = None
+    business_niche: Optional[str] = None
+    company_size: Optional[str] = None
+    task_volume: Optional[str] = None
+    role: Optional[str] = None
+    deadline: Optional[str] = None
+    budget: Optional[float] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    service_name: Optional[str] = None
+    service_budget_range: Optional[str] = None
+    status: Optional[str] = None
+    claimed_by: Optional[int] = None
+    claimed_at: Optional[datetime] = None
+    claim_expires_at: Optional[datetime] = None
+    temperature_score: Optional[int] = None
+    temperature: Optional[str] = None
+    department: Optional[str] = None
+    scoring_version: Optional[int] = None
+    archived_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ServiceStatistics(BaseModel):
+    """Статистика заявок по услуге."""
+    service_id: int
+    name: Optional[str] = None
+    budget_min: Optional[float] = None
+    budget_max: Optional[float] = None
+    is_active: bool
+    total: int
+    by_temperature: Dict[str, int]
+    average_budget: Optional[float] = None
+    # Заявки, бюджет которых попадает в диапазон услуги
+    within_budget_range: int
+
+
+class ApplicationListResponse(BaseModel):
+    """Схема компактного ответа со списком заявок."""
+    items: List[ApplicationListItem]
+    temperature_info: Dict[str, Dict[str, str]]
+
+
+# Адаптер строится один раз при импорте модуля
+APPLICATION_LIST_ADAPTER = TypeAdapter(List[ApplicationListItem])
+
+
+def serialize_application_list(applications: List[Application], fields: Optional[List[str]] = None) -> Dict:
+    """
+    Собирает компактный ответ со списком заявок за один проход валидации.
+    Если передан fields, строки содержат только запрошенные поля.
+    Результат предназначен для ORJSONResponse.
+    """
+    if fields:
+        return {
+            "items": serialize_application_fields(applications, fields),
+            "temperature_info": TEMPERATURE_INFO
+        }
+
+    items = APPLICATION_LIST_ADAPTER.validate_python(applications, from_attributes=True)
+    for item in items:
+        if item.temperature_score is None:
+            # Старая строка без сохраненной классификации
+            score, temperature, department = calculate_temperature_score(
+                business_niche=item.business_niche,
+                company_size=item.company_size,
+                task_volume=item.task_volume,
+                role=item.role,
+                deadline=item.deadline,
+                budget=item.budget
+            )
+            item.temperature_score = score
+            item.temperature = temperature
+            item.department = department
+    return {
+        "items": APPLICATION_LIST_ADAPTER.dump_python(items),
+        "temperature_info": TEMPERATURE_INFO
+    }
+
+
+# Поля, доступные для выборки через параметр fields=
+STORED_FIELDS = (
+    "id", "service_id", "first_name", "last_name", "phone", "email", "comments",
+    "business_niche", "company_size", "task_volume", "role", "deadline", "budget",
+    "temperature_score", "temperature", "department", "scoring_version",
+    "score_niche", "score_company_size", "score_task_volume", "score_role", "score_deadline", "score_budget",
+    "status", "claimed_by", "claimed_at", "claim_expires_at",
+    "created_at", "updated_at",
+)
+SERVICE_FIELDS = ("service_name", "service_budget_range")
+
+# Колонки с баллами по критериям (в порядке SCORE_CRITERIA)
+BREAKDOWN_COLUMNS = tuple(f"score_{criterion}" for criterion in SCORE_CRITERIA)
+
+# Поля, от которых зависит классификация заявки
+SCORING_FIELDS = ("business_niche", "company_size", "task_volume", "role", "deadline", "budget")
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """
+    Разбирает параметр fields (список через запятую).
+    Возвращает None, если выборка полей не запрошена.
+    """
+    if not fields:
+        return None
+    requested = []
+    for field in fields.split(","):
+        field = field.strip()
+        if field and field not in requested:
+            requested.append(field)
+    unknown = [field for field in requested if field not in STORED_FIELDS + SERVICE_FIELDS]
+    if unknown:
+        raise ValueError(f"Неизвестные поля: {', '.join(unknown)}")
+    return requested or None
+
+
+# Условия фильтра по критериям: niche>=10, budget<4, role=20
+CRITERION_FILTER_PATTERN = re.compile(r"^([a-z_]+)(>=|<=|=|>|<)(\d+)$")
+CRITERION_OPERATORS = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    "=": operator.eq,
+    ">": operator.gt,
+    "<": operator.lt,
+}
+
+
+def parse_criterion_sort(sort_by: Optional[str]) -> Optional[Tuple[str, bool]]:
+    """
+    Разбирает параметр сортировки по критерию: имя критерия,
+    с префиксом "-" - по убыванию. Возвращает (колонка, по убыванию).
+    """
+    if not sort_by:
+        return None
+    descending = sort_by.startswith("-")
+    criterion = sort_by.lstrip("-").strip()
+    if criterion not in SCORE_CRITERIA:
+        raise ValueError(f"Неизвестный критерий: {criterion}. Допустимые: {', '.join(SCORE_CRITERIA)}")
+    return f"score_{criterion}", descending
+
+
+def parse_criterion_filters(criteria: Optional[str]) -> List[Tuple[str, str, int]]:
+    """
+    Разбирает фильтр по баллам критериев (условия через запятую).
+    Возвращает список (колонка, оператор, значение).
+    """
+    if not criteria:
+        return []
+    filters = []
+    for condition in criteria.split(","):
+        condition = condition.replace(" ", "")
+        if not condition:
+            continue
+        match = CRITERION_FILTER_PATTERN.match(condition)
+        if not match:
+            raise ValueError(f"Некорректное условие: {condition}. Пример: budget>=8,role<10")
+        criterion, op, value = match.groups()
+        if criterion not in SCORE_CRITERIA:
+            raise ValueError(f"Неизвестный критерий: {criterion}. Допустимые: {', '.join(SCORE_CRITERIA)}")
+        filters.append((f"score_{criterion}", op, int(value)))
+    return filters
+
+
+def columns_for_fields(fields: List[str]) -> List[str]:
+    """Колонки таблицы, которые нужно загрузить для заданного набора полей."""
+    columns = {"id"}
+    columns.update(field for field in fields if field in STORED_FIELDS)
+    if any(field in SERVICE_FIELDS for field in fields):
+        columns.add("service_id")
+    return [column for column in STORED_FIELDS if column in columns]
+
+
+def serialize_application_fields(applications: List[Application], fields: List[str]) -> List[Dict[str, Any]]:
+    """Собирает строки ответа только с запрошенными полями."""
+    rows = []
+    for application in applications:
+        row = {field: getattr(application, field) for field in fields}
+        if "budget" in row and row["budget"] is not None:
+            row["budget"] = float(row["budget"])
+        rows.append(row)
+    return rows
+
+
+# Канал NOTIFY с событиями по заявкам (created / updated / deleted / imported)
+APPLICATION_EVENTS_CHANNEL = "application_events"
+
+# Рассылка событий открытым SSE-соединениям этого воркера
+application_events = EventBroadcaster()
+
+
+def _on_application_notification(payload: Optional[str]) -> None:
+    if payload is None:
+        # Уведомления могли быть пропущены - клиентам стоит перечитать список
+        application_events.publish({"event": "resync"})
+        return
+    try:
+        application_events.publish(json.loads(payload))
+    except ValueError:
+        pass
+
+
+listener.subscribe(APPLICATION_EVENTS_CHANNEL, _on_application_notification)
+
+
+# Поля заявки в событии для клиентов SSE
+APPLICATION_EVENT_FIELDS = (
+    "id", "first_name", "last_name", "temperature_score", "temperature",
+    "department", "status", "claimed_by",
+)
+
+
+def application_event_clause(event: str):
+    """Компактное событие по заявке для клиентов SSE, собранное в SQL из записанной строки (для RETURNING)."""
+    payload = {"event": event}
+    payload.update((field, getattr(Application, field)) for field in APPLICATION_EVENT_FIELDS)
+    return notify_clause(APPLICATION_EVENTS_CHANNEL, payload)
+
+
+def classify_application(application, engine: Optional[ScoringEngine] = None) -> Tuple[int, str, str]:
+    """Рассчитывает (score, temperature, department) по полям заявки или схемы."""
+    engine = engine or get_scoring_engine()
+    return engine.score(
+        business_niche=application.business_niche,
+        company_size=application.company_size,
+        task_volume=application.task_volume,
+        role=application.role,
+        deadline=application.deadline,
+        budget=float(application.budget) if application.budget is not None else None
+    )
+
+
+def apply_classification(application: Application, engine: Optional[ScoringEngine] = None) -> None:
+    """
+    Сохраняет классификацию и версию правил в заявке
+    (вызывается при каждой записи полей оценки).
+    """
+    for column, value in classification_values(application, engine).items():
+        setattr(application, column, value)
+
+
+def classification_values(application, engine: Optional[ScoringEngine] = None) -> Dict[str, Any]:
+    """Значения столбцов классификации по полям оценки заявки или схемы."""
+    engine = engine or get_scoring_engine()
+    score, temperature, department, points = engine.score_with_breakdown(
+        business_niche=application.business_niche,
+        company_size=application.company_size,
+        task_volume=application.task_volume,
+        role=application.role,
+        deadline=application.deadline,
+        budget=float(application.budget) if application.budget is not None else None
+    )
+    values = {
+        "temperature_score": score,
+        "temperature": temperature,
+        "department": department,
+        "scoring_version": engine.version,
+    }
+    values.update(zip(BREAKDOWN_COLUMNS, points))
+    return values
+
+
+def _service_loader(model=Application):
+    """
+    Загрузка услуги вместе с заявками одним JOIN, без отдельного SELECT на строку.
+    model - Application или ApplicationArchive.
+    """
+    from models.admin_settings import AdminSettings
+    return joinedload(model.service).load_only(AdminSettings.services, AdminSettings.budget_range)
+
+
+# Горячие выборки по ключу. Запросы строятся один раз при импорте, а значение
+# ключа передается через bindparam: SQL компилируется один раз и дальше берется
+# из кэша компиляции движка (asyncpg вдобавок держит их подготовленными на сервере).
+APPLICATION_WITH_SERVICE_BY_ID = (
+    select(Application)
+    .options(_service_loader())
+    .where(Application.id == bindparam("application_id"))
+    .limit(1)
+)
+
+# Текущие поля оценки - для обновления, меняющего только часть из них.
+# FOR UPDATE: классификация считается по согласованному набору полей.
+SCORING_FIELDS_BY_ID = (
+    select(*(getattr(Application, field) for field in SCORING_FIELDS))
+    .where(Application.id == bindparam("application_id"))
+    .with_for_update()
+)
+
+
+def _service_returning() -> Tuple:
+    """Данные услуги подзапросами в RETURNING - без отдельной догрузки связи."""
+    from models.admin_settings import AdminSettings
+    # В RETURNING у INSERT SQLAlchemy не коррелирует подзапрос с таблицей
+    # (добавляет ее во FROM), поэтому столбец записанной строки указан явно
+    service_id = literal_column(f"{Application.__tablename__}.service_id")
+    return tuple(
+        select(column).where(AdminSettings.id == service_id).scalar_subquery()
+        for column in (AdminSettings.services, AdminSettings.budget_range)
+    )
+
+
+def _application_returning(event: str) -> Tuple:
+    """RETURNING записи заявки: сама строка, данные услуги и событие NOTIFY."""
+    return (Application, *_service_returning(), application_event_clause(event))
+
+
+# Записи одним запросом: INSERT / UPDATE / DELETE ... RETURNING вместе с
+# уведомлением вместо SELECT, записи, отдельного NOTIFY и refresh
+APPLICATION_INSERT = insert(Application).returning(*_application_returning("created"))
+APPLICATION_UPDATED_RETURNING = _application_returning("updated")
+APPLICATION_DELETE = (
+    delete(Application)
+    .where(Application.id == bindparam("application_id"))
+    .returning(
+        Application.id,
+        notify_clause(APPLICATION_EVENTS_CHANNEL, {"event": "deleted", "id": Application.id})
+    )
+    .execution_options(synchronize_session=False)
+)
+
+
+def _written_application(db, row) -> Application:
+    """
+    Заявка из RETURNING. Объект отсоединяется от сессии до коммита, чтобы
+    коммит не пометил его устаревшим (иначе чтение полей - повторный SELECT);
+    услуга подставляется из тех же строк RETURNING.
+    """
+    from models.admin_settings import AdminSettings
+    application, services, budget_range = row[0], row[1], row[2]
+    db.expunge(application)
+    service = None
+    if application.service_id is not None:
+        service = AdminSettings(id=application.service_id, services=services, budget_range=budget_range)
+    set_committed_value(application, "service", service)
+    return application
+
+
+def _new_application_values(application_data: ApplicationCreate) -> Dict[str, Any]:
+    """Значения новой заявки вместе с классификацией."""
+    values = application_data.model_dump()
+    values.update(classification_values(application_data))
+    return values
+
+
+def _list_order(columns, sort_by_temperature: bool, criterion_sort: Optional[Tuple[str, bool]]) -> List:
+    """
+    Порядок списка заявок. columns - модель или колонки подзапроса,
+    чтобы один и тот же порядок работал и для UNION с архивом.
+    """
+    if criterion_sort:
+        column, descending = criterion_sort
+        order = getattr(columns, column).desc() if descending else getattr(columns, column).asc()
+        return [order.nullslast(), columns.temperature_score.desc().nullslast(), columns.id]
+    if sort_by_temperature:
+        # Сортируем по сохраненному баллу температуры (hot -> medium -> cold)
+        return [columns.temperature_score.desc().nullslast(), columns.created_at.desc(), columns.id]
+    return [columns.created_at.desc(), columns.id]
+
+
+def _statistics_source(include_archived: bool, columns: Tuple[str, ...]):
+    """
+    Заявки для агрегатов: таблица applications или она вместе с архивом
+    (UNION ALL только по нужным колонкам, как в списке с include_archived).
+    """
+    if not include_archived:
+        return Application.__table__
+    from models.application_archive import ApplicationArchive
+    return union_all(*[
+        select(*[getattr(model, column) for column in columns])
+        for model in (Application, ApplicationArchive)
+    ]).subquery("applications")
+
+
 class ApplicationCRUD:
     """CRUD операции для модели Application."""
     
     @staticmethod
     def create(db: Session, application_data: ApplicationCreate) -> Application:
-        """Создать новую заявку."""
-        db_application = Application(**application_data.model_dump())
-        db.add(db_application)
+        """Создать новую заявку (INSERT ... RETURNING вместе с событием created)."""
+        row = db.execute(APPLICATION_INSERT, _new_application_values(application_data)).first()
+        db_application = _written_application(db, row)
         db.commit()
-        db.refresh(db_application)
         return db_application
     
     @staticmethod
-    def get_by_id(db: Session, application_id: int) -> Optional[Application]:
-        """Получить заявку по ID."""
-        return db.query(Application).filter(Application.id == application_id).first()
+    def get_by_id(db: Session, application_id: int, include_archived: bool = False) -> Optional[Application]:
+        """
+        Получить заявку по ID (вместе с данными услуги).
+        С include_archived заявка, не найденная в горячей таблице, ищется в архиве.
+        """
+        application = db.execute(
+            APPLICATION_WITH_SERVICE_BY_ID, {"application_id": application_id}
+        ).scalars().first()
+        if application is None and include_archived:
+            from models.application_archive import ApplicationArchiveCRUD
+            return ApplicationArchiveCRUD.get_by_id(db=db, application_id=application_id)
+        return application
     
     @staticmethod
-    def get_all(db: Session, skip: int = 0, limit: int = 100, sort_by_temperature: bool = True) -> List[Application]:
-        """Получить все заявки с пагинацией."""
-        query = db.query(Application)
-        
-        if sort_by_temperature:
-            # Сортируем по температуре (hot -> medium -> cold)
-            from models.temperature_analysis import calculate_temperature_score
-            
-            # Создаем функцию для сортировки
-            # В SQLAlchemy сложно сортировать по вычисляемому полю, поэтому
-            # будем сортировать в Python после получения данных
-            applications = query.offset(skip).limit(limit * 3).all()  # Берем больше для сортировки
-            
-            # Сортируем по температуре
-            def get_temp_score(app):
-                score, _, _ = calculate_temperature_score(
-                    business_niche=app.business_niche,
-                    company_size=app.company_size,
-                    task_volume=app.task_volume,
-                    role=app.role,
-                    deadline=app.deadline,
-                    budget=float(app.budget) if app.budget else None
-                )
-                return score
-            
-            applications.sort(key=get_temp_score, reverse=True)
-            return applications[:limit]
+    def get_all(
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        sort_by_temperature: bool = True,
+        fields: Optional[List[str]] = None,
+        criterion_sort: Optional[Tuple[str, bool]] = None,
+        criterion_filters: Optional[List[Tuple[str, str, int]]] = None,
+        include_archived: bool = False
+    ) -> List[Application]:
+        """
+        Получить все заявки с пагинацией.
+        Если передан fields, из БД загружаются только нужные колонки.
+        criterion_sort и criterion_filters сортируют и фильтруют по сохраненным
+        баллам критериев (см. parse_criterion_sort / parse_criterion_filters).
+        include_archived добавляет заявки из архива.
+        """
+        if include_archived:
+            return ApplicationCRUD._get_all_with_archive(
+                db, skip, limit, sort_by_temperature, fields, criterion_sort, criterion_filters
+            )
+        query = ApplicationCRUD._list_query(db, Application, fields, criterion_filters)
+        query = query.order_by(*_list_order(Application, sort_by_temperature, criterion_sort))
+        return query.offset(skip).limit(limit).all()
+    
+    @staticmethod
+    def _list_query(db: Session, model, fields: Optional[List[str]], criterion_filters):
+        """Запрос списка по таблице model с выборкой полей и фильтрами по критериям."""
+        query = db.query(model)
+        if fields:
+            columns = columns_for_fields(fields)
+            query = query.options(load_only(*[getattr(model, column) for column in columns]))
+            if any(field in SERVICE_FIELDS for field in fields):
+                query = query.options(_service_loader(model))
         else:
-            return query.order_by(Application.created_at.desc()).offset(skip).limit(limit).all()
+            query = query.options(_service_loader(model))
+        
+        for column, op, value in criterion_filters or ():
+            query = query.filter(CRITERION_OPERATORS[op](getattr(model, column), value))
+        return query
     
     @staticmethod
-    def update(db: Session, application_id: int, application_data: ApplicationUpdate) -> Optional[Application]:
-        """Обновить заявку."""
-        db_application = db.query(Application).filter(Application.id == application_id).first()
-        if not db_application:
-            return None
+    def _get_all_with_archive(
+        db: Session,
+        skip: int,
+        limit: int,
+        sort_by_temperature: bool,
+        fields: Optional[List[str]],
+        criterion_sort: Optional[Tuple[str, bool]],
+        criterion_filters: Optional[List[Tuple[str, str, int]]]
+    ) -> List[Any]:
+        """
+        Список по горячей и архивной таблицам: страница id выбирается одним
+        UNION ALL по колонкам сортировки, затем строки догружаются из каждой таблицы.
+        Каждая ветка UNION сама сортируется и ограничивается skip + limit строками,
+        поэтому общая сортировка идет только по их первым строкам, а не по обеим таблицам.
+        """
+        from models.application_archive import ApplicationArchive
+        
+        def page_select(model, archived: bool):
+            columns = [model.id.label("id"), literal(archived).label("archived"),
+                       model.temperature_score.label("temperature_score"), model.created_at.label("created_at")]
+            if criterion_sort:
+                columns.append(getattr(model, criterion_sort[0]).label(criterion_sort[0]))
+            statement = select(*columns)
+            for column, op, value in criterion_filters or ():
+                statement = statement.where(CRITERION_OPERATORS[op](getattr(model, column), value))
+            return (
+                statement
+                .order_by(*_list_order(model, sort_by_temperature, criterion_sort))
+                .limit(skip + limit)
+            )
         
+        page = union_all(page_select(Application, False), page_select(ApplicationArchive, True)).subquery()
+        rows = db.execute(
+            select(page.c.id, page.c.archived)
+            .order_by(*_list_order(page.c, sort_by_temperature, criterion_sort))
+            .offset(skip)
+            .limit(limit)
+        ).all()
+        
+        loaded = {}
+        for model, archived in ((Application, False), (ApplicationArchive, True)):
+            ids = [row.id for row in rows if row.archived == archived]
+            if ids:
+                query = ApplicationCRUD._list_query(db, model, fields, None).filter(model.id.in_(ids))
+                loaded.update(((archived, item.id), item) for item in query)
+        return [loaded[(row.archived, row.id)] for row in rows if (row.archived, row.id) in loaded]
+    
+    @staticmethod
+    def get_statistics(db: Session, include_archived: bool = False) -> Dict[str, Any]:
+        """
+        Распределение заявок и бюджетов по температуре и отделам
+        (один агрегирующий запрос по сохраненной классификации, как в списках).
+        include_archived добавляет заявки из архива.
+        """
+        source = _statistics_source(include_archived, ("id", "temperature", "department", "budget"))
+        rows = (
+            db.query(
+                source.c.temperature,
+                source.c.department,
+                func.count(source.c.id),
+                func.sum(source.c.budget)
+            )
+            .group_by(source.c.temperature, source.c.department)
+            .all()
+        )
+        total = 0
+        total_budget = 0.0
+        by_temperature = {temperature: 0 for temperature in TEMPERATURE_INFO}
+        budgets_by_temperature = {temperature: 0.0 for temperature in TEMPERATURE_INFO}
+        by_department: Dict[str, int] = {}
+        for temperature, department, count, budget in rows:
+            budget = float(budget) if budget is not None else 0.0
+            total += count
+            total_budget += budget
+            if temperature in by_temperature:
+                by_temperature[temperature] += count
+                budgets_by_temperature[temperature] += budget
+            if department is not None:
+                by_department[department] = by_department.get(department, 0) + count
+        return {
+            "total": total,
+            "by_temperature": by_temperature,
+            "by_department": by_department,
+            "total_budget": total_budget,
+            "budgets_by_temperature": budgets_by_temperature,
+            "average_budget": total_budget / total if total > 0 else 0.0
+        }
+    
+    @staticmethod
+    def get_criteria_statistics(db: Session, include_archived: bool = False) -> Dict[str, Any]:
+        """
+        Средние баллы по критериям в разрезе температуры (один агрегирующий запрос).
+        Показывает, какие критерии тянут заявки вниз.
+        include_archived добавляет заявки из архива.
+        """
+        source = _statistics_source(include_archived, ("id", "temperature") + BREAKDOWN_COLUMNS)
+        rows = (
+            db.query(
+                source.c.temperature,
+                func.count(source.c.id),
+                *[func.avg(source.c[column]) for column in BREAKDOWN_COLUMNS]
+            )
+            .filter(source.c.score_niche.isnot(None))
+            .group_by(source.c.temperature)
+            .all()
+        )
+        by_temperature = {}
+        for temperature, count, *averages in rows:
+            by_temperature[temperature] = {
+                "count": count,
+                "average": {
+                    criterion: round(float(average), 2) if average is not None else 0.0
+                    for criterion, average in zip(SCORE_CRITERIA, averages)
+                }
+            }
+        return {"criteria": list(SCORE_CRITERIA), "by_temperature": by_temperature}
+    
+    @staticmethod
+    def get_service_statistics(
+        db: Session,
+        active_only: bool = False,
+        budget_from: Optional[float] = None,
+        budget_to: Optional[float] = None,
+        include_archived: bool = False
+    ) -> List["ServiceStatistics"]:
+        """
+        Статистика заявок по услугам одним запросом (JOIN по индексу service_id).
+        budget_from / budget_to оставляют услуги, чей диапазон пересекается с заданным.
+        include_archived добавляет заявки из архива.
+        """
+        from models.admin_settings import AdminSettings
+        
+        source = _statistics_source(include_archived, ("id", "service_id", "temperature", "budget"))
+        in_service_band = and_(
+            source.c.budget >= func.coalesce(AdminSettings.budget_min, source.c.budget),
+            source.c.budget <= func.coalesce(AdminSettings.budget_max, source.c.budget)
+        )
+        query = (
+            db.query(
+                AdminSettings.id,
+                func.coalesce(AdminSettings.name, AdminSettings.services),
+                AdminSettings.budget_min,
+                AdminSettings.budget_max,
+                AdminSettings.is_active,
+                func.count(source.c.id),
+                func.count(source.c.id).filter(source.c.temperature == "hot"),
+                func.count(source.c.id).filter(source.c.temperature == "medium"),
+                func.count(source.c.id).filter(source.c.temperature == "cold"),
+                func.avg(source.c.budget),
+                func.count(source.c.id).filter(in_service_band)
+            )
+            .outerjoin(source, source.c.service_id == AdminSettings.id)
+        )
+        if active_only:
+            query = query.filter(AdminSettings.is_active.is_(True))
+        if budget_from is not None:
+            query = query.filter(or_(AdminSettings.budget_max.is_(None), AdminSettings.budget_max >= budget_from))
+        if budget_to is not None:
+            query = query.filter(or_(AdminSettings.budget_min.is_(None), AdminSettings.budget_min <= budget_to))
+        rows = (
+            query.group_by(AdminSettings.id)
+            .order_by(AdminSettings.sort_order, AdminSettings.id)
+            .all()
+        )
+        return [
+            ServiceStatistics(
+                service_id=service_id,
+                name=name,
+                budget_min=float(budget_min) if budget_min is not None else None,
+                budget_max=float(budget_max) if budget_max is not None else None,
+                is_active=is_active,
+                total=total,
+                by_temperature={"hot": hot, "medium": medium, "cold": cold},
+                average_budget=float(average_budget) if average_budget is not None else None,
+                within_budget_range=within_band
+            )
+            for (service_id, name, budget_min, budget_max, is_active, total,
+                 hot, medium, cold, average_budget, within_band) in rows
+        ]
+    
+    @staticmethod
+    def update(db: Session, application_id: int, application_data: ApplicationUpdate) -> Optional[Application]:
+        """
+        Обновить заявку одним UPDATE ... RETURNING (вместе с событием updated).
+        Если меняется только часть полей оценки, остальные сначала читаются
+        под блокировкой строки - классификация считается по всем полям.
+        """
         update_data = application_data.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_application, key, value)
+        # Пустое обновление не трогает updated_at, как и раньше
+        values = dict(update_data) or {"updated_at": Application.updated_at}
+        if any(key in SCORING_FIELDS for key in update_data):
+            scoring = {field: update_data[field] for field in SCORING_FIELDS if field in update_data}
+            if len(scoring) < len(SCORING_FIELDS):
+                current = db.execute(SCORING_FIELDS_BY_ID, {"application_id": application_id}).mappings().first()
+                if current is None:
+                    db.rollback()
+                    return None
+                scoring = {**current, **scoring}
+            values.update(classification_values(SimpleNamespace(**scoring)))
         
+        row = db.execute(
+            update(Application)
+            .where(Application.id == application_id)
+            .values(**values)
+            .returning(*APPLICATION_UPDATED_RETURNING)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        ).first()
+        if row is None:
+            db.rollback()
+            return None
+        db_application = _written_application(db, row)
         db.commit()
-        db.refresh(db_application)
         return db_application
     
     @staticmethod
     def delete(db: Session, application_id: int) -> bool:
-        """Удалить заявку."""
-        db_application = db.query(Application).filter(Application.id == application_id).first()
-        if not db_application:
+        """Удалить заявку (DELETE ... RETURNING вместе с событием deleted)."""
+        deleted_id = db.execute(APPLICATION_DELETE, {"application_id": application_id}).scalar()
+        if deleted_id is None:
+            db.rollback()
             return False
-        
-        db.delete(db_application)
         db.commit()
         return True
+
+
+class AsyncApplicationCRUD:
+    """
+    Асинхронные операции с заявками для async-роутов (сессия asyncpg).
+    Объекты возвращаются полностью загруженными: ленивая догрузка в async невозможна.
+    """
+
+    @staticmethod
+    async def create(db: AsyncSession, application_data: ApplicationCreate) -> Application:
+        """Создать новую заявку (INSERT ... RETURNING вместе с событием created)."""
+        row = (await db.execute(APPLICATION_INSERT, _new_application_values(application_data))).first()
+        db_application = _written_application(db, row)
+        await db.commit()
+        return db_application
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, application_id: int, refresh: bool = False) -> Optional[Application]:
+        """Получить заявку по ID (вместе с данными услуги)."""
+        result = await db.execute(
+            APPLICATION_WITH_SERVICE_BY_ID,
+            {"application_id": application_id},
+            execution_options={"populate_existing": refresh}
+        )
+        return result.scalars().first()
@@ -45,6 +45,8 @@ class BehaviorMetrics(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from datetime import datetime
@@ -89,27 +91,65 @@ class BehaviorMetricsResponse(BaseModel):
         from_attributes = True
 
 
+# Выборки по ключу, построенные один раз (SQL берется из кэша компиляции)
+METRICS_BY_ID = select(BehaviorMetrics).where(BehaviorMetrics.id == bindparam("metrics_id")).limit(1)
+METRICS_BY_APPLICATION_ID = (
+    select(BehaviorMetrics).where(BehaviorMetrics.application_id == bindparam("application_id")).limit(1)
+)
+
+# Записи одним запросом (INSERT / DELETE ... RETURNING) вместо записи и refresh
+METRICS_INSERT = insert(BehaviorMetrics).returning(BehaviorMetrics)
+METRICS_DELETE = (
+    delete(BehaviorMetrics)
+    .where(BehaviorMetrics.id == bindparam("metrics_id"))
+    .returning(BehaviorMetrics.id)
+    .execution_options(synchronize_session=False)
+)
+
+
+def _update_metrics(db: Session, condition, metrics_data: BehaviorMetricsUpdate) -> Optional[BehaviorMetrics]:
+    """
+    Обновляет запись одним UPDATE ... RETURNING. Объект отсоединяется от
+    сессии до коммита, иначе коммит пометит его устаревшим и чтение полей
+    станет повторным SELECT.
+    """
+    update_data = metrics_data.model_dump(exclude_unset=True)
+    db_metrics = db.execute(
+        update(BehaviorMetrics)
+        .where(condition)
+        # Пустое обновление не трогает updated_at, как и раньше
+        .values(**(update_data or {"updated_at": BehaviorMetrics.updated_at}))
+        .returning(BehaviorMetrics)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    ).scalars().first()
+    if db_metrics is None:
+        db.rollback()
+        return None
+    db.expunge(db_metrics)
+    db.commit()
+    return db_metrics
+
+
 class BehaviorMetricsCRUD:
     """CRUD операции для модели BehaviorMetrics."""
     
     @staticmethod
     def create(db: Session, metrics_data: BehaviorMetricsCreate) -> BehaviorMetrics:
-        """Создать новую запись о метриках поведения."""
-        db_metrics = BehaviorMetrics(**metrics_data.model_dump())
-        db.add(db_metrics)
+        """Создать новую запись о метриках поведения (INSERT ... RETURNING)."""
+        db_metrics = db.execute(METRICS_INSERT, metrics_data.model_dump()).scalars().one()
+        db.expunge(db_metrics)
         db.commit()
-        db.refresh(db_metrics)
         return db_metrics
     
     @staticmethod
     def get_by_id(db: Session, metrics_id: int) -> Optional[BehaviorMetrics]:
         """Получить запись о метриках по ID."""
-        return db.query(BehaviorMetrics).filter(BehaviorMetrics.id == metrics_id).first()
+        return db.execute(METRICS_BY_ID, {"metrics_id": metrics_id}).scalars().first()
     
     @staticmethod
     def get_by_application_id(db: Session, application_id: int) -> Optional[BehaviorMetrics]:
         """Получить запись о метриках по application_id."""
-        return db.query(BehaviorMetrics).filter(BehaviorMetrics.application_id == application_id).first()
+        return db.execute(METRICS_BY_APPLICATION_ID, {"application_id": application_id}).scalars().first()
     
     @staticmethod
     def get_all(db: Session, skip: int = 0, limit: int = 100) -> List[BehaviorMetrics]:
@@ -119,41 +159,50 @@ class BehaviorMetricsCRUD:
     @staticmethod
     def update(db: Session, metrics_id: int, metrics_data: BehaviorMetricsUpdate) -> Optional[BehaviorMetrics]:
         """Обновить запись о метриках."""
-        db_metrics = db.query(BehaviorMetrics).filter(BehaviorMetrics.id == metrics_id).first()
-        if not db_metrics:
-            return None
-        
-        update_data = metrics_data.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_metrics, key, value)
-        
-        db.commit()
-        db.refresh(db_metrics)
-        return db_metrics
+        return _update_metrics(db, BehaviorMetrics.id == metrics_id, metrics_data)
     
     @staticmethod
     def update_by_application_id(db: Session, application_id: int, metrics_data: BehaviorMetricsUpdate) -> Optional[BehaviorMetrics]:
-        """Обновить запись о метриках по application_id."""
-        db_metrics = db.query(BehaviorMetrics).filter(BehaviorMetrics.application_id == application_id).first()
-        if not db_metrics:
-            return None
-        
-        update_data = metrics_data.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_metrics, key, value)
-        
-        db.commit()
-        db.refresh(db_metrics)
-        return db_metrics
+        """Обновить запись о метриках по application_id (первую найденную, как и выборка)."""
+        first_id = (
+            select(BehaviorMetrics.id)
+            .where(BehaviorMetrics.application_id == application_id)
+            .limit(1)
+            .correlate(None)
+            .scalar_subquery()
+        )
+        return _update_metrics(db, BehaviorMetrics.id == first_id, metrics_data)
     
     @staticmethod
     def delete(db: Session, metrics_id: int) -> bool:
-        """Удалить запись о метриках."""
-        db_metrics = db.query(BehaviorMetrics).filter(BehaviorMetrics.id == metrics_id).first()
-        if not db_metrics:
+        """Удалить запись о метриках (DELETE ... RETURNING)."""
+        deleted_id = db.execute(METRICS_DELETE, {"metrics_id": metrics_id}).scalar()
+        if deleted_id is None:
+            db.rollback()
             return False
-        
-        db.delete(db_metrics)
         db.commit()
         return True
 
+
+
+class AsyncBehaviorMetricsCRUD:
+    """Асинхронные операции с метриками для async-роутов (сессия asyncpg)."""
+
+    @staticmethod
+    async def create(db: AsyncSession, metrics_data: BehaviorMetricsCreate) -> BehaviorMetrics:
+        """Создать новую запись о метриках поведения (INSERT ... RETURNING)."""
+        db_metrics = (await db.execute(METRICS_INSERT, metrics_data.model_dump())).scalars().one()
+        await db.commit()
+        return db_metrics
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, metrics_id: int) -> Optional[BehaviorMetrics]:
+        """Получить запись о метриках по ID."""
+        return (await db.execute(METRICS_BY_ID, {"metrics_id": metrics_id})).scalars().first()
+
+    @staticmethod
+    async def get_all(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[BehaviorMetrics]:
+        """Получить все записи о метриках с пагинацией."""
+        return list((await db.execute(
+            select(BehaviorMetrics).offset(skip).limit(limit)
+        )).scalars().all())
@@ -0,0 +1,339 @@
+"""
+Версионированные наборы правил оценки температуры льда.
+
+Правила хранятся в БД строками scoring_rule_sets (JSON), активен ровно один
+набор. Каждый воркер держит скомпилированный движок в памяти и подменяет его
+при активации нового набора: активация отправляет NOTIFY, слушатель каждого
+воркера перечитывает активный набор. Заявка хранит версию правил, по которой
+ее оценили, поэтому пересчет затрагивает только устаревшие заявки.
+"""
+import logging
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, Text, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from core.database import Base
+
+logger = logging.getLogger(__name__)
+
+
+class ScoringRuleSet(Base):
+    """
+    Модель набора правил оценки.
+
+    SQL код для генерации таблицы:
+
+    CREATE TABLE scoring_rule_sets (
+        id SERIAL PRIMARY KEY,
+        version INTEGER NOT NULL UNIQUE,
+        rules JSONB NOT NULL,
+        comment TEXT,
+        is_active BOOLEAN NOT NULL DEFAULT FALSE,
+        created_by INTEGER REFERENCES admins(id) ON DELETE SET NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        activated_at TIMESTAMP WITH TIME ZONE
+    );
+
+    CREATE UNIQUE INDEX ix_scoring_rule_sets_single_active
+        ON scoring_rule_sets (is_active) WHERE is_active;
+    """
+    __tablename__ = "scoring_rule_sets"
+
+    id = Column(Integer, primary_key=True, index=True)
+    version = Column(Integer, nullable=False, unique=True)
+    rules = Column(JSONB, nullable=False)
+    comment = Column(Text, nullable=True)
+    is_active = Column(Boolean, nullable=False, default=False, server_default=text("false"))
+    created_by = Column(Integer, ForeignKey("admins.id", ondelete="SET NULL"), nullable=True)
+
+    # Временные метки
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    activated_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Не больше одного активного набора
+        Index(
+            "ix_scoring_rule_sets_single_active",
+            "is_active",
+            unique=True,
+            postgresql_where=text("is_active")
+        ),
+    )
+
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from typing import Optional, List
+from datetime import datetime
+from pydantic import BaseModel
+from core.database import SessionLocal
+from core.notifications import listener, notify
+from models.applications import APPLICATION_EVENTS_CHANNEL, SCORING_FIELDS, Application
+from models.temperature_analysis import (
+    BUILTIN_RULES_VERSION,
+    DEFAULT_SCORING_RULES,
+    SCORE_CRITERIA,
+    ScoringEngine,
+    ScoringRulesDefinition,
+    compile_scoring_rules,
+    get_scoring_engine,
+    set_scoring_engine
+)
+
+# Канал NOTIFY об активации нового набора правил
+SCORING_RULES_CHANNEL = "scoring_rules"
+
+# Ключ pg_advisory_xact_lock для выдачи номера версии правил
+# (продолжает ряд ключей в models/admin.py и migrate.py)
+SCORING_RULES_ADVISORY_LOCK_KEY = 7_401_003
+
+RESCORE_BATCH_SIZE = 5000
+
+RESCORE_BATCH_SQL = text("""
+    UPDATE applications AS a
+    SET temperature_score = v.score,
+        temperature = v.temperature,
+        department = v.department,
+        score_niche = v.niche,
+        score_company_size = v.company_size,
+        score_task_volume = v.task_volume,
+        score_role = v.role,
+        score_deadline = v.deadline,
+        score_budget = v.budget,
+        scoring_version = :version,
+        updated_at = now()
+    FROM unnest(
+        CAST(:ids AS integer[]),
+        CAST(:scores AS integer[]),
+        CAST(:temperatures AS varchar[]),
+        CAST(:departments AS varchar[]),
+        CAST(:niche AS smallint[]),
+        CAST(:company_size AS smallint[]),
+        CAST(:task_volume AS smallint[]),
+        CAST(:role AS smallint[]),
+        CAST(:deadline AS smallint[]),
+        CAST(:budget AS smallint[])
+    ) AS v(id, score, temperature, department, niche, company_size, task_volume, role, deadline, budget)
+    WHERE a.id = v.id
+""")
+
+
+class ScoringRuleSetCreate(BaseModel):
+    """Схема для создания набора правил."""
+    rules: ScoringRulesDefinition
+    comment: Optional[str] = None
+    activate: bool = False
+
+
+class ScoringRuleSetResponse(BaseModel):
+    """Схема для ответа с набором правил."""
+    id: int
+    version: int
+    rules: ScoringRulesDefinition
+    comment: Optional[str] = None
+    is_active: bool
+    created_by: Optional[int] = None
+    created_at: Optional[datetime] = None
+    activated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ActiveScoringRules(BaseModel):
+    """Правила, по которым сейчас оценивает этот воркер."""
+    version: int
+    builtin: bool
+    rules: ScoringRulesDefinition
+    outdated_applications: int
+
+
+class RescoreResult(BaseModel):
+    """Итог пересчета заявок."""
+    scoring_version: int
+    rescored: int
+
+
+def _load_engine(db: Session) -> ScoringEngine:
+    """Компилирует активный набор из БД (или встроенные правила)."""
+    active = db.query(ScoringRuleSet).filter(ScoringRuleSet.is_active.is_(True)).first()
+    if active is None:
+        return compile_scoring_rules(DEFAULT_SCORING_RULES, BUILTIN_RULES_VERSION)
+    return compile_scoring_rules(active.rules, active.version)
+
+
+def refresh_scoring_engine(db: Optional[Session] = None) -> ScoringEngine:
+    """
+    Сверяет версию активного набора с движком процесса и при расхождении
+    подменяет движок. Без db открывает собственную сессию.
+    """
+    own_session = db is None
+    if own_session:
+        db = SessionLocal()
+    try:
+        active_version = db.query(ScoringRuleSet.version).filter(ScoringRuleSet.is_active.is_(True)).scalar()
+        if active_version is None:
+            active_version = BUILTIN_RULES_VERSION
+        engine = get_scoring_engine()
+        if engine.version != active_version:
+            engine = _load_engine(db)
+            set_scoring_engine(engine)
+            logger.info("Активирована версия правил оценки %s", engine.version)
+        return engine
+    finally:
+        if own_session:
+            db.close()
+
+
+def _on_scoring_rules_notification(payload: Optional[str]) -> None:
+    # payload None - переподключение слушателя, сверяем версию в любом случае
+    refresh_scoring_engine()
+
+
+listener.subscribe(SCORING_RULES_CHANNEL, _on_scoring_rules_notification)
+
+
+class ScoringRuleSetCRUD:
+    """CRUD операции для наборов правил оценки."""
+
+    @staticmethod
+    def create(db: Session, rule_set_data: ScoringRuleSetCreate, admin_id: Optional[int] = None) -> ScoringRuleSet:
+        """
+        Создать новую версию правил (версия = последняя + 1).
+        Одновременные создания сериализуются advisory-блокировкой до коммита,
+        поэтому не получают один и тот же номер.
+        """
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCORING_RULES_ADVISORY_LOCK_KEY})
+        next_version = (db.query(func.max(ScoringRuleSet.version)).scalar() or BUILTIN_RULES_VERSION) + 1
+        db_rule_set = ScoringRuleSet(
+            version=next_version,
+            rules=rule_set_data.rules.model_dump(),
+            comment=rule_set_data.comment,
+            created_by=admin_id
+        )
+        db.add(db_rule_set)
+        db.commit()
+        db.refresh(db_rule_set)
+        if rule_set_data.activate:
+            return ScoringRuleSetCRUD.activate(db=db, version=next_version)
+        return db_rule_set
+
+    @staticmethod
+    def get_all(db: Session) -> List[ScoringRuleSet]:
+        """Получить все версии правил (новые первыми)."""
+        return db.query(ScoringRuleSet).order_by(ScoringRuleSet.version.desc()).all()
+
+    @staticmethod
+    def get_by_version(db: Session, version: int) -> Optional[ScoringRuleSet]:
+        """Получить набор правил по версии."""
+        return db.query(ScoringRuleSet).filter(ScoringRuleSet.version == version).first()
+
+    @staticmethod
+    def activate(db: Session, version: int) -> Optional[ScoringRuleSet]:
+        """
+        Сделать версию активной. Остальные воркеры получат NOTIFY после коммита
+        и перечитают правила; текущий воркер подменяет движок сразу.
+        """
+        db_rule_set = (
+            db.query(ScoringRuleSet)
+            .filter(ScoringRuleSet.version == version)
+            .with_for_update()
+            .first()
+        )
+        if not db_rule_set:
+            return None
+
+        db.execute(
+            update(ScoringRuleSet)
+            .where(ScoringRuleSet.is_active.is_(True), ScoringRuleSet.version != version)
+            .values(is_active=False)
+            .execution_options(synchronize_session=False)
+        )
+        db.flush()
+        if not db_rule_set.is_active:
+            db_rule_set.is_active = True
+            db_rule_set.activated_at = func.now()
+        notify(db, SCORING_RULES_CHANNEL, {"version": version})
+        db.commit()
+        db.refresh(db_rule_set)
+
+        set_scoring_engine(compile_scoring_rules(db_rule_set.rules, db_rule_set.version))
+        return db_rule_set
+
+    @staticmethod
+    def get_active(db: Session) -> ActiveScoringRules:
+        """Активные правила и количество заявок, оцененных другой версией."""
+        engine = refresh_scoring_engine(db)
+        outdated = (
+            db.query(func.count(Application.id))
+            .filter(Application.scoring_version.is_distinct_from(engine.version))
+            .scalar()
+        )
+        return ActiveScoringRules(
+            version=engine.version,
+            builtin=engine.version == BUILTIN_RULES_VERSION,
+            rules=engine.rules,
+            outdated_applications=outdated
+        )
+
+    @staticmethod
+    def rescore(
+        db: Session,
+        from_version: Optional[int] = None,
+        batch_size: int = RESCORE_BATCH_SIZE
+    ) -> RescoreResult:
+        """
+        Пересчитать заявки, оцененные не активной версией правил.
+        Если передан from_version, пересчитываются только заявки этой версии.
+        Работает пачками по id, каждая пачка - отдельная транзакция.
+        """
+        engine = refresh_scoring_engine(db)
+        condition = Application.scoring_version.is_distinct_from(engine.version)
+        if from_version is not None:
+            condition = Application.scoring_version == from_version
+
+        scoring_columns = [getattr(Application, field) for field in SCORING_FIELDS]
+        rescored = 0
+        last_id = 0
+        while True:
+            rows = (
+                db.query(Application.id, *scoring_columns)
+                .filter(condition, Application.id > last_id)
+                .order_by(Application.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                break
+            classifications = [
+                engine.score_with_breakdown(
+                    business_niche=row.business_niche,
+                    company_size=row.company_size,
+                    task_volume=row.task_volume,
+                    role=row.role,
+                    deadline=row.deadline,
+                    budget=float(row.budget) if row.budget is not None else None
+                )
+                for row in rows
+            ]
+            params = {
+                "ids": [row.id for row in rows],
+                "scores": [score for score, _, _, _ in classifications],
+                "temperatures": [temperature for _, temperature, _, _ in classifications],
+                "departments": [department for _, _, department, _ in classifications],
+                "version": engine.version
+            }
+            for index, criterion in enumerate(SCORE_CRITERIA):
+                params[criterion] = [points[index] for _, _, _, points in classifications]
+            # Одна команда UPDATE на пачку вместо команды на строку
+            db.execute(RESCORE_BATCH_SQL, params)
+            db.commit()
+            last_id = rows[-1].id
+            rescored += len(rows)
+
+        if rescored:
+            notify(db, APPLICATION_EVENTS_CHANNEL, {
+                "event": "rescored",
+                "count": rescored,
+                "scoring_version": engine.version
+            })
+            db.commit()
+        return RescoreResult(scoring_version=engine.version, rescored=rescored)
@@ -1,9 +1,317 @@
 """
 Модуль для анализа температуры льда (hot/medium/cold) заявок.
 """
-from typing import Optional, Dict, Tuple
+from typing import Any, Optional, Dict, List, Tuple
 from decimal import Decimal
 
+from pydantic import BaseModel
+
+
+class KeywordTier(BaseModel):
+    """Группа ключевых слов с баллом (совпадение по вхождению подстроки)."""
+    keywords: List[str]
+    score: int
+
+
+class BudgetThreshold(BaseModel):
+    """Порог бюджета: бюджет от min_budget дает score баллов."""
+    min_budget: float
+    score: int
+
+
+class DepartmentRule(BaseModel):
+    """
+    Правило выбора отдела. Срабатывает, если выполнено любое из условий.
+    Правила проверяются по порядку.
+    """
+    department: str
+    min_budget: Optional[float] = None
+    company_sizes: List[str] = []
+    niches: List[str] = []
+    task_volumes: List[str] = []
+
+
+class ScoringRulesDefinition(BaseModel):
+    """Набор правил оценки температуры льда (хранится в БД в виде JSON)."""
+    # 1. Ниша бизнеса: первая совпавшая группа, иначе niche_default_score
+    niche_tiers: List[KeywordTier]
+    niche_default_score: int = 0
+    # 2. Размер компании и 3. объем задачи: точное совпадение
+    company_size_scores: Dict[str, int]
+    task_volume_scores: Dict[str, int]
+    # 4. Роль заполняющего
+    role_tiers: List[KeywordTier]
+    role_default_score: int = 0
+    # 5. Сроки: первая совпавшая группа
+    deadline_tiers: List[KeywordTier]
+    # 6. Бюджет: первый порог, который бюджет достигает
+    budget_thresholds: List[BudgetThreshold]
+    budget_default_score: int = 0
+    # Границы температуры
+    hot_threshold: int
+    medium_threshold: int
+    # Отделы
+    department_rules: List[DepartmentRule]
+    default_department: str
+
+
+# Критерии оценки в порядке разбивки баллов
+SCORE_CRITERIA = ("niche", "company_size", "task_volume", "role", "deadline", "budget")
+
+# Версия встроенных правил (используются, пока в БД нет активного набора)
+BUILTIN_RULES_VERSION = 0
+
+DEFAULT_SCORING_RULES: Dict[str, Any] = {
+    "niche_tiers": [
+        {
+            "keywords": [
+                "финтех", "fintech", "криптовалюты", "crypto", "blockchain",
+                "медицина", "healthcare", "биотехнологии", "biotech",
+                "энергетика", "energy", "нефть", "oil", "газ", "gas",
+                "недвижимость", "real estate", "строительство", "construction",
+                "логистика", "logistics", "транспорт", "transport",
+                "образование", "education", "edtech"
+            ],
+            "score": 20
+        },
+        {
+            "keywords": [
+                "e-commerce", "интернет-магазин", "retail", "розница",
+                "производство", "manufacturing", "промышленность", "industry",
+                "реклама", "advertising", "маркетинг", "marketing",
+                "консалтинг", "consulting", "услуги", "services"
+            ],
+            "score": 10
+        }
+    ],
+    "niche_default_score": 5,
+    "company_size_scores": {
+        "enterprise": 20,
+        "large": 15,
+        "medium": 10,
+        "small": 5,
+        "startup": 3
+    },
+    "task_volume_scores": {
+        "enterprise": 15,
+        "large": 12,
+        "medium": 8,
+        "small": 4
+    },
+    "role_tiers": [
+        {"keywords": ["ceo", "генеральный директор", "директор", "founder", "основатель", "owner", "владелец"], "score": 20},
+        {"keywords": ["cto", "технический директор", "cfo", "финансовый директор", "coo", "операционный директор"], "score": 15},
+        {"keywords": ["менеджер", "manager", "руководитель", "head", "lead"], "score": 10}
+    ],
+    "role_default_score": 5,
+    "deadline_tiers": [
+        {"keywords": ["urgent", "срочно", "asap"], "score": 15},
+        {"keywords": ["1-2 weeks", "1-2 недели"], "score": 10},
+        {"keywords": ["1 month", "1 месяц"], "score": 5},
+        {"keywords": ["flexible", "гибкие"], "score": 2}
+    ],
+    "budget_thresholds": [
+        {"min_budget": 1000000, "score": 10},  # 1M+
+        {"min_budget": 500000, "score": 8},  # 500K+
+        {"min_budget": 200000, "score": 6},  # 200K+
+        {"min_budget": 100000, "score": 4},  # 100K+
+        {"min_budget": 50000, "score": 2}  # 50K+
+    ],
+    "budget_default_score": 1,
+    "hot_threshold": 70,
+    "medium_threshold": 40,
+    "department_rules": [
+        # Большой бюджет или enterprise - VIP отдел
+        {"department": "VIP отдел", "min_budget": 500000, "company_sizes": ["enterprise"]},
+        # Технические ниши - технический отдел
+        {
+            "department": "Технический отдел",
+            "niches": ["финтех", "fintech", "криптовалюты", "crypto", "blockchain", "edtech", "saas"]
+        },
+        # Медицина и биотех - специализированный отдел
+        {"department": "Специализированный отдел", "niches": ["медицина", "healthcare", "биотехнологии", "biotech"]},
+        # Большие задачи - отдел крупных проектов
+        {"department": "Отдел крупных проектов", "task_volumes": ["large", "enterprise"]}
+    ],
+    "default_department": "Общий отдел"
+}
+
+
+def _lower_all(values: List[str]) -> Tuple[str, ...]:
+    return tuple(value.lower() for value in values)
+
+
+class ScoringEngine:
+    """
+    Скомпилированный набор правил: строки приведены к нижнему регистру,
+    пороги отсортированы. Экземпляр неизменяем, поэтому его можно
+    безопасно подменять целиком, не прерывая идущие запросы.
+    """
+
+    def __init__(self, rules: ScoringRulesDefinition, version: int):
+        self.version = version
+        self.rules = rules
+        self._niche_tiers = [(_lower_all(tier.keywords), tier.score) for tier in rules.niche_tiers]
+        self._company_size_scores = {key.lower(): value for key, value in rules.company_size_scores.items()}
+        self._task_volume_scores = {key.lower(): value for key, value in rules.task_volume_scores.items()}
+        self._role_tiers = [(_lower_all(tier.keywords), tier.score) for tier in rules.role_tiers]
+        self._deadline_tiers = [(_lower_all(tier.keywords), tier.score) for tier in rules.deadline_tiers]
+        self._budget_thresholds = sorted(
+            ((Decimal(str(threshold.min_budget)), threshold.score) for threshold in rules.budget_thresholds),
+            reverse=True
+        )
+        self._department_rules = [
+            (
+                rule.department,
+                Decimal(str(rule.min_budget)) if rule.min_budget is not None else None,
+                frozenset(_lower_all(rule.company_sizes)),
+                _lower_all(rule.niches),
+                frozenset(_lower_all(rule.task_volumes))
+            )
+            for rule in rules.department_rules
+        ]
+
+    @staticmethod
+    def _tier_score(value: str, tiers: List[Tuple[Tuple[str, ...], int]], default: int) -> int:
+        value_lower = value.lower()
+        for keywords, score in tiers:
+            if any(keyword in value_lower for keyword in keywords):
+                return score
+        return default
+
+    def breakdown(
+        self,
+        business_niche: Optional[str] = None,
+        company_size: Optional[str] = None,
+        task_volume: Optional[str] = None,
+        role: Optional[str] = None,
+        deadline: Optional[str] = None,
+        budget: Optional[float] = None
+    ) -> Tuple[int, int, int, int, int, int]:
+        """Баллы по каждому критерию в порядке SCORE_CRITERIA."""
+        rules = self.rules
+
+        # 1. Ниша бизнеса
+        niche_points = 0
+        if business_niche:
+            niche_points = self._tier_score(business_niche, self._niche_tiers, rules.niche_default_score)
+
+        # 2. Размер компании
+        company_size_points = 0
+        if company_size:
+            company_size_points = self._company_size_scores.get(company_size.lower(), 0)
+
+        # 3. Объем задачи
+        task_volume_points = 0
+        if task_volume:
+            task_volume_points = self._task_volume_scores.get(task_volume.lower(), 0)
+
+        # 4. Роль заполняющего
+        role_points = 0
+        if role:
+            role_points = self._tier_score(role, self._role_tiers, rules.role_default_score)
+
+        # 5. Сроки
+        deadline_points = 0
+        if deadline:
+            deadline_points = self._tier_score(deadline, self._deadline_tiers, 0)
+
+        # 6. Бюджет
+        budget_points = 0
+        if budget:
+            budget_decimal = Decimal(str(budget))
+            budget_points = rules.budget_default_score
+            for min_budget, budget_score in self._budget_thresholds:
+                if budget_decimal >= min_budget:
+                    budget_points = budget_score
+                    break
+
+        return niche_points, company_size_points, task_volume_points, role_points, deadline_points, budget_points
+
+    def temperature(self, score: int) -> str:
+        """Температура по сумме баллов."""
+        if score >= self.rules.hot_threshold:
+            return "hot"
+        if score >= self.rules.medium_threshold:
+            return "medium"
+        return "cold"
+
+    def score_with_breakdown(
+        self,
+        business_niche: Optional[str] = None,
+        company_size: Optional[str] = None,
+        task_volume: Optional[str] = None,
+        role: Optional[str] = None,
+        deadline: Optional[str] = None,
+        budget: Optional[float] = None
+    ) -> Tuple[int, str, str, Tuple[int, int, int, int, int, int]]:
+        """Рассчитывает (score, temperature, department, баллы по критериям)."""
+        points = self.breakdown(business_niche, company_size, task_volume, role, deadline, budget)
+        score = sum(points)
+        department = self.department(business_niche, company_size, task_volume, role, budget)
+        return score, self.temperature(score), department, points
+
+    def score(
+        self,
+        business_niche: Optional[str] = None,
+        company_size: Optional[str] = None,
+        task_volume: Optional[str] = None,
+        role: Optional[str] = None,
+        deadline: Optional[str] = None,
+        budget: Optional[float] = None
+    ) -> Tuple[int, str, str]:
+        """Рассчитывает (score, temperature, department)."""
+        score, temperature, department, _ = self.score_with_breakdown(
+            business_niche, company_size, task_volume, role, deadline, budget
+        )
+        return score, temperature, department
+
+    def department(
+        self,
+        business_niche: Optional[str] = None,
+        company_size: Optional[str] = None,
+        task_volume: Optional[str] = None,
+        role: Optional[str] = None,
+        budget: Optional[float] = None
+    ) -> str:
+        """Определяет рекомендуемый отдел по первому сработавшему правилу."""
+        niche_lower = business_niche.lower() if business_niche else None
+        company_size_lower = company_size.lower() if company_size else None
+        task_volume_lower = task_volume.lower() if task_volume else None
+        budget_decimal = Decimal(str(budget)) if budget else None
+
+        for department, min_budget, company_sizes, niches, task_volumes in self._department_rules:
+            if min_budget is not None and budget_decimal is not None and budget_decimal >= min_budget:
+                return department
+            if company_size_lower and company_size_lower in company_sizes:
+                return department
+            if niche_lower and any(niche in niche_lower for niche in niches):
+                return department
+            if task_volume_lower and task_volume_lower in task_volumes:
+                return department
+        return self.rules.default_department
+
+
+def compile_scoring_rules(rules: Dict[str, Any], version: int) -> ScoringEngine:
+    """Проверяет набор правил и компилирует его в движок оценки."""
+    return ScoringEngine(ScoringRulesDefinition.model_validate(rules), version)
+
+
+# Текущий движок процесса. Замена - одно присваивание ссылки, запросы,
+# начавшие расчет, завершают его на прежних правилах.
+_active_engine = compile_scoring_rules(DEFAULT_SCORING_RULES, BUILTIN_RULES_VERSION)
+
+
+def get_scoring_engine() -> ScoringEngine:
+    """Возвращает активный движок оценки."""
+    return _active_engine
+
+
+def set_scoring_engine(engine: ScoringEngine) -> None:
+    """Подменяет активный движок оценки."""
+    global _active_engine
+    _active_engine = engine
+
 
 def calculate_temperature_score(
     business_niche: Optional[str] = None,
@@ -14,7 +322,7 @@ def calculate_temperature_score(
     budget: Optional[float] = None
 ) -> Tuple[int, str, str]:
     """
-    Рассчитывает температуру льда на основе всех критериев.
+    Рассчитывает температуру льда на основе всех критериев по активным правилам.
     
     Returns:
         Tuple[int, str, str]: (score, temperature, department)
@@ -22,118 +330,7 @@ def calculate_temperature_score(
         - temperature: "hot", "medium", "cold"
         - department: рекомендуемый отдел
     """
-    score = 0
-    max_score = 100
-    
-    # 1. Ниша бизнеса (0-20 баллов)
-    high_value_niches = [
-        "финтех", "fintech", "криптовалюты", "crypto", "blockchain",
-        "медицина", "healthcare", "биотехнологии", "biotech",
-        "энергетика", "energy", "нефть", "oil", "газ", "gas",
-        "недвижимость", "real estate", "строительство", "construction",
-        "логистика", "logistics", "транспорт", "transport",
-        "образование", "education", "edtech"
-    ]
-    medium_value_niches = [
-        "e-commerce", "интернет-магазин", "retail", "розница",
-        "производство", "manufacturing", "промышленность", "industry",
-        "реклама", "advertising", "маркетинг", "marketing",
-        "консалтинг", "consulting", "услуги", "services"
-    ]
-    
-    if business_niche:
-        niche_lower = business_niche.lower()
-        if any(niche in niche_lower for niche in high_value_niches):
-            score += 20
-        elif any(niche in niche_lower for niche in medium_value_niches):
-            score += 10
-        else:
-            score += 5
-    
-    # 2. Размер компании (0-20 баллов)
-    company_size_scores = {
-        "enterprise": 20,
-        "large": 15,
-        "medium": 10,
-        "small": 5,
-        "startup": 3
-    }
-    if company_size:
-        score += company_size_scores.get(company_size.lower(), 0)
-    
-    # 3. Объем задачи (0-15 баллов)
-    task_volume_scores = {
-        "enterprise": 15,
-        "large": 12,
-        "medium": 8,
-        "small": 4
-    }
-    if task_volume:
-        score += task_volume_scores.get(task_volume.lower(), 0)
-    
-    # 4. Роль заполняющего (0-20 баллов)
-    high_priority_roles = ["ceo", "генеральный директор", "директор", "founder", "основатель", "owner", "владелец"]
-    medium_priority_roles = ["cto", "технический директор", "cfo", "финансовый директор", "coo", "операционный директор"]
-    manager_roles = ["менеджер", "manager", "руководитель", "head", "lead"]
-    
-    if role:
-        role_lower = role.lower()
-        if any(r in role_lower for r in high_priority_roles):
-            score += 20
-        elif any(r in role_lower for r in medium_priority_roles):
-            score += 15
-        elif any(r in role_lower for r in manager_roles):
-            score += 10
-        else:
-            score += 5
-    
-    # 5. Сроки (0-15 баллов)
-    deadline_scores = {
-        "urgent": 15,
-        "срочно": 15,
-        "asap": 15,
-        "1-2 weeks": 10,
-        "1-2 недели": 10,
-        "1 month": 5,
-        "1 месяц": 5,
-        "flexible": 2,
-        "гибкие": 2
-    }
-    if deadline:
-        deadline_lower = deadline.lower()
-        for key, value in deadline_scores.items():
-            if key in deadline_lower:
-                score += value
-                break
-    
-    # 6. Бюджет (0-10 баллов)
-    if budget:
-        budget_decimal = Decimal(str(budget))
-        if budget_decimal >= Decimal("1000000"):  # 1M+
-            score += 10
-        elif budget_decimal >= Decimal("500000"):  # 500K+
-            score += 8
-        elif budget_decimal >= Decimal("200000"):  # 200K+
-            score += 6
-        elif budget_decimal >= Decimal("100000"):  # 100K+
-            score += 4
-        elif budget_decimal >= Decimal("50000"):  # 50K+
-            score += 2
-        else:
-            score += 1
-    
-    # Определяем температуру
-    if score >= 70:
-        temperature = "hot"
-    elif score >= 40:
-        temperature = "medium"
-    else:
-        temperature = "cold"
-    
-    # Определяем отдел
-    department = determine_department(business_niche, company_size, task_volume, role, budget)
-    
-    return score, temperature, department
+    return get_scoring_engine().score(business_niche, company_size, task_volume, role, deadline, budget)
 
 
 def determine_department(
@@ -146,56 +343,37 @@ def determine_department(
     """
     Определяет рекомендуемый отдел для работы с заявкой.
     """
-    # Если большой бюджет или enterprise - VIP отдел
-    if budget and budget >= 500000:
-        return "VIP отдел"
-    
-    if company_size and company_size.lower() == "enterprise":
-        return "VIP отдел"
-    
-    # Технические ниши - технический отдел
-    tech_niches = ["финтех", "fintech", "криптовалюты", "crypto", "blockchain", "edtech", "saas"]
-    if business_niche and any(niche in business_niche.lower() for niche in tech_niches):
-        return "Технический отдел"
-    
-    # Медицина и биотех - специализированный отдел
-    if business_niche and any(niche in business_niche.lower() for niche in ["медицина", "healthcare", "биотехнологии", "biotech"]):
-        return "Специализированный отдел"
-    
-    # Большие задачи - отдел крупных проектов
-    if task_volume and task_volume.lower() in ["large", "enterprise"]:
-        return "Отдел крупных проектов"
-    
-    # По умолчанию - общий отдел
-    return "Общий отдел"
+    return get_scoring_engine().department(business_niche, company_size, task_volume, role, budget)
+
+
+# Описание уровней температуры для отображения
+TEMPERATURE_INFO: Dict[str, Dict[str, str]] = {
+    "hot": {
+        "label": "Горячий",
+        "description": "Высокоприоритетная заявка. Требует немедленного внимания.",
+        "color": "red",
+        "icon": "🔥",
+        "needs_manager": "Да, персональный менеджер обязателен"
+    },
+    "medium": {
+        "label": "Теплый",
+        "description": "Средний приоритет. Стандартная обработка.",
+        "color": "orange",
+        "icon": "🌡️",
+        "needs_manager": "Рекомендуется персональный менеджер"
+    },
+    "cold": {
+        "label": "Холодный",
+        "description": "Низкий приоритет. Можно обработать в общем порядке.",
+        "color": "blue",
+        "icon": "❄️",
+        "needs_manager": "Не требуется персональный менеджер"
+    }
+}
 
 
 def get_temperature_info(temperature: str) -> Dict[str, str]:
     """
     Возвращает информацию о температуре для отображения.
     """
-    info = {
-        "hot": {
-            "label": "Горячий",
-            "description": "Высокоприоритетная заявка. Требует немедленного внимания.",
-            "color": "red",
-            "icon": "🔥",
-            "needs_manager": "Да, персональный менеджер обязателен"
-        },
-        "medium": {
-            "label": "Теплый",
-            "description": "Средний приоритет. Стандартная обработка.",
-            "color": "orange",
-            "icon": "🌡️",
-            "needs_manager": "Рекомендуется персональный менеджер"
-        },
-        "cold": {
-            "label": "Холодный",
-            "description": "Низкий приоритет. Можно обработать в общем порядке.",
-            "color": "blue",
-            "icon": "❄️",
-            "needs_manager": "Не требуется персональный менеджер"
-        }
-    }
-    return info.get(temperature, info["cold"])
-
+    return TEMPERATURE_INFO.get(temperature, TEMPERATURE_INFO["cold"])
@@ -0,0 +1,165 @@
+"""
+Очереди отделов: менеджеры забирают следующую заявку своего отдела.
+
+Заявка выбирается по убыванию балла температуры через
+SELECT ... FOR UPDATE SKIP LOCKED, поэтому параллельные менеджеры не ждут
+друг друга и не получают одну и ту же заявку. Захват истекает через
+QUEUE_CLAIM_TIMEOUT_MINUTES, после чего заявка снова попадает в очередь.
+
+Каждая операция - один UPDATE ... RETURNING: строка, данные услуги и
+событие NOTIFY возвращаются тем же запросом (как в ApplicationCRUD.update).
+"""
+import os
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from models.applications import Application, _application_returning, _service_loader, _written_application
+
+CLAIM_TIMEOUT_MINUTES = int(os.getenv("QUEUE_CLAIM_TIMEOUT_MINUTES", "30"))
+
+STATUS_NEW = "new"
+STATUS_IN_PROGRESS = "in_progress"
+STATUS_CLOSED = "closed"
+
+
+class QueueDepth(BaseModel):
+    """Состояние очереди отдела."""
+    department: str
+    waiting: int
+    waiting_hot: int
+    claimed: int
+    oldest_waiting_at: Optional[datetime] = None
+
+
+# RETURNING операций очереди (с событием для клиентов SSE)
+CLAIMED_RETURNING = _application_returning("claimed")
+RELEASED_RETURNING = _application_returning("released")
+CLOSED_RETURNING = _application_returning("closed")
+
+
+def _is_claimable():
+    """Условие: заявка не закрыта и не захвачена (или захват истек)."""
+    return and_(
+        Application.status != STATUS_CLOSED,
+        or_(Application.claimed_by.is_(None), Application.claim_expires_at < func.now())
+    )
+
+
+class WorkQueueCRUD:
+    """Операции с очередями отделов."""
+
+    @staticmethod
+    def claim_next(db: Session, department: str, admin_id: int) -> Optional[Application]:
+        """
+        Забрать следующую заявку отдела (самую горячую, затем самую старую).
+        Выполняется одним UPDATE ... RETURNING с подзапросом FOR UPDATE SKIP LOCKED.
+        """
+        candidate = (
+            select(Application.id)
+            .where(Application.department == department, _is_claimable())
+            .order_by(Application.temperature_score.desc().nullslast(), Application.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        return WorkQueueCRUD._write(
+            db,
+            update(Application)
+            .where(Application.id == candidate)
+            .values(
+                status=STATUS_IN_PROGRESS,
+                claimed_by=admin_id,
+                claimed_at=func.now(),
+                claim_expires_at=func.now() + timedelta(minutes=CLAIM_TIMEOUT_MINUTES)
+            )
+            .returning(*CLAIMED_RETURNING)
+        )
+
+    @staticmethod
+    def _write(db: Session, statement) -> Optional[Application]:
+        """Выполняет UPDATE ... RETURNING операции очереди и коммитит его."""
+        row = db.execute(
+            statement.execution_options(synchronize_session=False, populate_existing=True)
+        ).first()
+        if row is None:
+            db.rollback()
+            return None
+        application = _written_application(db, row)
+        db.commit()
+        return application
+
+    @staticmethod
+    def _update_own_claim(application_id: int, admin_id: int):
+        """UPDATE заявки, захваченной этим менеджером."""
+        return update(Application).where(
+            Application.id == application_id,
+            Application.claimed_by == admin_id,
+            Application.status == STATUS_IN_PROGRESS
+        )
+
+    @staticmethod
+    def release(db: Session, application_id: int, admin_id: int) -> Optional[Application]:
+        """Вернуть захваченную заявку в очередь."""
+        return WorkQueueCRUD._write(
+            db,
+            WorkQueueCRUD._update_own_claim(application_id, admin_id)
+            .values(status=STATUS_NEW, claimed_by=None, claimed_at=None, claim_expires_at=None)
+            .returning(*RELEASED_RETURNING)
+        )
+
+    @staticmethod
+    def complete(db: Session, application_id: int, admin_id: int) -> Optional[Application]:
+        """Закрыть захваченную заявку (claimed_by остается как обработавший менеджер)."""
+        return WorkQueueCRUD._write(
+            db,
+            WorkQueueCRUD._update_own_claim(application_id, admin_id)
+            .values(status=STATUS_CLOSED, claim_expires_at=None)
+            .returning(*CLOSED_RETURNING)
+        )
+
+    @staticmethod
+    def get_claims(db: Session, admin_id: int) -> List[Application]:
+        """Активные (не истекшие) захваты менеджера (услуга загружается тем же запросом)."""
+        return (
+            db.query(Application)
+            .options(_service_loader())
+            .filter(
+                Application.claimed_by == admin_id,
+                Application.status == STATUS_IN_PROGRESS,
+                Application.claim_expires_at >= func.now()
+            )
+            .order_by(Application.claimed_at)
+            .all()
+        )
+
+    @staticmethod
+    def get_depths(db: Session) -> List[QueueDepth]:
+        """Глубина очередей по отделам (только незакрытые заявки)."""
+        claimable = _is_claimable()
+        rows = (
+            db.query(
+                Application.department,
+                func.count().filter(claimable),
+                func.count().filter(and_(claimable, Application.temperature == "hot")),
+                func.count().filter(~claimable),
+                func.min(Application.created_at).filter(claimable)
+            )
+            .filter(Application.status != STATUS_CLOSED, Application.department.isnot(None))
+            .group_by(Application.department)
+            .order_by(Application.department)
+            .all()
+        )
+        return [
+            QueueDepth(
+                department=department,
+                waiting=waiting,
+                waiting_hot=waiting_hot,
+                claimed=claimed,
+                oldest_waiting_at=oldest_waiting_at
+            )
+            for department, waiting, waiting_hot, claimed, oldest_waiting_at in rows
+        ]
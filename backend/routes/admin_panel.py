@@ -1,19 +1,86 @@
 """
 Роуты для админ-панели (защищенные).
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status, UploadFile, File
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 from core.database import get_db
-from core.auth import get_current_admin
-from models.admin import Admin, AdminResponse, AdminUpdate, AdminCRUD
-from models.applications import Application, ApplicationResponse, ApplicationCRUD
+from core.read_replica import get_read_db, replica_monitor
+from core.query_budget import get_analytics_db, get_list_db, query_budget_metrics
+from core.auth import get_current_admin, get_current_admin_for_stream
+from core.responses import ORJSONResponse
+from core.http_cache import conditional_get, conditional_get_for_version
+from models.admin import Admin, AdminResponse, AdminUpdate, AdminCRUD, LastAdminError
+from models.applications import (
+    Application,
+    ApplicationResponse,
+    ApplicationListResponse,
+    ApplicationCRUD,
+    ServiceStatistics,
+    application_events,
+    parse_criterion_filters,
+    parse_criterion_sort,
+    parse_fields,
+    serialize_application_fields,
+    serialize_application_list
+)
 from models.admin_settings import AdminSettings, AdminSettingsCreate, AdminSettingsUpdate, AdminSettingsResponse, AdminSettingsCRUD
-from core.security import get_password_hash
+from models.application_import import (
+    ApplicationImportResult,
+    DEFAULT_BATCH_SIZE,
+    SUPPORTED_FORMATS,
+    detect_format,
+    import_applications,
+    open_text_stream
+)
+from models import application_export
+from models.application_archive import (
+    ARCHIVE_AFTER_DAYS,
+    ARCHIVE_CLOSED_AFTER_DAYS,
+    ApplicationArchive,
+    ApplicationArchiveCRUD,
+    ArchiveResult
+)
+from core.security import get_password_hash, password_hasher
+from core.login_throttle import LOGIN_THROTTLE_BACKEND, login_throttle
+from core.pool_metrics import get_pool_metrics
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 
+def _requested_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Разбирает параметр fields, неизвестные поля дают 400."""
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+def _criterion_options(sort_by_criterion: Optional[str], criteria: Optional[str]):
+    """Разбирает сортировку и фильтр по баллам критериев, ошибки дают 400."""
+    try:
+        return parse_criterion_sort(sort_by_criterion), parse_criterion_filters(criteria)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+def _list_models(include_archived: bool):
+    """Таблицы, от которых зависит список заявок (для ETag)."""
+    if include_archived:
+        return Application, ApplicationArchive, AdminSettings
+    return Application, AdminSettings
+
+
 @router.get("/admins", response_model=List[AdminResponse])
 def get_all_admins(
     skip: int = 0,
@@ -105,15 +172,19 @@ def delete_admin(
             detail="Нельзя удалить самого себя"
         )
     
-    # Проверяем, что останется хотя бы один администратор
-    admin_count = AdminCRUD.count(db=db)
-    if admin_count <= 1:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Нельзя удалить последнего администратора"
-        )
+    # Проверяем, что останется хотя бы один администратор: быстро по снимку
+    # процесса и окончательно в БД под блокировкой при удалении
+    last_admin_error = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Нельзя удалить последнего администратора"
+    )
+    if AdminCRUD.count_cached() <= 1:
+        raise last_admin_error
     
-    success = AdminCRUD.delete(db=db, admin_id=admin_id)
+    try:
+        success = AdminCRUD.delete(db=db, admin_id=admin_id, keep_last=True)
+    except LastAdminError:
+        raise last_admin_error
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -122,86 +193,300 @@ def delete_admin(
     return None
 
 
+@router.get("/login-throttle")
+def get_login_throttle_stats(current_admin: Admin = Depends(get_current_admin)):
+    """
+    Счетчики попыток входа и очереди хеширования паролей этого воркера.
+    """
+    return {
+        "backend": LOGIN_THROTTLE_BACKEND,
+        "counters": login_throttle.counters(),
+        "password_hashing": {
+            "workers": password_hasher.workers,
+            "pending": password_hasher.pending,
+            "rejected": password_hasher.rejected
+        }
+    }
+
+
+@router.get("/metrics")
+def get_metrics(current_admin: Admin = Depends(get_current_admin)):
+    """
+    Состояние пулов соединений этого воркера: занятые и свободные соединения,
+    overflow, счетчики событий и гистограмма ожидания соединения.
+    Для реплики - отставание и сколько сессий чтения ушло на реплику / основную БД.
+    По бюджетам запросов - число запросов, таймаутов и отказов из-за пула.
+    """
+    return {
+        "pools": get_pool_metrics(),
+        "replica": replica_monitor.status(),
+        "query_budgets": query_budget_metrics.snapshot()
+    }
+
+
 @router.get("/applications", response_model=List[ApplicationResponse])
 def get_all_applications(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     sort_by_temperature: bool = True,
-    db: Session = Depends(get_db),
+    fields: Optional[str] = None,
+    sort_by_criterion: Optional[str] = None,
+    criteria: Optional[str] = None,
+    include_archived: bool = False,
+    db: Session = Depends(get_list_db),
     current_admin: Admin = Depends(get_current_admin)
 ):
-    """Получить список всех заявок (для админ-панели)."""
+    """
+    Получить список всех заявок (для админ-панели).
+    Параметр fields (через запятую) ограничивает набор возвращаемых полей.
+    sort_by_criterion (например, -budget) сортирует по баллу критерия,
+    criteria (например, budget>=8,role<10) фильтрует по баллам критериев.
+    include_archived добавляет в список заявки из архива.
+    """
+    requested_fields = _requested_fields(fields)
+    criterion_sort, criterion_filters = _criterion_options(sort_by_criterion, criteria)
+    conditional = conditional_get(request, db, *_list_models(include_archived))
+    if conditional.is_not_modified():
+        return conditional.not_modified_response()
+
     applications = ApplicationCRUD.get_all(
         db=db, 
         skip=skip, 
         limit=limit,
-        sort_by_temperature=sort_by_temperature
+        sort_by_temperature=sort_by_temperature,
+        fields=requested_fields,
+        criterion_sort=criterion_sort,
+        criterion_filters=criterion_filters,
+        include_archived=include_archived
     )
+    if requested_fields:
+        return conditional.apply(ORJSONResponse(serialize_application_fields(applications, requested_fields)))
+    conditional.apply(response)
     return applications
 
 
+@router.get("/applications/compact", response_model=ApplicationListResponse, response_class=ORJSONResponse)
+def get_all_applications_compact(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    sort_by_temperature: bool = True,
+    fields: Optional[str] = None,
+    sort_by_criterion: Optional[str] = None,
+    criteria: Optional[str] = None,
+    include_archived: bool = False,
+    db: Session = Depends(get_list_db),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Получить список заявок в компактном виде (для админ-панели).
+    Описание температуры передается одной таблицей на весь ответ.
+    Сортировка и фильтр по баллам критериев - как у /admin/applications.
+    """
+    requested_fields = _requested_fields(fields)
+    criterion_sort, criterion_filters = _criterion_options(sort_by_criterion, criteria)
+    conditional = conditional_get(request, db, *_list_models(include_archived))
+    if conditional.is_not_modified():
+        return conditional.not_modified_response()
+
+    applications = ApplicationCRUD.get_all(
+        db=db,
+        skip=skip,
+        limit=limit,
+        sort_by_temperature=sort_by_temperature,
+        fields=requested_fields,
+        criterion_sort=criterion_sort,
+        criterion_filters=criterion_filters,
+        include_archived=include_archived
+    )
+    return conditional.apply(ORJSONResponse(serialize_application_list(applications, fields=requested_fields)))
+
+
+@router.post("/applications/import", response_model=ApplicationImportResult)
+def import_applications_file(
+    file: UploadFile = File(...),
+    file_format: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Массовый импорт заявок из CSV или NDJSON.
+    Формат определяется по расширению файла или параметру file_format.
+    """
+    file_format = file_format or detect_format(file.filename)
+    if file_format not in SUPPORTED_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Неподдерживаемый формат файла. Допустимые форматы: {', '.join(SUPPORTED_FORMATS)}"
+        )
+    if batch_size < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="batch_size должен быть положительным"
+        )
+
+    stream = open_text_stream(file.file)
+    try:
+        return import_applications(db=db, stream=stream, file_format=file_format, batch_size=batch_size)
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Файл должен быть в кодировке UTF-8"
+        )
+    finally:
+        stream.detach()
+
+
 @router.get("/applications/statistics")
 def get_applications_statistics(
-    db: Session = Depends(get_db),
+    include_archived: bool = False,
+    db: Session = Depends(get_analytics_db),
     current_admin: Admin = Depends(get_current_admin)
 ):
-    """Получить статистику по заявкам."""
-    from models.temperature_analysis import calculate_temperature_score
-    from collections import Counter
-    from models.applications import Application
-    
-    # Получаем заявки напрямую из базы, без использования CRUD для избежания проблем с валидацией
-    applications = db.query(Application).all()
-    
-    total = len(applications)
-    temperature_counts = Counter()
-    department_counts = Counter()
-    total_budget = 0.0
-    budgets_by_temp = {"hot": 0.0, "medium": 0.0, "cold": 0.0}
-    
-    for app in applications:
+    """
+    Получить статистику по заявкам.
+    По умолчанию - только текущие заявки; include_archived добавляет архив.
+    """
+    return ApplicationCRUD.get_statistics(db=db, include_archived=include_archived)
+
+
+@router.get("/applications/statistics/criteria")
+def get_criteria_statistics(
+    include_archived: bool = False,
+    db: Session = Depends(get_analytics_db),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Получить средние баллы по критериям оценки в разрезе температуры.
+    include_archived добавляет заявки из архива.
+    """
+    return ApplicationCRUD.get_criteria_statistics(db=db, include_archived=include_archived)
+
+
+@router.get("/applications/statistics/services", response_model=List[ServiceStatistics])
+def get_service_statistics(
+    active_only: bool = False,
+    budget_from: Optional[float] = None,
+    budget_to: Optional[float] = None,
+    include_archived: bool = False,
+    db: Session = Depends(get_analytics_db),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Получить статистику заявок по услугам.
+    budget_from / budget_to отбирают услуги, чей бюджетный диапазон пересекается с заданным.
+    include_archived добавляет заявки из архива.
+    """
+    return ApplicationCRUD.get_service_statistics(
+        db=db, active_only=active_only, budget_from=budget_from, budget_to=budget_to,
+        include_archived=include_archived
+    )
+
+
+# Интервал комментариев-пингов, чтобы прокси не закрывали простаивающий поток
+EVENTS_KEEPALIVE_SECONDS = 15
+
+
+@router.get("/applications/events")
+async def stream_application_events(
+    request: Request,
+    current_admin: Admin = Depends(get_current_admin_for_stream)
+):
+    """
+    Поток событий по заявкам (Server-Sent Events): created, updated, deleted,
+    imported и resync. События приходят от всех воркеров через LISTEN/NOTIFY.
+    """
+    async def event_stream():
+        subscriber = application_events.subscribe()
+        _, queue = subscriber
         try:
-            score, temperature, department = calculate_temperature_score(
-                business_niche=app.business_niche,
-                company_size=app.company_size,
-                task_volume=app.task_volume,
-                role=app.role,
-                deadline=app.deadline,
-                budget=float(app.budget) if app.budget else None
-            )
-            temperature_counts[temperature] += 1
-            department_counts[department] += 1
-            
-            if app.budget:
-                budget_value = float(app.budget)
-                total_budget += budget_value
-                budgets_by_temp[temperature] += budget_value
-        except Exception as e:
-            # Пропускаем заявки с ошибками расчета
-            continue
-    
-    return {
-        "total": total,
-        "by_temperature": {
-            "hot": temperature_counts.get("hot", 0),
-            "medium": temperature_counts.get("medium", 0),
-            "cold": temperature_counts.get("cold", 0)
-        },
-        "by_department": dict(department_counts),
-        "total_budget": total_budget,
-        "budgets_by_temperature": budgets_by_temp,
-        "average_budget": total_budget / total if total > 0 else 0.0
-    }
+            yield "retry: 5000\n\n"
+            while True:
+                if await request.is_disconnected():
+                    break
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                data = json.dumps(event, ensure_ascii=False)
+                yield f"event: {event.get('event', 'message')}\ndata: {data}\n\n"
+        finally:
+            application_events.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/applications/export")
+def export_applications(
+    file_format: str = "csv",
+    gzip: bool = False,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    temperature: Optional[str] = None,
+    department: Optional[str] = None,
+    include_archived: bool = False,
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Потоковая выгрузка заявок в CSV или NDJSON (опционально gzip).
+    Поддерживает фильтры по дате создания, температуре и отделу;
+    include_archived добавляет заявки из архива.
+    """
+    if file_format not in application_export.SUPPORTED_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Неподдерживаемый формат. Допустимые форматы: {', '.join(application_export.SUPPORTED_FORMATS)}"
+        )
+
+    filters = application_export.ApplicationExportFilters(
+        created_from=created_from,
+        created_to=created_to,
+        temperature=temperature,
+        department=department,
+        include_archived=include_archived
+    )
+    filename = application_export.export_filename(file_format, gzip)
+    return StreamingResponse(
+        application_export.stream_applications_export(filters, file_format=file_format, compress=gzip),
+        media_type=application_export.export_media_type(file_format, gzip),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.post("/applications/archive", response_model=ArchiveResult)
+def archive_applications(
+    older_than_days: int = Query(ARCHIVE_AFTER_DAYS, ge=0),
+    closed_after_days: int = Query(ARCHIVE_CLOSED_AFTER_DAYS, ge=0),
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Перенести в архив заявки старше older_than_days дней
+    и закрытые заявки без изменений дольше closed_after_days дней.
+    """
+    return ApplicationArchiveCRUD.archive(
+        db=db, older_than_days=older_than_days, closed_after_days=closed_after_days
+    )
 
 
 @router.get("/applications/{application_id}", response_model=ApplicationResponse)
 def get_application(
     application_id: int,
-    db: Session = Depends(get_db),
+    include_archived: bool = False,
+    db: Session = Depends(get_read_db),
     current_admin: Admin = Depends(get_current_admin)
 ):
-    """Получить заявку по ID (для админ-панели)."""
-    application = ApplicationCRUD.get_by_id(db=db, application_id=application_id)
+    """Получить заявку по ID (для админ-панели), с include_archived - также из архива."""
+    application = ApplicationCRUD.get_by_id(db=db, application_id=application_id, include_archived=include_archived)
     if not application:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -229,14 +514,24 @@ def delete_application(
 # Роуты для управления услугами (admin_settings) в админ-панели
 @router.get("/services", response_model=List[AdminSettingsResponse])
 def get_all_services(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    active_only: bool = False,
+    budget: Optional[float] = None,
     current_admin: Admin = Depends(get_current_admin)
 ):
-    """Получить список всех услуг (для админ-панели)."""
-    services = AdminSettingsCRUD.get_all(db=db, skip=skip, limit=limit)
-    return services
+    """
+    Получить список всех услуг (для админ-панели, из кэша процесса).
+    active_only - только активные, budget - услуги, в диапазон которых попадает сумма.
+    """
+    conditional = conditional_get_for_version(request, AdminSettingsCRUD.get_cached_version())
+    if conditional.is_not_modified():
+        return conditional.not_modified_response()
+    conditional.apply(response)
+
+    return AdminSettingsCRUD.get_cached(skip=skip, limit=limit, active_only=active_only, budget=budget)
 
 
 @router.post("/services", response_model=AdminSettingsResponse, status_code=status.HTTP_201_CREATED)
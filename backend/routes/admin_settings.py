@@ -1,16 +1,17 @@
 """
 Роуты для работы с административными настройками.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from core.database import get_db
+from core.http_cache import conditional_get_for_version
 from models.admin_settings import (
-    AdminSettings,
     AdminSettingsCreate,
     AdminSettingsUpdate,
     AdminSettingsResponse,
-    AdminSettingsCRUD
+    AdminSettingsCRUD,
+    AsyncAdminSettingsCRUD
 )
 
 router = APIRouter(prefix="/admin-settings", tags=["admin-settings"])
@@ -23,16 +24,34 @@ def create_admin_settings(settings: AdminSettingsCreate, db: Session = Depends(g
 
 
 @router.get("/", response_model=List[AdminSettingsResponse])
-def get_all_settings(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Получить список всех административных настроек с пагинацией."""
-    settings = AdminSettingsCRUD.get_all(db=db, skip=skip, limit=limit)
-    return settings
+async def get_all_settings(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    active_only: bool = False,
+    budget: Optional[float] = None
+):
+    """
+    Получить список всех административных настроек с пагинацией.
+    Данные берутся из кэша процесса (сбрасывается по NOTIFY при изменениях).
+    active_only - только активные услуги (для формы заявки), budget - услуги,
+    в бюджетный диапазон которых попадает сумма.
+    Поддерживает условный GET (ETag).
+    """
+    snapshot = await AsyncAdminSettingsCRUD.get_snapshot()
+    conditional = conditional_get_for_version(request, snapshot.version)
+    if conditional.is_not_modified():
+        return conditional.not_modified_response()
+    conditional.apply(response)
+
+    return snapshot.select(skip=skip, limit=limit, active_only=active_only, budget=budget)
 
 
 @router.get("/{settings_id}", response_model=AdminSettingsResponse)
-def get_admin_settings(settings_id: int, db: Session = Depends(get_db)):
-    """Получить административную настройку по ID."""
-    settings = AdminSettingsCRUD.get_by_id(db=db, settings_id=settings_id)
+async def get_admin_settings(settings_id: int):
+    """Получить административную настройку по ID (из кэша процесса)."""
+    settings = await AsyncAdminSettingsCRUD.get_cached_by_id(settings_id=settings_id)
     if not settings:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
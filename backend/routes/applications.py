@@ -1,20 +1,48 @@
 """
 Роуты для работы с заявками клиентов (applications).
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from core.database import get_db
-from models.applications import Application, ApplicationCreate, ApplicationUpdate, ApplicationResponse, ApplicationCRUD
+from typing import List, Optional
+from core.database import get_async_db, get_db
+from core.read_replica import get_read_db
+from core.query_budget import get_list_db
+from core.responses import ORJSONResponse
+from core.http_cache import conditional_get
+from models.admin_settings import AdminSettings
+from models.applications import (
+    Application,
+    ApplicationCreate,
+    ApplicationUpdate,
+    ApplicationResponse,
+    ApplicationListResponse,
+    ApplicationCRUD,
+    AsyncApplicationCRUD,
+    parse_fields,
+    serialize_application_fields,
+    serialize_application_list
+)
 
 router = APIRouter(prefix="/applications", tags=["applications"])
 
 
+def _requested_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Разбирает параметр fields, неизвестные поля дают 400."""
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
 @router.post("/", response_model=ApplicationResponse, status_code=status.HTTP_201_CREATED)
-def create_application(application: ApplicationCreate, db: Session = Depends(get_db)):
+async def create_application(application: ApplicationCreate, db: AsyncSession = Depends(get_async_db)):
     """Создать новую заявку от клиента."""
     try:
-        return ApplicationCRUD.create(db=db, application_data=application)
+        return await AsyncApplicationCRUD.create(db=db, application_data=application)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -24,23 +52,66 @@ def create_application(application: ApplicationCreate, db: Session = Depends(get
 
 @router.get("/", response_model=List[ApplicationResponse])
 def get_applications(
+    request: Request,
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
     sort_by_temperature: bool = True,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = None,
+    db: Session = Depends(get_list_db)
 ):
-    """Получить список всех заявок с пагинацией."""
+    """
+    Получить список всех заявок с пагинацией.
+    Параметр fields (через запятую) ограничивает набор возвращаемых полей.
+    """
+    requested_fields = _requested_fields(fields)
+    conditional = conditional_get(request, db, Application, AdminSettings)
+    if conditional.is_not_modified():
+        return conditional.not_modified_response()
+
     applications = ApplicationCRUD.get_all(
         db=db, 
         skip=skip, 
         limit=limit,
-        sort_by_temperature=sort_by_temperature
+        sort_by_temperature=sort_by_temperature,
+        fields=requested_fields
     )
+    if requested_fields:
+        return conditional.apply(ORJSONResponse(serialize_application_fields(applications, requested_fields)))
+    conditional.apply(response)
     return applications
 
 
+@router.get("/compact", response_model=ApplicationListResponse, response_class=ORJSONResponse)
+def get_applications_compact(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    sort_by_temperature: bool = True,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_list_db)
+):
+    """
+    Получить список заявок в компактном виде: строки без temperature_info
+    и одна таблица описаний температуры на весь ответ.
+    """
+    requested_fields = _requested_fields(fields)
+    conditional = conditional_get(request, db, Application, AdminSettings)
+    if conditional.is_not_modified():
+        return conditional.not_modified_response()
+
+    applications = ApplicationCRUD.get_all(
+        db=db,
+        skip=skip,
+        limit=limit,
+        sort_by_temperature=sort_by_temperature,
+        fields=requested_fields
+    )
+    return conditional.apply(ORJSONResponse(serialize_application_list(applications, fields=requested_fields)))
+
+
 @router.get("/{application_id}", response_model=ApplicationResponse)
-def get_application(application_id: int, db: Session = Depends(get_db)):
+def get_application(application_id: int, db: Session = Depends(get_read_db)):
     """Получить заявку по ID."""
     application = ApplicationCRUD.get_by_id(db=db, application_id=application_id)
     if not application:
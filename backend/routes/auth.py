@@ -1,17 +1,36 @@
 """
 Роуты для аутентификации администраторов.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from core.database import get_db
-from core.security import verify_password, get_password_hash, create_access_token
-from core.auth import get_current_admin
-from models.admin import Admin, AdminCreate, AdminLogin, AdminResponse, AdminCRUD
-from datetime import timedelta
+from core.security import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    create_access_token,
+    create_refresh_token,
+    get_password_hash,
+    verify_and_update_password,
+    verify_unknown_user_password
+)
+from core.auth import authenticate_refresh_token, get_current_admin
+from core.login_throttle import get_client_ip, login_throttle
+from models.admin import Admin, AdminCreate, AdminLogin, AdminResponse, AdminCRUD, RefreshTokenRequest
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+def _issue_tokens(admin: Admin) -> dict:
+    """Пара токенов: короткий токен доступа и токен обновления с той же версией."""
+    claims = {"sub": admin.username, "aid": admin.id, "ver": admin.token_version}
+    return {
+        "access_token": create_access_token(data=claims),
+        "refresh_token": create_refresh_token(data=claims),
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    }
+
+
 @router.post("/register", response_model=AdminResponse, status_code=status.HTTP_201_CREATED)
 def register(admin_data: AdminCreate, db: Session = Depends(get_db)):
     """
@@ -19,34 +38,23 @@ def register(admin_data: AdminCreate, db: Session = Depends(get_db)):
     Доступна только если в базе нет ни одного администратора.
     """
     try:
-        # Проверяем, есть ли уже администраторы
-        admin_count = AdminCRUD.count(db=db)
-        if admin_count > 0:
+        # Проверяем, есть ли уже администраторы (по снимку процесса, без запроса к БД)
+        if AdminCRUD.count_cached() > 0:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Регистрация недоступна. Администраторы уже существуют."
             )
         
-        # Проверяем, не существует ли уже пользователь с таким username
-        existing_admin = AdminCRUD.get_by_username(db=db, username=admin_data.username)
-        if existing_admin:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Пользователь с таким username уже существует"
-            )
-        
-        # Проверяем, не существует ли уже пользователь с таким email
-        existing_admin = AdminCRUD.get_by_email(db=db, email=admin_data.email)
-        if existing_admin:
+        # Хешируем пароль и создаем администратора; окончательная проверка
+        # выполняется в БД под advisory-блокировкой
+        hashed_password = get_password_hash(admin_data.password)
+        admin = AdminCRUD.create_first(db=db, admin_data=admin_data, hashed_password=hashed_password)
+        if admin is None:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Пользователь с таким email уже существует"
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Регистрация недоступна. Администраторы уже существуют."
             )
         
-        # Хешируем пароль и создаем администратора
-        hashed_password = get_password_hash(admin_data.password)
-        admin = AdminCRUD.create(db=db, admin_data=admin_data, hashed_password=hashed_password)
-        
         return AdminResponse.model_validate(admin)
     except HTTPException:
         raise
@@ -62,39 +70,73 @@ def register(admin_data: AdminCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login")
-def login(admin_login: AdminLogin, db: Session = Depends(get_db)):
+async def login(admin_login: AdminLogin, request: Request, db: Session = Depends(get_db)):
     """
-    Вход администратора. Возвращает JWT токен.
+    Вход администратора. Возвращает токен доступа и токен обновления.
+    Проверка пароля выполняется в пуле хеширования, не занимая пул обработчиков;
+    хеш с устаревшей стоимостью bcrypt прозрачно пересчитывается.
+    После серии неудач по username или IP попытки отклоняются до проверки пароля.
     """
+    client_ip = get_client_ip(request)
+    decision = await run_in_threadpool(login_throttle.check, admin_login.username, client_ip)
+    if not decision.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Слишком много неудачных попыток входа. Повторите позже",
+            headers={"Retry-After": str(decision.retry_after)}
+        )
+    
     # Ищем администратора по username
-    admin = AdminCRUD.get_by_username(db=db, username=admin_login.username)
+    admin = await run_in_threadpool(AdminCRUD.get_by_username, db=db, username=admin_login.username)
     if not admin:
+        # Та же стоимость ответа, что и для существующего пользователя
+        await verify_unknown_user_password(admin_login.password)
+        await run_in_threadpool(login_throttle.record_failure, admin_login.username, client_ip, True)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверный username или пароль"
         )
     
     # Проверяем пароль
-    if not verify_password(admin_login.password, admin.hashed_password):
+    verified, new_hash = await verify_and_update_password(admin_login.password, admin.hashed_password)
+    if not verified:
+        await run_in_threadpool(login_throttle.record_failure, admin_login.username, client_ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверный username или пароль"
         )
     
-    # Создаем токен
-    access_token_expires = timedelta(minutes=60 * 24)  # 24 часа
-    access_token = create_access_token(
-        data={"sub": admin.username},
-        expires_delta=access_token_expires
-    )
+    await run_in_threadpool(login_throttle.record_success, admin_login.username, client_ip, decision)
+    if new_hash:
+        await run_in_threadpool(AdminCRUD.update_password_hash, db=db, admin=admin, hashed_password=new_hash)
     
     return {
-        "access_token": access_token,
-        "token_type": "bearer",
+        **_issue_tokens(admin),
         "admin": AdminResponse.model_validate(admin)
     }
 
 
+@router.post("/refresh")
+def refresh_tokens(request: RefreshTokenRequest):
+    """
+    Выдает новую пару токенов по токену обновления.
+    Отозванный токен (смена пароля, выход со всех устройств) не принимается.
+    """
+    admin = authenticate_refresh_token(request.refresh_token)
+    return _issue_tokens(admin)
+
+
+@router.post("/revoke", status_code=status.HTTP_204_NO_CONTENT)
+def revoke_tokens(
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Выход со всех устройств: отзывает все токены текущего администратора.
+    """
+    AdminCRUD.revoke_tokens(db=db, admin_id=current_admin.id)
+
+
 @router.get("/me", response_model=AdminResponse)
 def get_current_admin_info(current_admin: Admin = Depends(get_current_admin)):
     """
@@ -104,11 +146,12 @@ def get_current_admin_info(current_admin: Admin = Depends(get_current_admin)):
 
 
 @router.get("/check-registration")
-def check_registration(db: Session = Depends(get_db)):
+def check_registration():
     """
     Проверяет, доступна ли регистрация (есть ли хотя бы один администратор).
+    Ответ берется из снимка администраторов процесса без запроса к БД.
     """
-    admin_count = AdminCRUD.count(db=db)
+    admin_count = AdminCRUD.count_cached()
     return {
         "registration_available": admin_count == 0,
         "admin_count": admin_count
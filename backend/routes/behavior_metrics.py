@@ -3,12 +3,16 @@
 """
 import json
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List
 from datetime import datetime, timedelta
-from core.database import get_db
+from core.database import get_async_db, get_db
+from core.read_replica import get_async_read_db, get_read_db
+from core.query_budget import check_query_budget, get_analytics_db
 from models.behavior_metrics import (
+    AsyncBehaviorMetricsCRUD,
     BehaviorMetrics,
     BehaviorMetricsCreate,
     BehaviorMetricsUpdate,
@@ -21,16 +25,15 @@ router = APIRouter(prefix="/behavior-metrics", tags=["behavior-metrics"])
 
 
 @router.post("/", response_model=BehaviorMetricsResponse, status_code=status.HTTP_201_CREATED)
-def create_behavior_metrics(metrics: BehaviorMetricsCreate, db: Session = Depends(get_db)):
+async def create_behavior_metrics(metrics: BehaviorMetricsCreate, db: AsyncSession = Depends(get_async_db)):
     """Создать новую запись о метриках поведения пользователя."""
-    return BehaviorMetricsCRUD.create(db=db, metrics_data=metrics)
+    return await AsyncBehaviorMetricsCRUD.create(db=db, metrics_data=metrics)
 
 
 @router.get("/", response_model=List[BehaviorMetricsResponse])
-def get_all_metrics(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def get_all_metrics(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_read_db)):
     """Получить список всех записей о метриках с пагинацией."""
-    metrics = BehaviorMetricsCRUD.get_all(db=db, skip=skip, limit=limit)
-    return metrics
+    return await AsyncBehaviorMetricsCRUD.get_all(db=db, skip=skip, limit=limit)
 
 
 class StatisticsResponse(BaseModel):
@@ -42,7 +45,7 @@ class StatisticsResponse(BaseModel):
 
 
 @router.get("/statistics/summary", response_model=StatisticsResponse)
-def get_statistics_summary(db: Session = Depends(get_db)):
+def get_statistics_summary(db: Session = Depends(get_analytics_db)):
     """Получить статистику метрик: среднее время за день/неделю/месяц и все позиции курсора."""
     now = datetime.utcnow()
     
@@ -70,7 +73,9 @@ def get_statistics_summary(db: Session = Depends(get_db)):
     ).all()
     
     all_cursor_positions = []
-    for metric in all_metrics:
+    for index, metric in enumerate(all_metrics):
+        if index % 1000 == 0:
+            check_query_budget(db)
         if metric.cursor_positions:
             try:
                 positions = json.loads(metric.cursor_positions)
@@ -88,9 +93,9 @@ def get_statistics_summary(db: Session = Depends(get_db)):
 
 
 @router.get("/{metrics_id}", response_model=BehaviorMetricsResponse)
-def get_behavior_metrics(metrics_id: int, db: Session = Depends(get_db)):
+async def get_behavior_metrics(metrics_id: int, db: AsyncSession = Depends(get_async_read_db)):
     """Получить запись о метриках по ID."""
-    metrics = BehaviorMetricsCRUD.get_by_id(db=db, metrics_id=metrics_id)
+    metrics = await AsyncBehaviorMetricsCRUD.get_by_id(db=db, metrics_id=metrics_id)
     if not metrics:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -100,7 +105,7 @@ def get_behavior_metrics(metrics_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/application/{application_id}", response_model=BehaviorMetricsResponse)
-def get_behavior_metrics_by_application(application_id: int, db: Session = Depends(get_db)):
+def get_behavior_metrics_by_application(application_id: int, db: Session = Depends(get_read_db)):
     """Получить запись о метриках по application_id."""
     metrics = BehaviorMetricsCRUD.get_by_application_id(db=db, application_id=application_id)
     if not metrics:
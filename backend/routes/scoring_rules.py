@@ -0,0 +1,91 @@
+"""
+Роуты для управления правилами оценки температуры льда (защищенные).
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from core.database import get_db
+from core.auth import get_current_admin
+from models.admin import Admin
+from models.scoring_rules import (
+    ActiveScoringRules,
+    RescoreResult,
+    ScoringRuleSetCreate,
+    ScoringRuleSetResponse,
+    ScoringRuleSetCRUD
+)
+
+router = APIRouter(prefix="/admin/scoring-rules", tags=["scoring-rules"])
+
+
+@router.get("/", response_model=List[ScoringRuleSetResponse])
+def get_scoring_rule_sets(
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """Получить все версии правил оценки."""
+    return ScoringRuleSetCRUD.get_all(db=db)
+
+
+@router.post("/", response_model=ScoringRuleSetResponse, status_code=status.HTTP_201_CREATED)
+def create_scoring_rule_set(
+    rule_set: ScoringRuleSetCreate,
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Создать новую версию правил оценки.
+    С activate=true версия сразу становится активной во всех воркерах.
+    """
+    return ScoringRuleSetCRUD.create(db=db, rule_set_data=rule_set, admin_id=current_admin.id)
+
+
+@router.get("/active", response_model=ActiveScoringRules)
+def get_active_scoring_rules(
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """Получить активные правила и количество заявок, оцененных другой версией."""
+    return ScoringRuleSetCRUD.get_active(db=db)
+
+
+@router.post("/rescore", response_model=RescoreResult)
+def rescore_applications(
+    from_version: Optional[int] = Query(None, description="Пересчитать только заявки этой версии правил"),
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """Пересчитать классификацию заявок, оцененных не активной версией правил."""
+    return ScoringRuleSetCRUD.rescore(db=db, from_version=from_version)
+
+
+@router.get("/{version}", response_model=ScoringRuleSetResponse)
+def get_scoring_rule_set(
+    version: int,
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """Получить версию правил оценки."""
+    rule_set = ScoringRuleSetCRUD.get_by_version(db=db, version=version)
+    if not rule_set:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Версия правил {version} не найдена"
+        )
+    return rule_set
+
+
+@router.post("/{version}/activate", response_model=ScoringRuleSetResponse)
+def activate_scoring_rule_set(
+    version: int,
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """Сделать версию правил активной (без перезапуска воркеров)."""
+    rule_set = ScoringRuleSetCRUD.activate(db=db, version=version)
+    if not rule_set:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Версия правил {version} не найдена"
+        )
+    return rule_set
@@ -0,0 +1,79 @@
+"""
+Роуты для очередей отделов (защищенные).
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import List
+from core.database import get_db
+from core.auth import get_current_admin
+from models.admin import Admin
+from models.applications import ApplicationResponse
+from models.work_queue import QueueDepth, WorkQueueCRUD
+
+router = APIRouter(prefix="/admin/queues", tags=["queues"])
+
+
+@router.get("/", response_model=List[QueueDepth])
+def get_queue_depths(
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """Получить глубину очередей по отделам."""
+    return WorkQueueCRUD.get_depths(db=db)
+
+
+@router.get("/claims", response_model=List[ApplicationResponse])
+def get_my_claims(
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """Получить заявки, которые сейчас в работе у текущего администратора."""
+    return WorkQueueCRUD.get_claims(db=db, admin_id=current_admin.id)
+
+
+@router.post("/{department}/claim", response_model=ApplicationResponse)
+def claim_next_application(
+    department: str,
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """Забрать следующую (самую горячую) заявку из очереди отдела."""
+    application = WorkQueueCRUD.claim_next(db=db, department=department, admin_id=current_admin.id)
+    if not application:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"В очереди отдела «{department}» нет свободных заявок"
+        )
+    return application
+
+
+@router.post("/claims/{application_id}/release", response_model=ApplicationResponse)
+def release_application(
+    application_id: int,
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """Вернуть заявку в очередь отдела."""
+    application = WorkQueueCRUD.release(db=db, application_id=application_id, admin_id=current_admin.id)
+    if not application:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Заявка с id {application_id} не находится в работе у текущего администратора"
+        )
+    return application
+
+
+@router.post("/claims/{application_id}/complete", response_model=ApplicationResponse)
+def complete_application(
+    application_id: int,
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """Закрыть заявку, взятую в работу."""
+    application = WorkQueueCRUD.complete(db=db, application_id=application_id, admin_id=current_admin.id)
+    if not application:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Заявка с id {application_id} не находится в работе у текущего администратора"
+        )
+    return application
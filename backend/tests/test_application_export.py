@@ -0,0 +1,40 @@
+"""
+Потоковая выгрузка: первая строка уходит клиенту, не дожидаясь пачки,
+а медленно приходящие строки отправляются по времени.
+"""
+import json
+
+from models import application_export
+from models.application_export import EXPORT_COLUMNS, _iter_batches, _iter_csv_lines, _iter_ndjson_lines
+
+
+def record(record_id: int):
+    return [record_id] + [None] * (len(EXPORT_COLUMNS) - 1)
+
+
+def test_first_ndjson_record_sent_immediately():
+    consumed = []
+
+    def records():
+        for record_id in (1, 2, 3):
+            consumed.append(record_id)
+            yield record(record_id)
+
+    chunks = _iter_batches(_iter_ndjson_lines(records()))
+    first = next(chunks)
+    assert json.loads(first)["id"] == 1
+    # Следующие записи еще не прочитаны из БД
+    assert consumed == [1]
+    assert [json.loads(line)["id"] for line in next(chunks).splitlines()] == [2, 3]
+
+
+def test_csv_header_sent_first():
+    chunks = list(_iter_batches(_iter_csv_lines(iter([record(1), record(2)]))))
+    assert chunks[0] == ",".join(EXPORT_COLUMNS) + "\r\n"
+    assert chunks[1].splitlines()[0].startswith("1,")
+
+
+def test_slow_records_flushed_by_time(monkeypatch):
+    monkeypatch.setattr(application_export, "EXPORT_FLUSH_SECONDS", 0)
+    chunks = list(_iter_batches(_iter_ndjson_lines(iter([record(1), record(2), record(3)]))))
+    assert len(chunks) == 3
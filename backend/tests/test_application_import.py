@@ -0,0 +1,64 @@
+"""
+Импорт заявок: строка, которая не помещается в колонки applications,
+попадает в построчные ошибки, а остальные строки файла импортируются.
+
+Нужна БД с актуальной схемой (python migrate.py); без нее тест пропускается.
+"""
+import io
+import json
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from core.database import SessionLocal
+from models.application_import import import_applications
+from models.applications import Application
+
+# Фамилия, по которой находятся и удаляются строки теста
+MARKER = "Тест импорта"
+
+
+def ndjson(*rows) -> io.StringIO:
+    return io.StringIO("\n".join(
+        json.dumps({"email": "import@example.com", **row}, ensure_ascii=False) for row in rows
+    ) + "\n")
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        session.query(Application.id).filter(Application.last_name == MARKER).all()
+    except OperationalError:
+        session.close()
+        pytest.skip("БД недоступна")
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.query(Application).filter(Application.last_name == MARKER).delete()
+        session.commit()
+        session.close()
+
+
+def test_oversized_rows_reported_and_good_rows_imported(db):
+    stream = ndjson(
+        {"first_name": "Первый", "last_name": MARKER, "budget": 100000},
+        {"first_name": "x" * 256, "last_name": MARKER},
+        {"first_name": "Размер", "last_name": MARKER, "company_size": "x" * 51},
+        {"first_name": "Бюджет", "last_name": MARKER, "budget": 1e14},
+        {"first_name": "Второй", "last_name": MARKER, "deadline": "urgent"},
+    )
+    # Плохие строки в одной пачке с хорошими
+    result = import_applications(db=db, stream=stream, file_format="ndjson", batch_size=3)
+
+    assert result.total_rows == 5
+    assert result.imported == 2
+    assert result.failed == 3
+    assert [error.row for error in result.errors] == [2, 3, 4]
+    assert result.errors[0].errors == ["first_name: не длиннее 255 символов"]
+    assert result.errors[1].errors == ["company_size: не длиннее 50 символов"]
+    assert result.errors[2].errors[0].startswith("budget:")
+
+    imported = db.query(Application.first_name).filter(Application.last_name == MARKER).all()
+    assert sorted(name for name, in imported) == ["Второй", "Первый"]
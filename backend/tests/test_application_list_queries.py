@@ -0,0 +1,84 @@
+"""
+Список заявок админ-панели выполняет одно и то же число запросов
+независимо от размера страницы: услуга загружается вместе с заявками,
+а не отдельным SELECT на строку.
+
+Нужна БД с актуальной схемой (python migrate.py); без нее тест пропускается.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+import main
+from core.auth import get_current_admin
+from core.database import SessionLocal, engine
+from models.admin_settings import AdminSettings, services_cache
+from models.applications import Application
+
+PAGE_SIZE = 10
+
+# Выше любого реального балла - тестовые заявки первыми в сортировке по температуре
+TOP_SCORE = 1_000_000
+
+
+@pytest.fixture
+def applications_with_services():
+    """PAGE_SIZE заявок, у каждой своя услуга."""
+    db = SessionLocal()
+    try:
+        services = [AdminSettings(services=f"Тест услуга {index}", budget_range="1-2 млн") for index in range(PAGE_SIZE)]
+        db.add_all(services)
+        db.flush()
+    except OperationalError:
+        db.close()
+        pytest.skip("БД недоступна")
+    applications = [
+        Application(first_name="Тест", last_name=str(index), service_id=service.id, temperature_score=TOP_SCORE)
+        for index, service in enumerate(services)
+    ]
+    db.add_all(applications)
+    db.commit()
+    try:
+        yield applications
+    finally:
+        db.query(Application).filter(Application.id.in_([application.id for application in applications])).delete()
+        db.query(AdminSettings).filter(AdminSettings.id.in_([service.id for service in services])).delete()
+        db.commit()
+        db.close()
+        services_cache.invalidate()
+
+
+@pytest.fixture
+def client():
+    main.app.dependency_overrides[get_current_admin] = lambda: None
+    try:
+        yield TestClient(main.app)
+    finally:
+        main.app.dependency_overrides.pop(get_current_admin, None)
+
+
+def count_list_queries(client: TestClient, limit: int):
+    """Запросы к БД за один GET /admin/applications."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = client.get("/admin/applications", params={"limit": limit})
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    assert response.status_code == 200
+    return response.json(), statements
+
+
+def test_list_query_count_does_not_depend_on_page_size(client, applications_with_services):
+    one_row, one_row_statements = count_list_queries(client, 1)
+    full_page, full_page_statements = count_list_queries(client, PAGE_SIZE)
+
+    assert len(one_row) == 1
+    assert len(full_page) == PAGE_SIZE
+    assert {item["service_name"] for item in full_page} == {f"Тест услуга {index}" for index in range(PAGE_SIZE)}
+    assert len(full_page_statements) == len(one_row_statements)
@@ -0,0 +1,100 @@
+"""
+Архив и статистика: с include_archived агрегаты учитывают архивные заявки,
+а брошенный захват (срок истек) архивируется, как и незахваченная заявка.
+
+Нужна БД с актуальной схемой (python migrate.py); без нее тест пропускается.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from core.database import SessionLocal
+# Таблица admins нужна внешнему ключу applications.claimed_by
+from models.admin import Admin  # noqa: F401
+from models.admin_settings import AdminSettings, services_cache
+from models.application_archive import ApplicationArchive, ApplicationArchiveCRUD
+from models.applications import Application, ApplicationCRUD
+
+# Фамилия, по которой находятся и удаляются строки теста
+MARKER = "Тест архива"
+
+# Строки теста старше любых реальных: архивация с таким порогом их и только их
+CENTURY_DAYS = 36500
+CENTURY_AGO = datetime.now(timezone.utc) - timedelta(days=CENTURY_DAYS + 1)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        session.query(Application.id).filter(Application.last_name == MARKER).all()
+    except OperationalError:
+        session.close()
+        pytest.skip("БД недоступна")
+    try:
+        yield session
+    finally:
+        session.rollback()
+        service_ids = [
+            service_id for service_id, in session.query(AdminSettings.id).filter(AdminSettings.services == MARKER)
+        ]
+        session.query(Application).filter(Application.last_name == MARKER).delete()
+        session.query(ApplicationArchive).filter(ApplicationArchive.last_name == MARKER).delete()
+        session.query(AdminSettings).filter(AdminSettings.id.in_(service_ids)).delete()
+        session.commit()
+        session.close()
+        services_cache.invalidate()
+
+
+def test_statistics_include_archived(db):
+    service = AdminSettings(services=MARKER, budget_range="1-2 млн")
+    db.add(service)
+    db.flush()
+    db.add(Application(
+        first_name="Текущая", last_name=MARKER, service_id=service.id, temperature="hot", score_niche=1
+    ))
+    db.add(ApplicationArchive(
+        id=-1, first_name="Архивная", last_name=MARKER, service_id=service.id,
+        temperature="hot", score_niche=1, status="closed"
+    ))
+    db.commit()
+
+    archived_total = db.query(ApplicationArchive).count()
+    live = ApplicationCRUD.get_statistics(db=db)
+    combined = ApplicationCRUD.get_statistics(db=db, include_archived=True)
+    assert combined["total"] == live["total"] + archived_total
+
+    live_criteria = ApplicationCRUD.get_criteria_statistics(db=db)["by_temperature"]["hot"]["count"]
+    combined_criteria = ApplicationCRUD.get_criteria_statistics(db=db, include_archived=True)["by_temperature"]["hot"]["count"]
+    assert combined_criteria > live_criteria
+
+    def service_total(include_archived):
+        statistics = ApplicationCRUD.get_service_statistics(db=db, include_archived=include_archived)
+        return next(item.total for item in statistics if item.service_id == service.id)
+
+    assert service_total(False) == 1
+    assert service_total(True) == 2
+
+
+def test_archive_moves_expired_claims(db):
+    now = datetime.now(timezone.utc)
+    applications = {
+        "expired": Application(
+            first_name="Брошена", last_name=MARKER, status="in_progress", created_at=CENTURY_AGO,
+            claimed_at=now - timedelta(hours=2), claim_expires_at=now - timedelta(hours=1)
+        ),
+        "active": Application(
+            first_name="В работе", last_name=MARKER, status="in_progress", created_at=CENTURY_AGO,
+            claimed_at=now, claim_expires_at=now + timedelta(hours=1)
+        ),
+    }
+    db.add_all(applications.values())
+    db.commit()
+    ids = {name: application.id for name, application in applications.items()}
+
+    result = ApplicationArchiveCRUD.archive(db=db, older_than_days=CENTURY_DAYS, closed_after_days=CENTURY_DAYS)
+
+    assert result.archived == 1
+    assert db.get(ApplicationArchive, ids["expired"]) is not None
+    assert db.get(Application, ids["active"]) is not None
@@ -0,0 +1,36 @@
+"""Разбор строкового бюджетного диапазона услуги в типизированные границы."""
+from decimal import Decimal
+
+import pytest
+
+from models.admin_settings import parse_budget_range
+
+
+@pytest.mark.parametrize("budget_range, expected", [
+    ("50 000 - 100 000 ₽", (Decimal("50000"), Decimal("100000"))),
+    ("от 100 000", (Decimal("100000"), None)),
+    ("до 50к", (None, Decimal("50000"))),
+    ("500 000+", (Decimal("500000"), None)),
+    # Множитель второго числа относится к первому, записанному коротко
+    ("1-2 млн", (Decimal("1000000"), Decimal("2000000"))),
+    ("100-500к", (Decimal("100000"), Decimal("500000"))),
+    # Первое число уже полное - множитель не заимствуется
+    ("500 000 - 1 млн ₽", (Decimal("500000"), Decimal("1000000"))),
+    ("от 300 000 до 1,5 млн", (Decimal("300000"), Decimal("1500000"))),
+    ("1500 - 2 тыс", (Decimal("1500"), Decimal("2000"))),
+])
+def test_parse_budget_range(budget_range, expected):
+    assert parse_budget_range(budget_range) == expected
+
+
+@pytest.mark.parametrize("budget_range", [
+    None,
+    "",
+    "договорная",
+    # min > max
+    "300 000 - 100 000",
+    # Не помещается в Numeric(15, 2)
+    "от 50 000 000 млн",
+])
+def test_parse_budget_range_rejects(budget_range):
+    assert parse_budget_range(budget_range) == (None, None)
@@ -0,0 +1,50 @@
+"""
+Условный GET коллекций: единственный валидатор - ETag, в который
+входят количество строк и сумма xmin, поэтому ни удаление, ни UPDATE,
+ни коммит в обратном порядке не дают устаревший 304.
+"""
+from datetime import datetime, timezone
+
+from starlette.requests import Request
+
+from core.http_cache import ConditionalGet, ResourceVersion
+
+UPDATED_AT = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def make_request(headers=None) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/admin/applications",
+        "query_string": b"",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+    })
+
+
+def make_conditional(count: int, headers=None, checksum: str = "1000") -> ConditionalGet:
+    version = ResourceVersion([("applications", UPDATED_AT, count, checksum)])
+    return ConditionalGet(make_request(headers), version)
+
+
+def test_etag_only_validator():
+    conditional = make_conditional(10)
+    assert "Last-Modified" not in conditional.headers
+    assert make_conditional(10, {"If-None-Match": conditional.etag}).is_not_modified()
+
+
+def test_delete_changes_etag():
+    etag = make_conditional(10).etag
+    # max(updated_at) тот же, строк стало меньше
+    assert not make_conditional(9, {"If-None-Match": etag}).is_not_modified()
+
+
+def test_update_changes_etag():
+    etag = make_conditional(10).etag
+    # UPDATE с более старым updated_at: max(updated_at) и количество те же
+    assert not make_conditional(10, {"If-None-Match": etag}, checksum="1042").is_not_modified()
+
+
+def test_if_modified_since_ignored():
+    headers = {"If-Modified-Since": "Wed, 01 Jan 2031 00:00:00 GMT"}
+    assert not make_conditional(9, headers).is_not_modified()
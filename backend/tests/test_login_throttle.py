@@ -0,0 +1,67 @@
+"""
+Ограничение попыток входа: параллельная пачка попыток не проходит мимо
+порога, а успешный вход снимает свою попытку.
+"""
+import threading
+
+import pytest
+
+from core.login_throttle import LoginThrottle, MemoryThrottleBackend, SQLiteThrottleBackend
+
+MAX_FAILURES_PER_USERNAME = 5
+MAX_FAILURES_PER_IP = 20
+BURST_SIZE = 50
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def throttle(request, tmp_path):
+    if request.param == "memory":
+        backend = MemoryThrottleBackend()
+    else:
+        backend = SQLiteThrottleBackend(str(tmp_path / "login_throttle.sqlite3"))
+    return LoginThrottle(
+        backend,
+        max_failures_per_username=MAX_FAILURES_PER_USERNAME,
+        max_failures_per_ip=MAX_FAILURES_PER_IP
+    )
+
+
+def test_concurrent_burst_respects_limit(throttle):
+    """Все попытки проверяются до учета хотя бы одной неудачи."""
+    barrier = threading.Barrier(BURST_SIZE)
+    decisions = []
+    lock = threading.Lock()
+
+    def attempt():
+        barrier.wait()
+        decision = throttle.check("admin", "10.0.0.1")
+        with lock:
+            decisions.append(decision)
+
+    threads = [threading.Thread(target=attempt) for _ in range(BURST_SIZE)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    allowed = [decision for decision in decisions if decision.allowed]
+    assert len(allowed) == MAX_FAILURES_PER_USERNAME
+    assert all(decision.scope == "username" for decision in decisions if not decision.allowed)
+
+
+def test_success_releases_attempt(throttle):
+    """Успешные входы не копятся в счетчике IP."""
+    for _ in range(MAX_FAILURES_PER_IP + 1):
+        decision = throttle.check("admin", "10.0.0.1")
+        assert decision.allowed
+        throttle.record_success("admin", "10.0.0.1", decision)
+
+
+def test_failures_block_username(throttle):
+    for _ in range(MAX_FAILURES_PER_USERNAME):
+        assert throttle.check("admin", "10.0.0.1").allowed
+        throttle.record_failure("admin", "10.0.0.1")
+    decision = throttle.check("Admin", "10.0.0.2")
+    assert not decision.allowed
+    assert decision.scope == "username"
+    assert decision.retry_after >= 1
@@ -0,0 +1,67 @@
+"""
+Одновременное создание наборов правил выдает разные номера версий
+(без ошибки уникальности версии).
+
+Нужна БД с актуальной схемой (python migrate.py); без нее тест пропускается.
+"""
+import threading
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from core.database import SessionLocal
+# Таблица admins нужна внешним ключам заявок и наборов правил
+from models.admin import Admin  # noqa: F401
+from models.scoring_rules import ScoringRuleSet, ScoringRuleSetCreate, ScoringRuleSetCRUD
+from models.temperature_analysis import DEFAULT_SCORING_RULES
+
+# Комментарий, по которому находятся и удаляются наборы теста
+MARKER = "Тест версий правил"
+CONCURRENT_CREATES = 8
+
+
+@pytest.fixture
+def cleanup():
+    db = SessionLocal()
+    try:
+        db.query(ScoringRuleSet.id).first()
+    except OperationalError:
+        db.close()
+        pytest.skip("БД недоступна")
+    try:
+        yield
+    finally:
+        db.query(ScoringRuleSet).filter(ScoringRuleSet.comment == MARKER).delete()
+        db.commit()
+        db.close()
+
+
+def test_concurrent_creates_get_distinct_versions(cleanup):
+    barrier = threading.Barrier(CONCURRENT_CREATES)
+    versions = []
+    errors = []
+    lock = threading.Lock()
+
+    def create():
+        db = SessionLocal()
+        try:
+            barrier.wait()
+            rule_set = ScoringRuleSetCRUD.create(
+                db=db, rule_set_data=ScoringRuleSetCreate(rules=DEFAULT_SCORING_RULES, comment=MARKER)
+            )
+            with lock:
+                versions.append(rule_set.version)
+        except Exception as e:
+            with lock:
+                errors.append(e)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=create) for _ in range(CONCURRENT_CREATES)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(set(versions)) == CONCURRENT_CREATES
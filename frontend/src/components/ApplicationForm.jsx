@@ -34,7 +34,7 @@ const ApplicationForm = ({ onApplicationCreated }) => {
     const fetchServices = async () => {
       try {
         setIsLoadingServices(true)
-        const response = await axios.get(`${API_BASE_URL}/admin-settings/`)
+        const response = await axios.get(`${API_BASE_URL}/admin-settings/`, { params: { active_only: true } })
         setServices(response.data || [])
       } catch (error) {
         console.error('Ошибка загрузки услуг:', error)
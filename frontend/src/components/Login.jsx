@@ -2,7 +2,7 @@ import { useState, useEffect } from 'react'
 import { motion } from 'framer-motion'
 import { useNavigate } from 'react-router-dom'
 import axios from 'axios'
-import { setToken, setAdmin } from '../utils/auth'
+import { setToken, setRefreshToken, setAdmin } from '../utils/auth'
 
 const API_BASE_URL = '/api'
 
@@ -55,6 +55,7 @@ const Login = () => {
       
       // Сохраняем токен и данные администратора
       setToken(response.data.access_token)
+      setRefreshToken(response.data.refresh_token)
       setAdmin(response.data.admin)
       
       // Перенаправляем в админ-панель (используем replace для замены истории)
@@ -2,7 +2,7 @@ import { useState, useEffect } from 'react'
 import { motion } from 'framer-motion'
 import { useNavigate } from 'react-router-dom'
 import axios from 'axios'
-import { setToken, setAdmin } from '../utils/auth'
+import { setToken, setRefreshToken, setAdmin } from '../utils/auth'
 
 const API_BASE_URL = '/api'
 
@@ -80,6 +80,7 @@ const Register = () => {
       
       // Сохраняем токен и данные администратора
       setToken(loginResponse.data.access_token)
+      setRefreshToken(loginResponse.data.refresh_token)
       setAdmin(loginResponse.data.admin)
       
       // Перенаправляем в админ-панель
@@ -3,6 +3,7 @@
  */
 
 const TOKEN_KEY = 'admin_token'
+const REFRESH_TOKEN_KEY = 'admin_refresh_token'
 const ADMIN_KEY = 'admin_data'
 
 /**
@@ -20,10 +21,25 @@ export const getToken = () => {
 }
 
 /**
- * Удаляет токен из localStorage
+ * Сохраняет токен обновления в localStorage
+ */
+export const setRefreshToken = (token) => {
+  localStorage.setItem(REFRESH_TOKEN_KEY, token)
+}
+
+/**
+ * Получает токен обновления из localStorage
+ */
+export const getRefreshToken = () => {
+  return localStorage.getItem(REFRESH_TOKEN_KEY)
+}
+
+/**
+ * Удаляет токены из localStorage
  */
 export const removeToken = () => {
   localStorage.removeItem(TOKEN_KEY)
+  localStorage.removeItem(REFRESH_TOKEN_KEY)
   localStorage.removeItem(ADMIN_KEY)
 }
 
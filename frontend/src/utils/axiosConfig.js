@@ -2,7 +2,9 @@
  * Настройка axios для работы с аутентификацией
  */
 import axios from 'axios'
-import { getToken, removeToken } from './auth'
+import { getRefreshToken, getToken, removeToken, setRefreshToken, setToken } from './auth'
+
+const API_BASE_URL = '/api'
 
 // Interceptor для запросов - добавляет токен
 axios.interceptors.request.use(
@@ -18,16 +20,53 @@ axios.interceptors.request.use(
   }
 )
 
+// Один запрос обновления на все одновременно получившие 401
+let refreshPromise = null
+
+const refreshTokens = () => {
+  if (!refreshPromise) {
+    refreshPromise = axios
+      .post(`${API_BASE_URL}/auth/refresh`, { refresh_token: getRefreshToken() })
+      .then((response) => {
+        setToken(response.data.access_token)
+        setRefreshToken(response.data.refresh_token)
+        return response.data.access_token
+      })
+      .finally(() => {
+        refreshPromise = null
+      })
+  }
+  return refreshPromise
+}
+
+const redirectToLogin = () => {
+  removeToken()
+  if (window.location.pathname !== '/admin/login') {
+    window.location.href = '/admin/login'
+  }
+}
+
 // Interceptor для ответов - обрабатывает 401 ошибки
 axios.interceptors.response.use(
   (response) => response,
-  (error) => {
-    if (error.response?.status === 401 && error.config?.url?.includes('/admin')) {
-      // Токен недействителен, удаляем его
-      removeToken()
-      if (window.location.pathname !== '/admin/login') {
-        window.location.href = '/admin/login'
+  async (error) => {
+    const config = error.config
+    const isProtected = config?.url?.includes('/admin') || config?.url?.includes('/auth/me')
+    if (error.response?.status === 401 && isProtected) {
+      // Токен доступа истек - пробуем обновить его один раз и повторить запрос
+      if (!config._retried && getRefreshToken()) {
+        config._retried = true
+        try {
+          const token = await refreshTokens()
+          config.headers.Authorization = `Bearer ${token}`
+          return axios(config)
+        } catch (refreshError) {
+          redirectToLogin()
+          return Promise.reject(refreshError)
+        }
       }
+      // Токен недействителен, удаляем его
+      redirectToLogin()
     }
     return Promise.reject(error)
   }